@@ -1,46 +1,314 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import joblib
+import atexit
+import io
+import json
 import os
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-from PIL import Image
+import tempfile
 import numpy as np
-import gdown
-
-def calculate_risk(answers):
-    criteria_met = sum(answers[:3]) >= 1, sum(answers[3:6]) >= 1, sum(answers[6:8]) >= 1
-    criteria_count = sum(criteria_met)
-    
-    if criteria_count == 0:
-        return "Low Risk", "#4CAF50"
-    elif criteria_count == 1:
-        return "Moderate Risk", "#FF9800"
-    else:
-        return "High Risk", "#F44336"
+from modules.artifacts import ArtifactError, default_store
+from modules.cine import CINE_EXTENSIONS, classify_cine
+from modules.clinical import CLINICAL_FEATURES, load_clinical_model
+from modules.compiled_model import ClinicalRecord, CompiledClinicalModel
+from modules.imaging import classify, load_imaging_model, model_version, predict_images, preprocess_image
+from modules.imaging_pool import IMAGING_WORKERS, ImagingPool
+from modules.inference_service import start_clinical_service
+from modules.prediction_cache import PredictionCache
+from modules.reports import ReportQueue
+from modules.result_store import ResultStore
+from modules.risk_scoring import calculate_risk
+from modules.what_if import evaluate_sweep, sweep_values
+
+# Load the trained model for clinical diagnosis on first use, verified against the artifact store
+@st.cache_resource
+def get_clinical_model():
+    return load_clinical_model()
 
-# Set page config
-st.set_page_config(page_title="PCOS Self-Assessment", page_icon="🌸", layout="centered")
+# One batching queue per process so concurrent sessions share predict_proba calls
+@st.cache_resource
+def get_clinical_service(_model):
+    return start_clinical_service(_model)
 
-# Load the trained model for clinical diagnosis
-clinical_model_path = "pcos_diagnosis_pipeline.pkl"
-if os.path.exists(clinical_model_path):
-    clinical_model = joblib.load(clinical_model_path)
-else:
-    clinical_model = None
-    st.error(f"Clinical diagnosis model file '{clinical_model_path}' not found. Please upload the file.")
+# Optional pandas-free path that evaluates the pipeline's parameters directly
+CLINICAL_FAST_PATH = os.environ.get("CLINICAL_FAST_PATH") == "1"
 
-# Download the trained model for medical imaging diagnosis from Google Drive
 @st.cache_resource
+def get_compiled_clinical_model(_model):
+    return CompiledClinicalModel.from_pipeline(_model)
+
+# What-if grids are cached per patient so moving the sliders redraws without re-scoring
+@st.cache_data(max_entries=64, show_spinner=False)
+def what_if_likelihood(_model, patient_values, x_feature, points, y_feature=None):
+    patient = dict(zip(CLINICAL_FEATURES, patient_values))
+    x_values = sweep_values(x_feature, points)
+    y_values = sweep_values(y_feature, points) if y_feature else None
+    return x_values, y_values, evaluate_sweep(_model, patient, x_feature, x_values, y_feature, y_values)
+
+# Load the trained model for medical imaging diagnosis from the artifact store,
+# or the converted TFLite model when IMAGING_RUNTIME=tflite. TensorFlow is only
+# imported when the first image is uploaded. With IMAGING_WORKERS=N the model is
+# loaded by N inference processes instead, which all sessions share.
+@st.cache_resource(show_spinner="Loading the imaging model...")
 def load_trained_model():
-    model_path = 'Pcos_Scan_model.h5'
-    if not os.path.exists(model_path):
-        url = 'https://drive.google.com/uc?id=1UTBOUNtIzhAtCRDzI5D7TnsGMHsY43D-'
-        gdown.download(url, model_path, quiet=False)
-    return load_model(model_path)
+    if IMAGING_WORKERS:
+        return ImagingPool(IMAGING_WORKERS)
+    return load_imaging_model()
 
-imaging_model = load_trained_model()
+# Imaging scores are cached per uploaded image and model version across reruns and sessions
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache()
+
+# Clinical and imaging results saved by any session; writes are committed in the
+# background, and whatever is still queued is written when the server exits
+@st.cache_resource
+def get_result_store():
+    store = ResultStore()
+    atexit.register(store.close)
+    return store
+
+# Queues the result when the button is clicked without waiting for the write;
+# the pending save is kept in the session and reported as saved or failed on
+# the first rerun after the writer has committed it
+def save_result_button(result, state_key):
+    if st.button("Save Result", key=state_key):
+        try:
+            st.session_state[f"{state_key}_pending"] = get_result_store().save(**result)
+        except RuntimeError as e:
+            st.error(f"The result could not be saved: {e}")
+    future = st.session_state.get(f"{state_key}_pending")
+    if future is None:
+        return
+    if not future.done():
+        st.info("Result queued for saving.")
+        return
+    del st.session_state[f"{state_key}_pending"]
+    if future.exception() is not None:
+        st.error(f"The result could not be saved: {future.exception()}")
+    else:
+        st.success("Result saved successfully.")
+
+# PDF reports are rendered by a pool of worker processes shared by all sessions
+@st.cache_resource
+def get_report_queue():
+    return ReportQueue()
+
+# Queues the PDF of a result as soon as it is shown; the download button only waits
+# for the file, on its own thread, when it is clicked
+def pdf_report_button(result, state_key, file_name):
+    request = json.dumps(result, sort_keys=True)
+    pending = st.session_state.get(state_key)
+    if pending is None or pending[0] != request:
+        pending = st.session_state[state_key] = (request, get_report_queue().submit(result))
+    future = pending[1]
+    st.download_button(
+        label="Download PDF Report",
+        data=lambda: future.result(),
+        file_name=file_name,
+        mime="application/pdf",
+        key=f"{state_key}_download",
+    )
+
+@st.cache_resource
+def get_imaging_model_version():
+    return model_version(load_trained_model())
+
+# Labels of the hormonal and other measurements collected in the Clinical Diagnosis form
+MEASUREMENT_INPUTS = {
+    "FastingGlucose": "Fasting Glucose Level (mg/dL)",
+    "FastingInsulin": "Fasting Insulin Level (µIU/mL)",
+    "LH_FSH_Ratio": "LH/FSH Ratio",
+    "AMH": "AMH (Anti-Müllerian Hormone) Level (ng/mL)",
+    "DHEAS": "DHEAS (Dehydroepiandrosterone sulfate) Level (µg/dL)",
+    "Prolactin": "Prolactin Level (ng/mL)",
+    "TSH": "TSH (Thyroid Stimulating Hormone) Level (mIU/L)",
+    "FreeTestosterone": "Free Testosterone Level (pg/mL)",
+    "BloodSugar": "Random Blood Sugar Level (mg/dL)",
+}
+
+def calculate_bmi(weight, height):
+    if weight and height:
+        return round(weight / ((height / 100) ** 2), 2)
+    return None
+
+# The Clinical Diagnosis form is split into fragments, so editing a field reruns
+# only its own part of the page. Widget values are shared through session_state.
+@st.fragment
+def clinical_patient_details():
+    # Section 1: General Information
+    st.header("📋 General Information")
+    st.text_input("Patient's Name", key="clinical_name")
+    st.slider("Patient's Age", min_value=10, max_value=90, value=25, step=1, key="clinical_age")
+    st.text_area("Additional Notes (Optional)", key="clinical_notes")
+
+    # Section 2: Ovulatory Dysfunction
+    st.header("📅 Ovulatory Dysfunction")
+    st.selectbox(
+        "Average Menstrual Cycle Length",
+        [
+            "Less than 25 days", 
+            "25–34 days", 
+            "35–60 days", 
+            "More than 60 days", 
+            "Totally variable (changes frequently)"
+        ],
+        key="clinical_cycle_length",
+    )
+
+    # Section 3: Hyperandrogenism
+    st.header("🌿 Hyperandrogenism")
+    st.radio(
+        "Tendency to grow dark, coarse hair?",
+        ["Yes", "No"], 
+        index=1,
+        key="clinical_excess_hair_growth",
+    )
+
+    # Section 4: Ultrasound Findings
+    st.header("🔬 Ultrasound Findings")
+    st.write("If the patient has undergone an ultrasound, please provide the following details:")
+
+    st.number_input(
+        "Number of follicles seen in ultrasound", min_value=0, step=1, format="%d", key="clinical_follicle_count"
+    )
+    st.number_input(
+        "Volume of ovaries (in cm³)", min_value=0.0, step=0.1, format="%.1f", key="clinical_ovarian_volume"
+    )
+    st.radio(
+        "Was there a mention of increased stroma or abnormal endometrial thickness?",
+        options=["Yes", "No", "Not Sure"],
+        key="clinical_stroma_endometrial_status",
+    )
+    st.multiselect(
+        "Findings mentioned in ultrasound report:",
+        options=[
+            "A big womb", "A tilted womb", "Fibroids", "Polyps",
+            "Swollen tubes", "Ovarian cysts", "Endometriosis",
+            "Adenomyosis", "Adhesions", "Thickening of the lining of the womb", "None of the above"
+        ],
+        key="clinical_ultrasound_findings",
+    )
+
+@st.fragment
+def clinical_bmi():
+    # Section 5: Obesity
+    st.header("⚖️ Obesity")
+    st.write("Calculate BMI:")
+    weight = st.number_input("Weight (kg):", min_value=20.0, max_value=200.0, step=0.1, key="clinical_weight")
+    height = st.number_input("Height (cm):", min_value=100.0, max_value=250.0, step=0.1, key="clinical_height")
+    bmi = calculate_bmi(weight, height)
+    if bmi is not None:
+        st.write(f"Calculated BMI: {bmi}")
+
+# The hormone panel is a form, so its fields are sent together when Predict is
+# pressed instead of rerunning the page after each one
+@st.fragment
+def clinical_measurements(clinical_model):
+    # Section 6: Hormonal and Other Measurements
+    st.header("🧪 Hormonal and Other Measurements")
+    with st.form("clinical_measurements"):
+        for feature, label in MEASUREMENT_INPUTS.items():
+            st.number_input(label, key=f"clinical_{feature}")
+        st.slider("Symptom Severity (1 to 10)", 1, 10, key="clinical_score")
+        predict = st.form_submit_button("Predict PCOS Likelihood")
+
+    # Prepare the input data for the model
+    state = st.session_state
+    values = {
+        "Age": state["clinical_age"],
+        "BMI": calculate_bmi(state["clinical_weight"], state["clinical_height"]),
+        "Score": state["clinical_score"],
+        **{feature: state[f"clinical_{feature}"] for feature in MEASUREMENT_INPUTS},
+    }
+    input_data = {feature: values[feature] for feature in CLINICAL_FEATURES}
+    patient_name = state["clinical_name"]
+    additional_notes = state["clinical_notes"]
+
+    if predict:
+        try:
+            # Make the prediction through the compiled model or the shared micro-batching service
+            if CLINICAL_FAST_PATH:
+                record = ClinicalRecord.from_form(input_data)
+                likelihood = get_compiled_clinical_model(clinical_model).predict_one(record)[1] * 100
+            else:
+                likelihood = get_clinical_service(clinical_model).predict(input_data)
+            state["clinical_prediction"] = {
+                "patient": patient_name, "likelihood": likelihood, "inputs": input_data, "notes": additional_notes,
+            }
+        except ValueError as e:
+            state.pop("clinical_prediction", None)
+            st.error(f"An error occurred: {e}. Please ensure all fields are correctly filled.")
+        except RuntimeError as e:
+            # The shared service has stopped; drop it so the next prediction starts a new one
+            state.pop("clinical_prediction", None)
+            get_clinical_service.clear()
+            st.error(f"The prediction service stopped ({e}). Please try again.")
+
+    # The latest prediction stays on screen until the next one, so it can be saved
+    prediction = state.get("clinical_prediction")
+    if prediction:
+        patient_name, likelihood = prediction["patient"], prediction["likelihood"]
+
+        # Display the results
+        if likelihood > 50:
+            diagnosis = "PCOS Likely"
+            st.success(f"Prediction for {patient_name or 'the patient'}: {diagnosis}")
+            st.write(f"PCOS Likelihood: {likelihood:.2f}%")
+            st.info("Based on the provided information, it is likely that the patient has PCOS. Please consult with a healthcare provider for further evaluation and confirmation.")
+        else:
+            diagnosis = "PCOS Unlikely"
+            st.success(f"Prediction for {patient_name or 'the patient'}: {diagnosis}")
+            st.write(f"PCOS Likelihood: {likelihood:.2f}%")
+            st.info("Based on the provided information, it is unlikely that the patient has PCOS. Please consult with a healthcare provider for further evaluation if symptoms persist.")
+
+        if prediction["notes"]:
+            st.info(f"Additional Notes Provided: {prediction['notes']}")
+
+        result = {
+            "kind": "clinical", "patient": patient_name or "Patient", "outcome": diagnosis, "score": likelihood,
+            "model_version": default_store().digest("clinical"),
+            "details": {"inputs": prediction["inputs"], "notes": prediction["notes"]},
+        }
+        pdf_report_button(result, "clinical_report", f"{result['patient']}_PCOS_Report.pdf")
+
+        save_result_button(result, "clinical_save")
+
+    # What-if analysis over one or two measurements
+    with st.expander("🔍 What-if Analysis"):
+        st.write("See how the likelihood changes as one or two measurements vary while the patient's other values stay fixed.")
+        st.caption("Age and BMI changes are picked up on the next prediction.")
+        patient_values = tuple(input_data[feature] for feature in CLINICAL_FEATURES)
+        x_feature = st.selectbox("Measurement to vary", CLINICAL_FEATURES, index=CLINICAL_FEATURES.index("BMI"))
+        y_feature = st.selectbox(
+            "Second measurement (optional)", ["None"] + [f for f in CLINICAL_FEATURES if f != x_feature]
+        )
+        try:
+            if y_feature == "None":
+                x_values, _, likelihood = what_if_likelihood(clinical_model, patient_values, x_feature, 500)
+                current = input_data[x_feature]
+                default = float(np.clip(current, x_values[0], x_values[-1])) if current is not None else float(x_values[len(x_values) // 2])
+                probe = st.slider(f"{x_feature} value", float(x_values[0]), float(x_values[-1]), default)
+                st.line_chart(pd.DataFrame({"PCOS Likelihood (%)": likelihood}, index=pd.Index(x_values, name=x_feature)))
+                st.write(f"PCOS Likelihood at {x_feature} = {probe:g}: {np.interp(probe, x_values, likelihood):.2f}%")
+            else:
+                import matplotlib.pyplot as plt
+
+                x_values, y_values, likelihood = what_if_likelihood(clinical_model, patient_values, x_feature, 60, y_feature)
+                fig, ax = plt.subplots()
+                heatmap = ax.imshow(
+                    likelihood, origin="lower", aspect="auto", cmap="RdYlGn_r", vmin=0, vmax=100,
+                    extent=(x_values[0], x_values[-1], y_values[0], y_values[-1]),
+                )
+                if input_data[x_feature] is not None and input_data[y_feature] is not None:
+                    ax.plot(input_data[x_feature], input_data[y_feature], marker="o", color="black")
+                ax.set_xlabel(x_feature)
+                ax.set_ylabel(y_feature)
+                fig.colorbar(heatmap, label="PCOS Likelihood (%)")
+                st.pyplot(fig)
+                plt.close(fig)
+        except ValueError as e:
+            st.error(f"An error occurred: {e}. Please ensure all fields are correctly filled.")
 
 # Custom CSS for styling
 st.markdown("""
@@ -77,7 +345,9 @@ if options == "Symptom Tracker":
     Please answer the questions carefully. Your privacy is respected, and the data is not saved.
     """)
     
-    st.sidebar.image("hal-gatewood-OgvqXGL7XO4-unsplash.jpg")
+    sidebar_image_path = "hal-gatewood-OgvqXGL7XO4-unsplash.jpg"
+    if os.path.exists(sidebar_image_path):
+        st.sidebar.image(sidebar_image_path)
 
     questions = [
         # Ovulatory dysfunction
@@ -126,150 +396,86 @@ elif options == "Clinical Diagnosis":
         st.error(f"Image file '{image_path}' not found. Please upload the file.")
     st.write("This section allows healthcare providers to input patient details and receive a PCOS likelihood assessment. Please fill out the following information carefully.")
 
-    if clinical_model is None:
-        st.error("Clinical diagnosis model is not available. Please upload the 'pcos_diagnosis_pipeline.pkl' file.")
+    try:
+        clinical_model = get_clinical_model()
+    except ArtifactError as e:
+        st.error(f"Clinical diagnosis model could not be loaded: {e}")
     else:
-        # Section 1: General Information
-        st.header("📋 General Information")
-        patient_name = st.text_input("Patient's Name")
-        patient_age = st.slider("Patient's Age", min_value=10, max_value=90, value=25, step=1)
-        additional_notes = st.text_area("Additional Notes (Optional)")
-
-        # Section 2: Ovulatory Dysfunction
-        st.header("📅 Ovulatory Dysfunction")
-        menstrual_cycle_length = st.selectbox(
-            "Average Menstrual Cycle Length",
-            [
-                "Less than 25 days", 
-                "25–34 days", 
-                "35–60 days", 
-                "More than 60 days", 
-                "Totally variable (changes frequently)"
-            ]
-        )
-
-        # Section 3: Hyperandrogenism
-        st.header("🌿 Hyperandrogenism")
-        excess_hair_growth = st.radio(
-            "Tendency to grow dark, coarse hair?",
-            ["Yes", "No"], 
-            index=1
-        )
-
-        # Section 4: Ultrasound Findings
-        st.header("🔬 Ultrasound Findings")
-        st.write("If the patient has undergone an ultrasound, please provide the following details:")
-
-        follicle_count = st.number_input(
-            "Number of follicles seen in ultrasound", min_value=0, step=1, format="%d"
-        )
-        ovarian_volume = st.number_input(
-            "Volume of ovaries (in cm³)", min_value=0.0, step=0.1, format="%.1f"
-        )
-        stroma_endometrial_status = st.radio(
-            "Was there a mention of increased stroma or abnormal endometrial thickness?",
-            options=["Yes", "No", "Not Sure"]
-        )
-        ultrasound_findings = st.multiselect(
-            "Findings mentioned in ultrasound report:",
-            options=[
-                "A big womb", "A tilted womb", "Fibroids", "Polyps",
-                "Swollen tubes", "Ovarian cysts", "Endometriosis",
-                "Adenomyosis", "Adhesions", "Thickening of the lining of the womb", "None of the above"
-            ]
-        )
-
-        # Section 5: Obesity
-        st.header("⚖️ Obesity")
-        st.write("Calculate BMI:")
-        weight = st.number_input("Weight (kg):", min_value=20.0, max_value=200.0, step=0.1)
-        height = st.number_input("Height (cm):", min_value=100.0, max_value=250.0, step=0.1)
-        if weight and height:
-            bmi = round(weight / ((height / 100) ** 2), 2)
-            st.write(f"Calculated BMI: {bmi}")
-        else:
-            bmi = None
-
-        # Section 6: Hormonal and Other Measurements
-        st.header("🧪 Hormonal and Other Measurements")
-        fasting_glucose = st.number_input("Fasting Glucose Level (mg/dL)")
-        fasting_insulin = st.number_input("Fasting Insulin Level (µIU/mL)")
-        lh_fsh_ratio = st.number_input("LH/FSH Ratio")
-        amh = st.number_input("AMH (Anti-Müllerian Hormone) Level (ng/mL)")
-        dheas = st.number_input("DHEAS (Dehydroepiandrosterone sulfate) Level (µg/dL)")
-        prolactin = st.number_input("Prolactin Level (ng/mL)")
-        tsh = st.number_input("TSH (Thyroid Stimulating Hormone) Level (mIU/L)")
-        free_testosterone = st.number_input("Free Testosterone Level (pg/mL)")
-        blood_sugar = st.number_input("Random Blood Sugar Level (mg/dL)")
-        score = st.slider("Symptom Severity (1 to 10)", 1, 10)
-
-        # Predict button
-        if st.button("Predict PCOS Likelihood"):
-            try:
-                # Prepare the input data for the model
-                input_data = pd.DataFrame([{
-                    "Age": patient_age,
-                    "BMI": bmi,
-                    "FastingGlucose": fasting_glucose,
-                    "FastingInsulin": fasting_insulin,
-                    "LH_FSH_Ratio": lh_fsh_ratio,
-                    "AMH": amh,
-                    "DHEAS": dheas,
-                    "Prolactin": prolactin,
-                    "TSH": tsh,
-                    "FreeTestosterone": free_testosterone,
-                    "BloodSugar": blood_sugar,
-                    "Score": score
-                }])
-                
-                # Make the prediction
-                probabilities = clinical_model.predict_proba(input_data)[0]
-                likelihood = probabilities[1] * 100
-
-                # Display the results
-                if likelihood > 50:
-                    diagnosis = "PCOS Likely"
-                    st.success(f"Prediction for {patient_name or 'the patient'}: {diagnosis}")
-                    st.write(f"PCOS Likelihood: {likelihood:.2f}%")
-                    st.info("Based on the provided information, it is likely that the patient has PCOS. Please consult with a healthcare provider for further evaluation and confirmation.")
-                else:
-                    diagnosis = "PCOS Unlikely"
-                    st.success(f"Prediction for {patient_name or 'the patient'}: {diagnosis}")
-                    st.write(f"PCOS Likelihood: {likelihood:.2f}%")
-                    st.info("Based on the provided information, it is unlikely that the patient has PCOS. Please consult with a healthcare provider for further evaluation if symptoms persist.")
-                
-                if additional_notes:
-                    st.info(f"Additional Notes Provided: {additional_notes}")
-            except ValueError as e:
-                st.error(f"An error occurred: {e}. Please ensure all fields are correctly filled.")
+        clinical_patient_details()
+        clinical_bmi()
+        clinical_measurements(clinical_model)
 
 # Medical Imaging Diagnosis section
 elif options == "🩺 Medical Imaging Diagnosis":
     st.title("Welcome to the Medical Imaging Diagnosis PCOS Dashboard")
     st.image("pngwing.com (25).png")
     st.write("This app provides insights into the medical imaging analysis.")
-    st.write("Upload an ultrasound image to classify it as **Infected** or **Noninfected**.")
+    st.write("Upload one or more ultrasound images to classify them as **Infected** or **Noninfected**.")
     
     threshold = st.sidebar.slider("Confidence Threshold", 0.0, 1.0, 0.5, 0.01)
     user_name = st.text_input("Enter your name:", value="Patient")
-    uploaded_file = st.file_uploader("Upload an Ultrasound Image", type=["jpg", "jpeg", "png"])
-
-    if uploaded_file:
-        img = Image.open(uploaded_file).convert("RGB")
-        st.image(img, caption="Uploaded Image")
+    uploaded_files = st.file_uploader(
+        "Upload Ultrasound Images", type=["jpg", "jpeg", "png"], accept_multiple_files=True
+    )
+    cine_file = st.file_uploader("Upload a Cine Loop (optional)", type=CINE_EXTENSIONS)
+
+    prediction_cache = get_prediction_cache()
+    imaging_model = None
+    if uploaded_files or cine_file:
+        try:
+            imaging_model = load_trained_model()
+        except ArtifactError as e:
+            st.error(f"Imaging diagnosis model could not be loaded: {e}")
+
+    # Whole studies are decoded in parallel and classified in large batches;
+    # images already scored by this model version are served from the cache
+    if len(uploaded_files) > 1 and imaging_model:
+        imaging_version = get_imaging_model_version()
+        keys = [prediction_cache.key(uploaded.getvalue(), imaging_version) for uploaded in uploaded_files]
+        scores = {key: prediction_cache.get(key) for key in keys}
+        errors = {}
+        misses = [(uploaded, key) for uploaded, key in zip(uploaded_files, keys) if scores[key] is None]
+        if misses:
+            with st.spinner(f"Classifying {len(misses)} images..."):
+                for (uploaded, key), score, error in predict_images(imaging_model, misses, opener=lambda miss: miss[0]):
+                    if error is None:
+                        scores[key] = score
+                        prediction_cache.put(key, score)
+                    else:
+                        errors[key] = error
+        rows = []
+        for uploaded, key in zip(uploaded_files, keys):
+            if key in errors:
+                rows.append({"Image": uploaded.name, "Prediction Confidence (%)": None, "Result": f"Error: {errors[key]}"})
+            else:
+                rows.append({"Image": uploaded.name, "Prediction Confidence (%)": round(scores[key] * 100, 1), "Result": classify(scores[key], threshold)})
+        results = pd.DataFrame(rows)
+        st.write(f"### **Results for {len(results)} images**")
+        st.dataframe(results, hide_index=True)
+        st.download_button(
+            label="Download Results",
+            data=results.to_csv(index=False),
+            file_name=f"{user_name}_PCOS_Results.csv",
+            mime="text/csv",
+        )
 
-        # Preprocess image
-        img = img.resize((256, 256))
-        img_array = img_to_array(img) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
+    elif uploaded_files:
+        uploaded_file = uploaded_files[0]
+        image_bytes = uploaded_file.getvalue()
+        st.image(image_bytes, caption="Uploaded Image")
 
-        # Make predictions
+        # Make predictions, decoding and running the model only for images not seen before
         if imaging_model:
-            yhat = imaging_model.predict(img_array)
-            confidence = round(yhat[0][0] * 100, 1)  # Confidence rounded to 1 decimal
+            cache_key = prediction_cache.key(image_bytes, get_imaging_model_version())
+            score = prediction_cache.get(cache_key)
+            if score is None:
+                img_array = np.expand_dims(preprocess_image(io.BytesIO(image_bytes)), axis=0)
+                score = float(imaging_model.predict(img_array)[0][0])
+                prediction_cache.put(cache_key, score)
+            confidence = round(score * 100, 1)  # Confidence rounded to 1 decimal
 
             # Classification
-            result = "Noninfected" if yhat[0][0] >= threshold else "Infected"
+            result = classify(score, threshold)
 
             # Display results
             st.write(f"### **Result:** {result}")
@@ -322,10 +528,56 @@ elif options == "🩺 Medical Imaging Diagnosis":
                 mime="text/plain",
             )
 
-            if st.button("Save Result"):
-                with open(f"{user_name}_PCOS_Result.txt", "w") as file:
-                    file.write(result_text)
-                st.success("Result saved successfully.")
+            saved_result = {
+                "kind": "imaging", "patient": user_name, "outcome": result, "score": score,
+                "model_version": get_imaging_model_version(),
+                "details": {
+                    "image": uploaded_file.name, "threshold": threshold,
+                    "insights": [line.strip()[2:] for line in insights.strip().splitlines()],
+                },
+            }
+            pdf_report_button(saved_result, "imaging_report", f"{user_name}_PCOS_Report.pdf")
+
+            save_result_button(saved_result, "imaging_save")
+
+    # Cine loops are streamed through the model once per file and model version;
+    # the threshold is applied to the kept study summary
+    if cine_file and imaging_model:
+        cine_key = prediction_cache.key(cine_file.getvalue(), get_imaging_model_version())
+        cine = st.session_state.get("cine_study")
+        if cine is None or cine[0] != cine_key:
+            progress = st.progress(0.0, text="Analyzing the cine loop...")
+            # The decoder opens the clip by name, which Windows refuses while it is
+            # still open for writing, so it is closed first and removed afterwards
+            with tempfile.NamedTemporaryFile(suffix=os.path.splitext(cine_file.name)[1], delete=False) as clip:
+                clip.write(cine_file.getvalue())
+            try:
+                study = classify_cine(imaging_model, clip.name, on_progress=lambda done: progress.progress(done, text="Analyzing the cine loop..."))
+                cine = st.session_state["cine_study"] = (cine_key, study)
+            except ValueError as e:
+                cine = None
+                st.error(f"An error occurred: {e}")
+            finally:
+                os.unlink(clip.name)
+            progress.empty()
+        if cine is not None:
+            study = cine[1]
+            st.write(f"### **Cine Loop Result:** {study.result(threshold)}")
+            st.write(f"**Mean Prediction Confidence:** {study.mean_score * 100:.1f}%")
+            st.write(f"Frames classified as Infected: {study.infected_fraction(threshold):.0%}")
+            st.caption(
+                f"{study.frames_scored} of {study.frames_total} frames scored at {study.scored_frames_per_sec:.0f} frames/sec "
+                f"({study.realtime_factor:.1f}x real time)"
+            )
+            st.dataframe(
+                pd.DataFrame(study.suspicious_frames()).rename(
+                    columns={"frame": "Frame", "time_s": "Time (s)", "score": "Prediction Confidence"}
+                ),
+                hide_index=True,
+            )
+
+    cache_stats = prediction_cache.stats()
+    st.sidebar.caption(f"Prediction cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
 
 # Footer note
 st.markdown("""
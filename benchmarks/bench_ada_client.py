@@ -0,0 +1,92 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from modules.ada_chat import ADA_MODEL, ADA_TEMPERATURE, create_llm, format_prompt
+
+
+# The previous setup: a blocking langchain client per call with the SDK's
+# default retries and no deadline, streamed like the pages stream answers
+def per_call_client(base_url):
+    from langchain_openai import ChatOpenAI
+
+    def ask(prompt):
+        llm = ChatOpenAI(model=ADA_MODEL, temperature=ADA_TEMPERATURE, api_key="sk-fake", base_url=base_url)
+        return "".join(chunk.content for chunk in llm.stream(prompt))
+
+    return ask
+
+
+def pooled_client(base_url, **options):
+    return create_llm("sk-fake", base_url=base_url, **options).invoke
+
+
+CONFIGS = {
+    "client per call": lambda url, args: per_call_client(url),
+    "pooled + retries": lambda url, args: pooled_client(
+        url, first_token_timeout=args.first_token_timeout_ms / 1000.0, backoff_ms=args.backoff_ms,
+    ),
+    "pooled + hedging": lambda url, args: pooled_client(
+        url, first_token_timeout=args.first_token_timeout_ms / 1000.0, backoff_ms=args.backoff_ms,
+        hedge_after_ms=args.hedge_after_ms,
+    ),
+}
+
+
+# Concurrent sessions asking back to back; returns per-question latencies and errors
+def run_sessions(ask, sessions, questions):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def session(index):
+        for i in range(questions):
+            prompt = format_prompt(f"Question {index}-{i} about PCOS", "English")
+            start = time.perf_counter()
+            try:
+                ask(prompt)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ada answer latency with slow and failing upstream requests.")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions")
+    parser.add_argument("--questions", type=int, default=25, help="Questions asked by each session")
+    parser.add_argument("--ttft-ms", type=float, default=100)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--error-fraction", type=float, default=0.03)
+    parser.add_argument("--first-token-timeout-ms", type=float, default=1500)
+    parser.add_argument("--backoff-ms", type=float, default=100)
+    parser.add_argument("--hedge-after-ms", type=float, default=250)
+    args = parser.parse_args(argv)
+
+    print(f"{'client':<20}{'answers':>8}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'connections':>13}")
+    for name, build in CONFIGS.items():
+        with FakeOpenAIServer(
+            ttft_ms=args.ttft_ms, token_ms=2, tokens=20, slow_fraction=args.slow_fraction,
+            slow_ms=args.slow_ms, error_fraction=args.error_fraction,
+        ) as server:
+            latencies, errors = run_sessions(build(server.url, args), args.sessions, args.questions)
+            connections = server.stats()["connections"]
+        ms = np.array(latencies) * 1000
+        print(f"{name:<20}{len(latencies):>8}{len(errors):>8}{np.percentile(ms, 50):>9.0f}{np.percentile(ms, 99):>9.0f}"
+              f"{connections:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from modules.ada_chat import AnswerStream, create_llm, format_prompt
+from modules.answer_cache import AnswerCache
+
+# Ways the same question arrives from different sessions after a newsletter
+VARIANTS = [
+    "What should I eat with PCOS?",
+    "what should I eat with PCOS",
+    "What should I eat with PCOS ?",
+    "WHAT SHOULD I EAT WITH PCOS?!",
+]
+
+
+# Sessions ask the same question, spread over `spread` seconds, and the first one
+# gives up after a few tokens. Every other session must still get the whole
+# answer, from one upstream call.
+def burst(llm, sessions, spread, seed=0):
+    rng = random.Random(seed)
+    answers, latencies = [None] * sessions, [None] * sessions
+
+    def session(index):
+        time.sleep(0 if index == 0 else rng.uniform(0, spread))
+        question = VARIANTS[index % len(VARIANTS)]
+        stream = AnswerStream(llm, format_prompt(question, "English"), AnswerCache.key(question, "English"))
+        parts = []
+        for i, text in enumerate(stream):
+            parts.append(text)
+            if index == 0 and i == 2:
+                stream.cancel()
+        answers[index] = "".join(parts)
+        latencies[index] = stream.total_seconds
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return answers, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent identical Ada questions share one upstream call.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--spread-ms", type=float, default=1000, help="Window over which the sessions ask")
+    parser.add_argument("--ttft-ms", type=float, default=500)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args(argv)
+
+    with FakeOpenAIServer(ttft_ms=args.ttft_ms, token_ms=args.token_ms, tokens=60) as server:
+        llm = create_llm("sk-fake", base_url=server.url)
+        answers, latencies = burst(llm, args.sessions, args.spread_ms / 1000.0)
+        upstream = server.stats()["requests"]
+        expected = server.answer(format_prompt(VARIANTS[0], "English"))
+
+    stats = llm.stats()
+    complete = sum(answer == expected for answer in answers[1:])
+    ms = np.array(latencies[1:]) * 1000
+    print(f"{args.sessions} sessions asked within {args.spread_ms:.0f} ms: {upstream} upstream call(s), "
+          f"{stats['coalesced']} requests coalesced, {complete}/{args.sessions - 1} complete answers")
+    print(f"Answer latency p50 {np.percentile(ms, 50):.0f} ms, p99 {np.percentile(ms, 99):.0f} ms")
+    assert upstream == 1, f"expected one upstream call, got {upstream}"
+    assert complete == args.sessions - 1, "a session received a partial or different answer"
+    assert answers[0] == expected[:len(answers[0])], "the cancelled session received a different answer"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from modules.ada_memory import ConversationMemory, turn_tokens
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "modules", "chatbot.py")
+
+
+def make_turn(i):
+    return {
+        "question": f"Follow-up question {i} about my PCOS meal plan?",
+        "response": " ".join(f"Answer {i} sentence {j} about balanced meals and regular exercise." for j in range(12)),
+        "language": "English",
+    }
+
+
+# Prompt size and the time to build the conversation part of the prompt, per
+# question, as one session grows to `turns` questions
+def grow_session(turns):
+    memory = ConversationMemory()
+    history, sizes, seconds = [], [], []
+    for i in range(turns):
+        start = time.perf_counter()
+        _, tokens = memory.prompt_history(history)
+        seconds.append(time.perf_counter() - start)
+        sizes.append(tokens)
+        history.append(make_turn(i))
+    return history, sizes, seconds
+
+
+# Rerun time of the chat page with a history of `turns` questions already asked
+def rerun_seconds(turns, repeat=5):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(PAGE, default_timeout=60)
+    at.session_state["api_key"] = "sk-fake"
+    at.session_state["chat_history"] = [make_turn(i) for i in range(turns)]
+    at.run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    assert not at.exception, [e.value for e in at.exception]
+    return float(np.median(samples))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ada's prompt size and page rerun time as a session grows.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args(argv)
+
+    # Page scripts resolve images and databases relative to the working directory
+    os.chdir(ROOT)
+    os.environ.setdefault("ANSWER_CACHE_DB", os.path.join(tempfile.mkdtemp(), "answers.db"))
+
+    print(f"{'turns':>6}{'full history':>14}{'memory':>9}{'build ms':>10}{'rerun ms':>10}")
+    for turns in args.turns:
+        history, sizes, seconds = grow_session(turns)
+        full = sum(turn_tokens(turn) for turn in history[:-1])
+        print(f"{turns:>6}{full:>14,}{sizes[-1]:>9,}{seconds[-1] * 1000:>10.3f}{rerun_seconds(turns) * 1000:>10.1f}")
+    print("full history and memory are the prompt tokens spent on the conversation for the last question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from modules.ada_chat import AnswerStream, create_llm, format_prompt
+
+QUESTION = "What should I eat to manage PCOS?"
+
+
+def percentiles(values):
+    ms = np.array(values) * 1000
+    return f"p50 {np.percentile(ms, 50):7.1f} ms   p90 {np.percentile(ms, 90):7.1f} ms"
+
+
+# Perceived latency of Ask Ada against the fake server: when the page can show
+# the first words of the answer, blocking versus streamed, and how quickly a
+# streamed answer stops when the user asks something else.
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time to first token of streamed Ask Ada answers.")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Fake server delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=25, help="Fake server delay between tokens")
+    parser.add_argument("--tokens", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    with FakeOpenAIServer(ttft_ms=args.ttft_ms, token_ms=args.token_ms, tokens=args.tokens) as server:
+        llm = create_llm("sk-fake", base_url=server.url)
+        prompt = format_prompt(QUESTION, "English")
+        llm.invoke(prompt)
+
+        blocking = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            llm.invoke(prompt)
+            blocking.append(time.perf_counter() - start)
+
+        first_token, total = [], []
+        for _ in range(args.requests):
+            stream = AnswerStream(llm, prompt)
+            text = "".join(stream)
+            assert text == server.answer(prompt), "streamed answer differs from the server's"
+            first_token.append(stream.first_token_seconds)
+            total.append(stream.total_seconds)
+
+        # Cancel after a few tokens, as when a new question is submitted mid-answer
+        stopped = []
+        for _ in range(args.requests):
+            stream = AnswerStream(llm, prompt)
+            for i, _token in enumerate(stream):
+                if i == 5:
+                    stream.cancel()
+                    cancelled_at = time.perf_counter()
+            stopped.append(time.perf_counter() - cancelled_at)
+            assert stream.cancelled
+
+    print(f"blocking invoke, first words   {percentiles(blocking)}")
+    print(f"streamed, first token          {percentiles(first_token)}")
+    print(f"streamed, full answer          {percentiles(total)}")
+    print(f"streamed, stop after cancel    {percentiles(stopped)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+# A clinician filling in the Clinical Diagnosis form field by field, predicting and
+# then exploring the what-if chart, as (widget type, label, value, fragment). The
+# fragment is the function in Diagnosis.py that the widget is drawn in; scripts
+# without that fragment get a full rerun instead, as the browser would trigger.
+REPLAY = [
+    ("text_input", "Patient's Name", "Jane Doe", "clinical_patient_details"),
+    ("slider", "Patient's Age", 31, "clinical_patient_details"),
+    ("text_area", "Additional Notes (Optional)", "Irregular cycles since 2021", "clinical_patient_details"),
+    ("selectbox", "Average Menstrual Cycle Length", "35–60 days", "clinical_patient_details"),
+    ("radio", "Tendency to grow dark, coarse hair?", "Yes", "clinical_patient_details"),
+    ("number_input", "Number of follicles seen in ultrasound", 14, "clinical_patient_details"),
+    ("number_input", "Volume of ovaries (in cm³)", 11.5, "clinical_patient_details"),
+    ("number_input", "Weight (kg):", 78.0, "clinical_bmi"),
+    ("number_input", "Height (cm):", 165.0, "clinical_bmi"),
+    ("number_input", "Fasting Glucose Level (mg/dL)", 96.0, "clinical_measurements"),
+    ("number_input", "Fasting Insulin Level (µIU/mL)", 18.0, "clinical_measurements"),
+    ("number_input", "LH/FSH Ratio", 2.6, "clinical_measurements"),
+    ("number_input", "AMH (Anti-Müllerian Hormone) Level (ng/mL)", 7.8, "clinical_measurements"),
+    ("number_input", "DHEAS (Dehydroepiandrosterone sulfate) Level (µg/dL)", 310.0, "clinical_measurements"),
+    ("number_input", "Prolactin Level (ng/mL)", 14.0, "clinical_measurements"),
+    ("number_input", "TSH (Thyroid Stimulating Hormone) Level (mIU/L)", 2.1, "clinical_measurements"),
+    ("number_input", "Free Testosterone Level (pg/mL)", 4.2, "clinical_measurements"),
+    ("number_input", "Random Blood Sugar Level (mg/dL)", 118.0, "clinical_measurements"),
+    ("slider", "Symptom Severity (1 to 10)", 7, "clinical_measurements"),
+    ("button", "Predict PCOS Likelihood", None, "clinical_measurements"),
+    ("selectbox", "Measurement to vary", "AMH", "clinical_measurements"),
+]
+
+
+# Runs of the test harness start from an empty message queue and always rerun the
+# whole script. For a fragment step the previous run's messages are queued first
+# and the rerun is scoped to the fragment, so only its elements are replaced, as
+# in a browser session.
+class FragmentReplay:
+    def __init__(self):
+        self.fragment_id = None
+        self.messages = []
+        self._run = local_script_runner.LocalScriptRunner.run
+        self._rerun_data = local_script_runner.RerunData
+
+    def _patched_run(self, runner, *args, **kwargs):
+        if self.fragment_id is not None:
+            for msg in self.messages:
+                runner.forward_msg_queue.enqueue(msg)
+        try:
+            return self._run(runner, *args, **kwargs)
+        finally:
+            self.messages = list(runner.forward_msgs())
+
+    def _patched_rerun_data(self, **kwargs):
+        if self.fragment_id is not None:
+            kwargs["fragment_id_queue"] = [self.fragment_id]
+        return self._rerun_data(**kwargs)
+
+    @contextlib.contextmanager
+    def installed(self):
+        replay = self
+        local_script_runner.LocalScriptRunner.run = lambda runner, *args, **kwargs: replay._patched_run(runner, *args, **kwargs)
+        local_script_runner.RerunData = self._patched_rerun_data
+        try:
+            yield self
+        finally:
+            local_script_runner.LocalScriptRunner.run = self._run
+            local_script_runner.RerunData = self._rerun_data
+
+
+def find_fragment(at, name):
+    for fragment_id, fragment in at._fragment_storage._fragments.items():
+        for cell in fragment.__closure__ or ():
+            with contextlib.suppress(ValueError):
+                if getattr(cell.cell_contents, "__name__", None) == name:
+                    return fragment_id
+    return None
+
+
+def find_widget(at, kind, label):
+    for widget in at.get(kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No {kind} labelled {label!r} on the page.")
+
+
+# Replays REPLAY once and returns (step, rerun kind, wall seconds, CPU seconds) per
+# interaction that reached the server. Fields inside a form only send their value
+# with the submit button, so setting them costs no rerun.
+def replay(script, replayer, timeout):
+    at = AppTest.from_file(script, default_timeout=timeout)
+    replayer.fragment_id = None
+    at.run()
+    at.sidebar.radio[0].set_value("Clinical Diagnosis").run()
+    timings = []
+    for kind, label, value, fragment in REPLAY:
+        widget = find_widget(at, kind, label)
+        if kind == "button":
+            widget.click()
+        else:
+            widget.set_value(value)
+        if kind != "button" and widget.proto.form_id:
+            continue
+        replayer.fragment_id = find_fragment(at, fragment)
+        wall, cpu = time.perf_counter(), time.process_time()
+        at.run()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if at.exception:
+            raise RuntimeError(f"{label}: {at.exception[0].value}")
+        timings.append((label, "fragment" if replayer.fragment_id else "full", wall, cpu))
+    replayer.fragment_id = None
+    return timings
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(script, repeat, timeout):
+    replayer = FragmentReplay()
+    with replayer.installed():
+        replay(script, replayer, timeout)  # warm-up: loads the model and fills the caches
+        runs = [replay(script, replayer, timeout) for _ in range(repeat)]
+    steps = [step for run in runs for step in run]
+    walls = [wall for _, _, wall, _ in steps]
+    return {
+        "reruns": len(runs[0]),
+        "fragment_reruns": sum(kind == "fragment" for _, kind, _, _ in runs[0]),
+        "total_wall_ms": statistics.median(sum(wall for _, _, wall, _ in run) for run in runs) * 1000,
+        "total_cpu_ms": statistics.median(sum(cpu for _, _, _, cpu in run) for run in runs) * 1000,
+        "p50_ms": percentile(walls, 0.5) * 1000,
+        "p90_ms": percentile(walls, 0.9) * 1000,
+    }
+
+
+# Writes Diagnosis.py as of a git revision next to the current one, so that it
+# finds the same modules and images
+@contextlib.contextmanager
+def script_at_revision(rev):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:Diagnosis.py"], cwd=ROOT, check=True, stdout=subprocess.PIPE
+    ).stdout
+    path = os.path.join(ROOT, f"_replay_{rev.replace('/', '_')}_Diagnosis.py")
+    with open(path, "wb") as f:
+        f.write(source)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rerun latency and CPU of a scripted Clinical Diagnosis session.")
+    parser.add_argument("--rev", help="Also replay Diagnosis.py as of this git revision, e.g. HEAD~1")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed replays per script")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    scripts = [("working tree", contextlib.nullcontext(os.path.join(ROOT, "Diagnosis.py")))]
+    if args.rev:
+        scripts.insert(0, (args.rev, script_at_revision(args.rev)))
+
+    print(f"{'Diagnosis.py':<14}{'reruns':>8}{'fragment':>10}{'total ms':>10}{'CPU ms':>9}{'p50 ms':>9}{'p90 ms':>9}")
+    for name, context in scripts:
+        with context as script:
+            result = measure(script, args.repeat, args.timeout)
+        print(f"{name:<14}{result['reruns']:>8}{result['fragment_reruns']:>10}{result['total_wall_ms']:>10.1f}"
+              f"{result['total_cpu_ms']:>9.1f}{result['p50_ms']:>9.1f}{result['p90_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
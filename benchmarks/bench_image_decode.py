@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from modules.batch_imaging import peak_memory_mb
+from modules.imaging import IMAGE_SIZE, decode_image, normalize
+
+SIZES = [(1024, 768), (2048, 1536), (4000, 3000), (5472, 3648)]
+
+
+# The preprocessing the imaging page used before the decode stage: full-resolution
+# decode, then resize, then img_to_array(img) / 255.0
+def baseline_preprocess(path):
+    img = Image.open(path).convert("RGB")
+    img = img.resize(IMAGE_SIZE)
+    return np.asarray(img, dtype="float32") / 255.0
+
+
+def reduced_preprocess(path):
+    return normalize(decode_image(path, draft=True))
+
+
+PIPELINES = {"before": baseline_preprocess, "after": reduced_preprocess}
+
+
+# Smooth speckled images compress and downscale more like ultrasound exports than pure noise
+def make_image(path, size, seed):
+    rng = np.random.default_rng(seed)
+    coarse = Image.fromarray(rng.integers(0, 255, (24, 32), dtype=np.uint8)).resize(size, Image.BICUBIC)
+    pixels = np.asarray(coarse, dtype=np.float32) + rng.normal(0, 12, (size[1], size[0]))
+    gray = np.clip(pixels, 0, 255).astype(np.uint8)
+    Image.fromarray(gray).convert("RGB").save(path, quality=90)
+
+
+def measure(path, pipeline, repeat):
+    baseline = peak_memory_mb() or 0.0
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        PIPELINES[pipeline](path)
+        timings.append(time.perf_counter() - start)
+    return {"ms": float(np.median(timings) * 1000), "peak_mb": (peak_memory_mb() or 0.0) - baseline}
+
+
+# Each measurement runs in a fresh process so peak RSS reflects only that decode
+def run_measure(path, pipeline, repeat):
+    command = [sys.executable, "-m", "benchmarks.bench_image_decode", "--measure", path, pipeline, "--repeat", str(repeat)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode time, peak memory and parity of image preprocessing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Decodes timed per image size")
+    parser.add_argument("--model", help="Also compare model scores before and after, using this Keras model")
+    parser.add_argument("--measure", nargs=2, metavar=("PATH", "PIPELINE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure, args.repeat)))
+        return
+
+    model = None
+    if args.model:
+        from modules.imaging import load_keras_model
+
+        model = load_keras_model(args.model)
+
+    print(f"{'size':>11}{'before ms':>11}{'after ms':>10}{'before MB':>11}{'after MB':>10}{'mean |px|':>11}{'max |px|':>10}"
+          + (f"{'|score|':>10}" if model else ""))
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, size in enumerate(SIZES):
+            path = os.path.join(tmp, f"{size[0]}x{size[1]}.jpg")
+            make_image(path, size, seed=i)
+            before = run_measure(path, "before", args.repeat)
+            after = run_measure(path, "after", args.repeat)
+
+            full, reduced = baseline_preprocess(path), reduced_preprocess(path)
+            diff = np.abs(full - reduced)
+            line = (f"{size[0]:>5}x{size[1]:<5}{before['ms']:>11.1f}{after['ms']:>10.1f}{before['peak_mb']:>11.1f}"
+                    f"{after['peak_mb']:>10.1f}{diff.mean():>11.4f}{diff.max():>10.4f}")
+            if model:
+                scores = model.predict(np.stack([full, reduced]), verbose=0)[:, 0]
+                line += f"{abs(scores[0] - scores[1]):>10.4f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from modules.imaging import IMAGE_SIZE, load_imaging_model
+from modules.imaging_pool import ImagingPool
+
+
+# Every client thread sends requests back to back, like sessions uploading studies
+def run_clients(predict, batch, clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            predict(batch, batch_size=len(batch), verbose=0)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "images_per_sec": len(latencies) * len(batch) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Imaging throughput with 1..N inference worker processes.")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, max(1, cores // 2), cores}))
+    parser.add_argument("--clients", type=int, default=2 * cores, help="Concurrent requesting threads")
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per request")
+    parser.add_argument("--requests", type=int, default=20, help="Requests issued by each client")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    batch = rng.random((args.batch_size, *IMAGE_SIZE, 3), dtype=np.float32)
+
+    print(f"{'mode':<14}{'clients':>8}{'img/s':>10}{'speedup':>9}{'p50 ms':>10}{'p99 ms':>10}")
+    model = load_imaging_model()
+    model.predict(batch, batch_size=len(batch), verbose=0)
+    result = run_clients(model.predict, batch, args.clients, args.requests)
+    print(f"{'in-process':<14}{args.clients:>8}{result['images_per_sec']:>10.1f}{'':>9}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+    del model
+
+    single_worker = None
+    for workers in args.workers:
+        pool = ImagingPool(workers)
+        try:
+            pool.predict(batch)
+            result = run_clients(pool.predict, batch, args.clients, args.requests)
+        finally:
+            pool.close()
+        single_worker = single_worker or result["images_per_sec"]
+        mode = f"{workers} worker" + ("s" if workers > 1 else "")
+        print(f"{mode:<14}{args.clients:>8}{result['images_per_sec']:>10.1f}{result['images_per_sec'] / single_worker:>8.2f}x"
+              f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
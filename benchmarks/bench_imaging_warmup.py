@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, environment) of the inference settings compared; a direct-call batch
+# limit of 0 sends every batch through Model.predict, as before
+CONFIGS = [
+    ("predict", {"IMAGING_WARMUP": "0", "IMAGING_DIRECT_CALL_MAX_BATCH": "0"}),
+    ("predict+warmup", {"IMAGING_WARMUP": "1", "IMAGING_DIRECT_CALL_MAX_BATCH": "0"}),
+    ("direct", {"IMAGING_WARMUP": "0"}),
+    ("direct+warmup", {"IMAGING_WARMUP": "1"}),
+]
+
+# Loads the model in a fresh process, as a new pod would, then times the first
+# and the following single-image and batch predictions
+CHILD = """
+import json, sys, time
+import numpy as np
+start = time.perf_counter()
+from modules.imaging import load_imaging_model, preprocess_image
+model = load_imaging_model()
+load_seconds = time.perf_counter() - start
+image = preprocess_image(sys.argv[1])[np.newaxis]
+batch = np.repeat(image, int(sys.argv[3]), axis=0)
+
+def timed(inputs):
+    start = time.perf_counter()
+    model.predict(inputs, batch_size=len(inputs), verbose=0)
+    return (time.perf_counter() - start) * 1000
+
+first_single = timed(image)
+single = [timed(image) for _ in range(int(sys.argv[2]))]
+first_batch = timed(batch)
+batches = [timed(batch) for _ in range(max(3, int(sys.argv[2]) // 10))]
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "first_single_ms": first_single,
+    "single_p50_ms": float(np.percentile(single, 50)),
+    "single_p99_ms": float(np.percentile(single, 99)),
+    "first_batch_ms": first_batch,
+    "batch_p50_ms": float(np.percentile(batches, 50)),
+}))
+"""
+
+
+def measure(image_path, env, runs, batch_size):
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, image_path, str(runs), str(batch_size)],
+        cwd=ROOT, env={**os.environ, **env}, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="First-call vs. steady-state imaging latency per inference setting.")
+    parser.add_argument("image", nargs="?", help="Ultrasound image to score (default: a synthetic JPEG)")
+    parser.add_argument("--intra-op-threads", type=int, nargs="+", default=[0], help="Values of IMAGING_INTRA_OP_THREADS (0: TensorFlow default)")
+    parser.add_argument("--inter-op-threads", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=50, help="Steady-state single-image predictions")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    image_path = args.image
+    if image_path is None:
+        from benchmarks.bench_image_decode import make_image
+
+        image_path = tempfile.mkstemp(suffix=".jpg")[1]
+        make_image(image_path, (1024, 768), seed=0)
+
+    results = []
+    try:
+        print(f"{'setting':<16}{'threads':>8}{'load s':>8}{'first ms':>10}{'p50 ms':>8}{'p99 ms':>8}"
+              f"{'first batch ms':>16}{'batch p50 ms':>14}")
+        for threads in args.intra_op_threads:
+            for name, env in CONFIGS:
+                env = {**env, "IMAGING_INTRA_OP_THREADS": str(threads), "IMAGING_INTER_OP_THREADS": str(args.inter_op_threads)}
+                result = measure(image_path, env, args.runs, args.batch_size)
+                results.append({"setting": name, "intra_op_threads": threads, **result})
+                print(f"{name:<16}{threads or 'auto':>8}{result['load_seconds']:>8.2f}{result['first_single_ms']:>10.1f}"
+                      f"{result['single_p50_ms']:>8.1f}{result['single_p99_ms']:>8.1f}"
+                      f"{result['first_batch_ms']:>16.1f}{result['batch_p50_ms']:>14.1f}")
+    finally:
+        if args.image is None:
+            os.remove(image_path)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from modules.clinical import CLINICAL_FEATURES, load_clinical_model
+from modules.inference_service import MicroBatcher, clinical_batch_predictor
+
+SAMPLE_PATIENT = {
+    "Age": 25, "BMI": 27.4, "FastingGlucose": 95.0, "FastingInsulin": 14.0, "LH_FSH_Ratio": 2.1, "AMH": 5.2,
+    "DHEAS": 250.0, "Prolactin": 18.0, "TSH": 2.2, "FreeTestosterone": 3.1, "BloodSugar": 110.0, "Score": 6,
+}
+
+
+# Every client thread issues requests back to back, like sessions clicking Predict
+def run_clients(predict, concurrency, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            predict(SAMPLE_PATIENT)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput vs. p99 latency of the clinical micro-batcher.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--max-batch-size", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--requests", type=int, default=50, help="Requests issued by each client")
+    args = parser.parse_args(argv)
+
+    model = load_clinical_model()
+    predict_batch = clinical_batch_predictor(model)
+    predict_batch([dict(zip(CLINICAL_FEATURES, [0] * len(CLINICAL_FEATURES)))])
+
+    print(f"{'mode':<24}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        direct = run_clients(lambda row: predict_batch([row])[0], concurrency, args.requests)
+        print(f"{'direct':<24}{concurrency:>8}{direct['throughput']:>10.0f}{direct['p50_ms']:>10.2f}{direct['p99_ms']:>10.2f}")
+        for max_batch_size in args.max_batch_size:
+            for max_wait_ms in args.max_wait_ms:
+                batcher = MicroBatcher(predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+                result = run_clients(batcher.predict, concurrency, args.requests)
+                batcher.close()
+                mode = f"batch={max_batch_size} wait={max_wait_ms:g}ms"
+                print(f"{mode:<24}{concurrency:>8}{result['throughput']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
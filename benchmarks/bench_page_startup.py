@@ -0,0 +1,98 @@
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "pcos_management_app.py")
+
+# Pages registered in pcos_management_app.py
+PAGES = [
+    "Diagnosis.py",
+    "modules/ada.py",
+    "modules/chatbot.py",
+    "modules/lifestyle.py",
+    "modules/Telemedicine.py",
+    "modules/community.py",
+]
+
+# Dependencies that should only be imported once their page needs them
+HEAVY_MODULES = ["tensorflow", "keras", "langchain", "langchain_community", "sklearn", "joblib", "matplotlib", "cv2"]
+
+RENDER_MARKER = "--- first render ---"
+
+# Opens one page of the router in a fresh interpreter started with -X importtime;
+# the marker on stderr separates Streamlit's own imports from the page's
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import_seconds = time.perf_counter() - start
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+if sys.argv[2] != "Diagnosis.py":
+    at.switch_page(sys.argv[2])
+print(sys.argv[3], file=sys.stderr, flush=True)
+start = time.perf_counter()
+at.run()
+render_seconds = time.perf_counter() - start
+print(json.dumps({
+    "streamlit_import_seconds": import_seconds,
+    "first_render_seconds": render_seconds,
+    "heavy_modules": [m for m in json.loads(sys.argv[4]) if m in sys.modules],
+    "errors": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+# Sums -X importtime's cumulative microseconds of top-level imports per package
+def import_profile(stderr_lines):
+    totals = collections.Counter()
+    for line in stderr_lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        totals[name.strip().split(".")[0]] += int(cumulative)
+    return totals
+
+
+def profile_page(page):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, APP, page, RENDER_MARKER, json.dumps(HEAVY_MODULES)],
+        cwd=ROOT, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    stderr_lines = completed.stderr.splitlines()
+    marker = stderr_lines.index(RENDER_MARKER) if RENDER_MARKER in stderr_lines else 0
+    result["page_imports_ms"] = {name: us / 1000 for name, us in import_profile(stderr_lines[marker:]).most_common()}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-first-render and import profile of every page of the app.")
+    parser.add_argument("--pages", nargs="*", default=PAGES, help="Page scripts to open (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest page imports listed per page")
+    parser.add_argument("--json", help="Also write the full results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'page':<26}{'streamlit s':>12}{'render s':>10}  heavy modules loaded / slowest imports during render")
+    for page in args.pages:
+        result = results[page] = profile_page(page)
+        imports = ", ".join(f"{name} {ms:.0f}ms" for name, ms in list(result["page_imports_ms"].items())[:args.top])
+        print(f"{page:<26}{result['streamlit_import_seconds']:>12.2f}{result['first_render_seconds']:>10.2f}  "
+              f"[{', '.join(result['heavy_modules']) or 'none'}] {imports}")
+        for error in result["errors"]:
+            print(f"{'':<26}error: {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "Managing PCOS often starts with balanced meals built around vegetables, lean protein and whole grains, "
+    "regular movement you enjoy, enough sleep and ways to keep stress low. Talk to your doctor before "
+    "changing any medication."
+).split()
+
+
+# Local stand-in for the OpenAI Chat Completions API, for benchmarks and tests
+# that must not call (or pay for) the real service. Latency is injected per
+# request: time to first token, time between tokens, and an optional share of
+# slow or failing requests. It speaks HTTP/1.1, so clients can keep connections alive.
+class FakeOpenAIServer:
+    def __init__(self, host="127.0.0.1", port=0, ttft_ms=200, token_ms=20, tokens=40,
+                 slow_fraction=0.0, slow_ms=2000, error_fraction=0.0, seed=0):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.error_fraction = error_fraction
+        self.requests = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "connections": self.connections}
+
+    # Returns (delay before the first token, whether to fail) for the next request
+    def _plan(self):
+        with self._lock:
+            self.requests += 1
+            slow = self._random.random() < self.slow_fraction
+            error = self._random.random() < self.error_fraction
+        return (self.slow_ms if slow else self.ttft_ms) / 1000.0, error
+
+    # Deterministic answer to a prompt, echoing the question it ends with
+    def answer(self, prompt):
+        question = " ".join(prompt.rsplit("Question:", 1)[-1].split()[:8])
+        words = [WORDS[i % len(WORDS)] for i in range(self.tokens)]
+        return (f"About {question}: " if question else "") + " ".join(words)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.stats())
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                try:
+                    self._complete()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on the answer, e.g. cancelled or lost a hedge
+                    self.close_connection = True
+
+            def _complete(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                first_token_delay, error = server._plan()
+                time.sleep(first_token_delay)
+                if error:
+                    self._send_json(503, {"error": {"message": "Injected failure", "type": "server_error"}})
+                    return
+                messages = body.get("messages") or [{}]
+                text = server.answer(str(messages[-1].get("content", "")))
+                model = body.get("model", "gpt-3.5-turbo")
+                if body.get("stream"):
+                    self._stream(text, model)
+                else:
+                    time.sleep(server.token_ms * server.tokens / 1000.0)
+                    self._send_json(200, {
+                        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": server.tokens, "total_tokens": server.tokens},
+                    })
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            # Server-sent events in chunked transfer encoding, one chunk per token
+            def _stream(self, text, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                tokens = text.split(" ")
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(server.token_ms / 1000.0)
+                    delta = {"content": token if i == 0 else " " + token}
+                    if i == 0:
+                        delta["role"] = "assistant"
+                    self._event({
+                        "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    })
+                self._event({
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                })
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _event(self, payload):
+                self._chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI-compatible Chat Completions API.")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=200, help="Delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=20, help="Delay between tokens")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens per answer")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Share of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=2000)
+    parser.add_argument("--error-fraction", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        port=args.port, ttft_ms=args.ttft_ms, token_ms=args.token_ms, tokens=args.tokens,
+        slow_fraction=args.slow_fraction, slow_ms=args.slow_ms, error_fraction=args.error_fraction,
+    )
+    print(f"Serving a fake OpenAI API at {server.url} (set OPENAI_BASE_URL to use it)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
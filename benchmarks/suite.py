@@ -0,0 +1,445 @@
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Settings that change which code path is measured, recorded with every run
+RECORDED_ENV = [
+    "IMAGING_RUNTIME", "IMAGING_DRAFT_DECODE", "IMAGING_WARMUP", "IMAGING_DIRECT_CALL_MAX_BATCH",
+    "IMAGING_INTRA_OP_THREADS", "IMAGING_INTER_OP_THREADS",
+    "CLINICAL_FAST_PATH", "CLINICAL_MAX_BATCH_SIZE", "CLINICAL_MAX_WAIT_MS",
+]
+
+SAMPLE_PATIENT = {
+    "Age": 25, "BMI": 27.4, "FastingGlucose": 95.0, "FastingInsulin": 14.0, "LH_FSH_Ratio": 2.1, "AMH": 5.2,
+    "DHEAS": 250.0, "Prolactin": 18.0, "TSH": 2.2, "FreeTestosterone": 3.1, "BloodSugar": 110.0, "Score": 6,
+}
+
+# Pages measured through Streamlit's headless test harness, with the sidebar
+# section selected before timing reruns (None for single-page scripts)
+PAGES = {
+    "diagnosis.symptom_tracker": ("Diagnosis.py", "Symptom Tracker"),
+    "diagnosis.clinical": ("Diagnosis.py", "Clinical Diagnosis"),
+    "diagnosis.imaging": ("Diagnosis.py", "🩺 Medical Imaging Diagnosis"),
+    "lifestyle": ("modules/lifestyle.py", None),
+}
+
+COLD_START_SCRIPTS = {
+    "app": "pcos_management_app.py",
+    "diagnosis": "Diagnosis.py",
+    "chatbot": "modules/chatbot.py",
+    "lifestyle": "modules/lifestyle.py",
+}
+
+# Runs in a fresh interpreter so every import and model load is paid again
+COLD_START_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run()
+print(json.dumps({"seconds": time.perf_counter() - start, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+
+# Fixtures shared by the benchmarks, built on first use so a filtered run only
+# loads the models it needs
+class Context:
+    def __init__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    @cached_property
+    def clinical_model(self):
+        from modules.clinical import load_clinical_model
+
+        return load_clinical_model()
+
+    @cached_property
+    def imaging_model(self):
+        from modules.imaging import load_imaging_model
+
+        return load_imaging_model()
+
+    # A 2048x1536 speckled JPEG, the size of a typical ultrasound export
+    @cached_property
+    def image_path(self):
+        from benchmarks.bench_image_decode import make_image
+
+        path = os.path.join(self.tmp.name, "scan.jpg")
+        make_image(path, (2048, 1536), seed=0)
+        return path
+
+    def patients(self, rows, seed=0):
+        import pandas as pd
+
+        from modules.clinical import CLINICAL_FEATURES
+        from modules.compiled_model import CompiledClinicalModel, sample_patients
+
+        compiled = CompiledClinicalModel.from_pipeline(self.clinical_model)
+        return pd.DataFrame(sample_patients(compiled, rows, seed), columns=CLINICAL_FEATURES)
+
+    def close(self):
+        self.tmp.cleanup()
+
+
+# Each benchmark's setup returns a sampler: a callable that performs the measured
+# operation and returns its duration in seconds, plus any errors it observed
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=20, warmup=1):
+    def register(setup):
+        BENCHMARKS[name] = {"setup": setup, "repeat": repeat, "warmup": warmup, "doc": setup.__doc__}
+        return setup
+
+    return register
+
+
+def timed(fn, number=1):
+    def sample():
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return (time.perf_counter() - start) / number, []
+
+    return sample
+
+
+@benchmark("risk.calculate_risk", repeat=50)
+def bench_calculate_risk(ctx):
+    """Symptom Tracker scoring, averaged over every combination of 11 answers."""
+    from modules.risk_scoring import calculate_risk
+
+    combinations = [list(answers) for answers in itertools.product((0, 1), repeat=11)]
+
+    def run():
+        for answers in combinations:
+            calculate_risk(answers)
+
+    sample = timed(run)
+    return lambda: (sample()[0] / len(combinations), [])
+
+
+@benchmark("risk.score_answers_1m", repeat=10)
+def bench_score_answers(ctx):
+    """Vectorized Rotterdam scoring of 1,000,000 answer lists."""
+    from modules.risk_scoring import ANSWER_COLUMNS, score_answers
+
+    answers = np.random.default_rng(0).integers(0, 2, size=(1000000, len(ANSWER_COLUMNS)), dtype=np.int8)
+    return timed(lambda: score_answers(answers))
+
+
+@benchmark("clinical.predict_proba_single", repeat=50)
+def bench_clinical_single(ctx):
+    """Pipeline predict_proba on one patient, as the Clinical Diagnosis form calls it."""
+    import pandas as pd
+
+    from modules.clinical import CLINICAL_FEATURES
+
+    model = ctx.clinical_model
+    frame = pd.DataFrame([SAMPLE_PATIENT])[CLINICAL_FEATURES].astype("float64")
+    return timed(lambda: model.predict_proba(frame))
+
+
+@benchmark("clinical.predict_proba_batch_1000", repeat=20)
+def bench_clinical_batch(ctx):
+    """Pipeline predict_proba on 1,000 patients in one call."""
+    model = ctx.clinical_model
+    frame = ctx.patients(1000)
+    return timed(lambda: model.predict_proba(frame))
+
+
+@benchmark("clinical.compiled_predict_one", repeat=50)
+def bench_clinical_compiled(ctx):
+    """Compiled model on one patient (CLINICAL_FAST_PATH=1)."""
+    from modules.compiled_model import ClinicalRecord, CompiledClinicalModel
+
+    compiled = CompiledClinicalModel.from_pipeline(ctx.clinical_model)
+    record = ClinicalRecord.from_form(SAMPLE_PATIENT)
+    return timed(lambda: compiled.predict_one(record), number=100)
+
+
+@benchmark("imaging.preprocess", repeat=20)
+def bench_imaging_preprocess(ctx):
+    """Decode, resize and normalize one 2048x1536 JPEG."""
+    from modules.imaging import preprocess_image
+
+    path = ctx.image_path
+    return timed(lambda: preprocess_image(path))
+
+
+@benchmark("imaging.predict_single", repeat=20)
+def bench_imaging_single(ctx):
+    """imaging_model.predict on one preprocessed image."""
+    from modules.imaging import preprocess_image
+
+    model = ctx.imaging_model
+    batch = preprocess_image(ctx.image_path)[np.newaxis]
+    return timed(lambda: model.predict(batch, verbose=0))
+
+
+@benchmark("imaging.predict_batch_32", repeat=10)
+def bench_imaging_batch(ctx):
+    """imaging_model.predict on a batch of 32 preprocessed images."""
+    from modules.imaging import preprocess_image
+
+    model = ctx.imaging_model
+    batch = np.repeat(preprocess_image(ctx.image_path)[np.newaxis], 32, axis=0)
+    return timed(lambda: model.predict(batch, batch_size=32, verbose=0))
+
+
+@benchmark("imaging.cine_300_frames", repeat=5)
+def bench_cine(ctx):
+    """Stream a 10 s, 30 fps 640x480 cine loop through the CNN, scoring every frame."""
+    from modules.cine import classify_cine, make_clip
+
+    model = ctx.imaging_model
+    path = os.path.join(ctx.tmp.name, "cine.mp4")
+    make_clip(path, seconds=10)
+    return timed(lambda: classify_cine(model, path, sample_fps=0, adaptive=False))
+
+
+@benchmark("results.save_10000", repeat=10)
+def bench_result_store(ctx):
+    """Save 10,000 results through the batching writer until all are committed."""
+    from modules.result_store import ResultStore
+
+    store = ResultStore(os.path.join(ctx.tmp.name, "results.db"))
+
+    def run():
+        for i in range(10000):
+            store.save("clinical", f"patient-{i % 500}", "PCOS Unlikely", score=12.5, details=SAMPLE_PATIENT)
+        store.flush()
+
+    return timed(run)
+
+
+@benchmark("reports.render_pdf", repeat=20)
+def bench_report(ctx):
+    """Render one clinical PDF report with a prepared template, as a report worker does."""
+    from modules.reports import ReportTemplate, pdf_bytes, sample_results
+
+    template = ReportTemplate()
+    result = sample_results(1)[0]
+    return timed(lambda: pdf_bytes(template.render(result)[0]), number=10)
+
+
+def cold_start(script):
+    def setup(ctx):
+        def sample():
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_START_CHILD, os.path.join(ROOT, script)],
+                cwd=ROOT, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            return result["seconds"], result["errors"]
+
+        return sample
+
+    setup.__doc__ = f"Fresh interpreter importing Streamlit and running {script} once."
+    return setup
+
+
+for _name, _script in COLD_START_SCRIPTS.items():
+    benchmark(f"cold_start.{_name}", repeat=3, warmup=0)(cold_start(_script))
+
+
+def page_rerun(script, section):
+    def setup(ctx):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=600)
+        at.run()
+        if section is not None:
+            at.sidebar.radio[0].set_value(section).run()
+
+        def sample():
+            start = time.perf_counter()
+            at.run()
+            return time.perf_counter() - start, [str(e.value) for e in at.exception]
+
+        return sample
+
+    setup.__doc__ = f"Full rerun of {script}" + (f" on the {section} section." if section else ".")
+    return setup
+
+
+for _name, (_script, _section) in PAGES.items():
+    benchmark(f"rerun.{_name}", repeat=10)(page_rerun(_script, _section))
+
+
+def summarize(samples):
+    ms = np.array(samples) * 1000
+    return {
+        "n": len(ms),
+        "min_ms": float(ms.min()),
+        "median_ms": float(np.median(ms)),
+        "mean_ms": float(ms.mean()),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "stdev_ms": float(ms.std()),
+    }
+
+
+def run_benchmark(ctx, name, repeat_scale=1.0):
+    spec = BENCHMARKS[name]
+    try:
+        sample = spec["setup"](ctx)
+        for _ in range(spec["warmup"]):
+            sample()
+        samples, errors = [], []
+        for _ in range(max(1, round(spec["repeat"] * repeat_scale))):
+            seconds, sample_errors = sample()
+            samples.append(seconds)
+            errors.extend(e for e in sample_errors if e not in errors)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    result = summarize(samples)
+    # The page raised while running (e.g. a missing asset or dependency); the
+    # timing only covers the script up to that point
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def select(patterns):
+    if not patterns:
+        return list(BENCHMARKS)
+    return [name for name in BENCHMARKS if any(fnmatch.fnmatch(name, p) for p in patterns)]
+
+
+def run(args):
+    names = select(args.only)
+    if not names:
+        sys.exit(f"No benchmarks match {args.only}.")
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "env": {key: os.environ[key] for key in RECORDED_ENV if key in os.environ},
+        },
+        "results": {},
+    }
+    ctx = Context()
+    try:
+        for name in names:
+            result = run_benchmark(ctx, name, args.repeat_scale)
+            report["results"][name] = result
+            if "error" in result:
+                print(f"{name:<40}{'failed':>12}  {result['error']}", file=sys.stderr)
+                continue
+            note = f"  ({len(result['errors'])} page error(s))" if "errors" in result else ""
+            print(f"{name:<40}{result['median_ms']:>12.4f} ms  p90 {result['p90_ms']:.4f} ms{note}", file=sys.stderr)
+    finally:
+        ctx.close()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(names)} results to {args.output}")
+
+
+# A benchmark regresses when the chosen statistic grows by more than the threshold
+def compare_results(baseline, current, stat="median_ms", threshold=0.1):
+    rows = []
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before = baseline["results"].get(name, {})
+        after = current["results"].get(name, {})
+        if stat not in before or stat not in after:
+            status = "new" if not before else "missing" if not after else "failed"
+            rows.append((name, before.get(stat), after.get(stat), None, status))
+            continue
+        change = after[stat] / before[stat] - 1 if before[stat] else 0.0
+        if change > threshold:
+            status = "REGRESSION"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, before[stat], after[stat], change, status))
+    return rows
+
+
+def compare(args):
+    for path, hint in (
+        (args.baseline, f"record one on the reference commit with `python -m benchmarks.suite run --output {args.baseline}`"),
+        (args.current, "write one with `python -m benchmarks.suite run --output <file>`"),
+    ):
+        if not os.path.exists(path):
+            sys.exit(f"No benchmark results at {path}; {hint}.")
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    stat = f"{args.stat}_ms"
+    rows = compare_results(baseline, current, stat, args.threshold)
+
+    def fmt(value):
+        return f"{value:>12.4f}" if value is not None else f"{'-':>12}"
+
+    print(f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'change':>10}  status")
+    for name, before, after, change, status in rows:
+        change_text = f"{change:>+10.1%}" if change is not None else f"{'-':>10}"
+        print(f"{name:<40}{fmt(before)}{fmt(after)}{change_text}  {status}")
+
+    if baseline["meta"].get("env") != current["meta"].get("env"):
+        print(f"Note: settings differ, baseline {baseline['meta'].get('env')} vs current {current['meta'].get('env')}")
+    regressions = [row for row in rows if row[4] in ("REGRESSION", "failed") or (args.strict and row[4] == "missing")]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%} ({args.stat}).")
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths and compare runs against a baseline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write the results as JSON")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write")
+    run_parser.add_argument("--only", nargs="*", help="Glob patterns of benchmarks to run, e.g. 'clinical.*'")
+    run_parser.add_argument("--repeat-scale", type=float, default=1.0, help="Multiply every benchmark's repeat count")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions of a run against a baseline")
+    compare_parser.add_argument("current", help="Results written by `run`")
+    compare_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results to compare against")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown that counts as a regression")
+    compare_parser.add_argument("--stat", choices=["min", "median", "mean", "p90"], default="median")
+    compare_parser.add_argument("--strict", action="store_true", help="Also fail when a baseline benchmark is missing")
+
+    commands.add_parser("list", help="List the available benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        compare(args)
+    else:
+        for name, spec in BENCHMARKS.items():
+            print(f"{name:<40}{spec['doc']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import streamlit as st
 
 # Image path
-TELEMEDICINE_PATH = "image10.jpg"
+TELEMEDICINE_PATH = "assets/image10.jpg"
 
 # Trusted Gynecologists Directory
 GYNECOLOGISTS_BY_STATE = {
@@ -89,11 +89,6 @@ GYNECOLOGISTS_BY_STATE = {
 
 # Define the Streamlit app
 def main():
-    st.set_page_config(
-        page_title="CycleCare AI - Telemedicine",
-        layout="wide",
-    )
-
     st.subheader("Telemedicine")
     
     try:
@@ -1,43 +1,12 @@
 import streamlit as st
-from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import HumanMessage
 
-# Set page configuration as the very first Streamlit command
-st.set_page_config(
-    page_title="CycleCare AI - Comprehensive PCOS Management",
-    layout="wide",
+from modules.ada_chat import LANGUAGES
+from modules.ada_ui import (
+    answer_question, cache_caption, faq_caption, get_answer_cache, get_content_index, get_faq_matcher, get_llm,
+    render_history,
 )
 
 
-# Read the OpenAI API key from Streamlit secrets
-openai_api_key = st.secrets["OPENAI_API_KEY"]
-
-# Initialize the language model using the API key from secrets
-llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0.7, openai_api_key=openai_api_key)
-
-# Define the prompt template
-prompt_template = ChatPromptTemplate.from_template(
-    """
-    You are Ada, a helpful health and lifestyle coach specializing in nutrition, exercise, and stress management for PCOS.
-    Use the context below to answer user queries. If the context is insufficient, provide general advice.
-    Please answer in {lang}.
-
-    Context:
-    {context}
-
-    Question: {input}
-    """
-)
-
-# Define language options for translation
-language_options = {
-    "English": "English",
-    "Yoruba": "Yoruba",
-    "Igbo": "Igbo",
-    "Hausa": "Hausa"
-}
-
 def main():
     st.title("CycleCare AI - Comprehensive PCOS Management")
     st.markdown(
@@ -72,44 +41,30 @@ def main():
 
     # Language selection for translation
     st.subheader("Choose Your Language")
-    selected_language = st.selectbox("Choose a language:", list(language_options.keys()))
+    selected_language = st.selectbox("Choose a language:", list(LANGUAGES))
     
     # Input for user queries
     user_input = st.text_input("💡 Curious about PCOS? Ask Ada!")
     
+    fresh = st.checkbox("Ask for a fresh answer", help="Generate a new answer instead of reusing an earlier one")
+
     if st.button("Submit"):
         if user_input.strip():
-            context = "PCOS-specific health advice, including nutrition, exercise, and stress management."
-            formatted_prompt = prompt_template.format(
-                context=context,
-                input=user_input,
-                lang=language_options[selected_language]
-            )
             try:
-                with st.spinner("Ada is thinking..."):
-                    response_text = llm.predict(formatted_prompt)
-                    
-                    # Save the question and response to chat history
-                    st.session_state.chat_history.append({
-                        "question": user_input,
-                        "response": response_text,
-                        "language": selected_language
-                    })
-                    
-                    # Display the current response
-                    st.markdown(f"### Ada's Response ({selected_language}):\n\n{response_text}")
+                # The OpenAI API key is read from Streamlit secrets
+                answer_question(
+                    lambda: get_llm(st.secrets["OPENAI_API_KEY"]), get_answer_cache(), get_content_index(),
+                    get_faq_matcher(), user_input, selected_language, fresh,
+                )
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
         else:
             st.warning("Please enter a question to receive advice.")
 
     # Display past responses
-    if st.session_state.chat_history:
-        st.subheader("Past Conversations")
-        for i, chat in enumerate(st.session_state.chat_history):
-            st.markdown(f"**Q{i+1}:** {chat['question']}")
-            st.markdown(f"**Ada's Response ({chat['language']}):** {chat['response']}")
-            st.markdown("---")
+    render_history(st.session_state.chat_history)
+    cache_caption(get_answer_cache())
+    faq_caption(get_faq_matcher())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Chat model behind Ask Ada. OPENAI_BASE_URL points it at any OpenAI-compatible
+# endpoint, such as benchmarks/fake_openai_server.py; unset uses api.openai.com.
+ADA_MODEL = os.environ.get("ADA_MODEL", "gpt-3.5-turbo")
+ADA_TEMPERATURE = float(os.environ.get("ADA_TEMPERATURE", "0.7"))
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+
+# Prompt sent to the model for every question
+PROMPT_TEMPLATE = """
+    You are Ada, a helpful health and lifestyle coach specializing in nutrition, exercise, and stress management for PCOS.
+    Use the context below to answer user queries. If the context is insufficient, provide general advice.
+    Use the conversation so far to understand follow-up questions.
+    Please answer in {lang}.
+
+    Context:
+    {context}
+
+    Conversation so far:
+    {history}
+
+    Question: {input}
+    """
+
+# Bump when the prompt changes, so answers cached for the old prompt are not reused
+TEMPLATE_VERSION = 2
+
+DEFAULT_CONTEXT = "PCOS-specific health advice, including nutrition, exercise, and stress management."
+NO_HISTORY = "This is the first question."
+
+# Languages Ada answers in, by the name shown in the language picker
+LANGUAGES = {
+    "English": "English",
+    "Yoruba": "Yoruba",
+    "Igbo": "Igbo",
+    "Hausa": "Hausa"
+}
+
+
+def format_prompt(question, lang, context=DEFAULT_CONTEXT, history=""):
+    return PROMPT_TEMPLATE.format(context=context, history=history or NO_HISTORY, input=question, lang=lang)
+
+
+# langchain is imported when the first question is asked. Every client in the
+# process shares one event loop and keep-alive connection pool (see ada_client).
+def create_llm(api_key, model=ADA_MODEL, temperature=ADA_TEMPERATURE, base_url=OPENAI_BASE_URL, **options):
+    from modules.ada_client import AdaClient
+
+    return AdaClient(api_key, model, temperature, base_url=base_url, **options)
+
+
+# One answer streamed from the model, iterated by st.write_stream. Records the
+# time to the first token and to the end of the answer. cancel() aborts the
+# request right away, so an answer nobody is reading anymore stops generating.
+class AnswerStream:
+    def __init__(self, llm, prompt, key=None):
+        self.llm = llm
+        self.prompt = prompt
+        self.key = key
+        self.first_token_seconds = None
+        self.total_seconds = None
+        self.cancelled = False
+        self._parts = []
+        self._cancel = threading.Event()
+        self._chunks = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        self._chunks = chunks = self.llm.stream(self.prompt, self.key)
+        try:
+            for text in chunks:
+                if self._cancel.is_set():
+                    break
+                if self.first_token_seconds is None:
+                    self.first_token_seconds = time.perf_counter() - start
+                self._parts.append(text)
+                yield text
+            self.cancelled = self._cancel.is_set()
+        except GeneratorExit:
+            # Abandoned mid-answer, e.g. the page reran for a new question
+            self.cancelled = True
+            raise
+        finally:
+            chunks.close()
+            self.total_seconds = time.perf_counter() - start
+            logger.info(
+                "Ada answer %s: first token %.3fs, total %.3fs, %d chars",
+                "cancelled" if self.cancelled else "done",
+                self.first_token_seconds or float("nan"), self.total_seconds, len(self.text),
+            )
+
+    def cancel(self):
+        self._cancel.set()
+        if self._chunks is not None:
+            self._chunks.close()
+
+    @property
+    def done(self):
+        return self.total_seconds is not None
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def metrics(self):
+        return {
+            "first_token_s": self.first_token_seconds,
+            "total_s": self.total_seconds,
+            "chars": len(self.text),
+            "cancelled": self.cancelled,
+        }
+
+
+def format_latency(metrics):
+    if metrics.get("first_token_s") is None:
+        return ""
+    return f"First words after {metrics['first_token_s']:.1f}s, full answer in {metrics['total_s']:.1f}s"
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import os
+import queue
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Request deadlines, retries and hedging for calls to the chat model, overridable
+# per deployment. ADA_HEDGE_AFTER_MS=0 never sends a hedged request.
+ADA_DEADLINE_S = float(os.environ.get("ADA_DEADLINE_S", "60"))
+ADA_FIRST_TOKEN_TIMEOUT_S = float(os.environ.get("ADA_FIRST_TOKEN_TIMEOUT_S", "15"))
+ADA_MAX_RETRIES = int(os.environ.get("ADA_MAX_RETRIES", "2"))
+ADA_BACKOFF_MS = float(os.environ.get("ADA_BACKOFF_MS", "250"))
+ADA_HEDGE_AFTER_MS = float(os.environ.get("ADA_HEDGE_AFTER_MS", "0"))
+ADA_MAX_CONNECTIONS = int(os.environ.get("ADA_MAX_CONNECTIONS", "32"))
+ADA_KEEPALIVE_S = float(os.environ.get("ADA_KEEPALIVE_S", "60"))
+
+_END = object()
+
+_loop = None
+_http_client = None
+_lock = threading.Lock()
+
+
+# One event loop per process, on a daemon thread, runs every model call, so
+# Streamlit's script threads only wait on a queue and connections are reused
+def background_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="ada-client", daemon=True).start()
+        return _loop
+
+
+# Keep-alive connection pool shared by every client in the process
+def shared_http_client():
+    global _http_client
+    import httpx
+
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=ADA_MAX_CONNECTIONS, max_keepalive_connections=ADA_MAX_CONNECTIONS,
+                    keepalive_expiry=ADA_KEEPALIVE_S,
+                ),
+                timeout=httpx.Timeout(ADA_DEADLINE_S, connect=5.0, read=ADA_FIRST_TOKEN_TIMEOUT_S),
+            )
+        return _http_client
+
+
+def _retryable(error):
+    import openai
+
+    return isinstance(error, (
+        asyncio.TimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError,
+    ))
+
+
+# A streamed answer read from a Streamlit script thread. close() may be called
+# from any thread and aborts the request on the event loop right away.
+class ClientStream:
+    def __init__(self, client, prompt, key=None):
+        self._queue = queue.Queue()
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(client, prompt, key), background_loop())
+
+    async def _pump(self, client, prompt, key):
+        try:
+            async for text in client.astream(prompt, key):
+                self._queue.put(text)
+            self._queue.put(_END)
+        except asyncio.CancelledError:
+            self._queue.put(_END)
+            raise
+        except BaseException as e:
+            self._queue.put(e)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = self._queue.get()
+        if item is _END:
+            raise StopIteration
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def close(self):
+        self._future.cancel()
+        self._queue.put(_END)
+
+
+# One upstream answer shared by every request asking the same question while it
+# is in flight. Tokens are kept, so a request that joins late replays them first.
+class _Flight:
+    def __init__(self):
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def publish(self, token=None, error=None, done=False):
+        if token is not None:
+            self.tokens.append(token)
+        self.error = error
+        self.done = done or error is not None
+        # Wake the current waiters; later waiters wait on a fresh event
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+# Chat model client on the shared loop and connection pool. Each attempt must
+# produce its first token within first_token_timeout; failed attempts are
+# retried with full-jitter exponential backoff until deadline. With hedge_after
+# set, an attempt still silent after that long gets a duplicate request and the
+# first to answer wins. Only the start of an answer is retried or hedged: once
+# tokens have been shown, a failure is raised to the caller. Concurrent
+# requests with the same key share a single upstream call; it is cancelled
+# only when every request waiting on it has gone.
+class AdaClient:
+    def __init__(
+        self, api_key, model, temperature, base_url=None, deadline=ADA_DEADLINE_S,
+        first_token_timeout=ADA_FIRST_TOKEN_TIMEOUT_S, max_retries=ADA_MAX_RETRIES,
+        backoff_ms=ADA_BACKOFF_MS, hedge_after_ms=ADA_HEDGE_AFTER_MS,
+    ):
+        from langchain_openai import ChatOpenAI
+
+        self.model = model
+        self.deadline = deadline
+        self.first_token_timeout = first_token_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff_ms / 1000.0
+        self.hedge_after = hedge_after_ms / 1000.0
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        # Retries and timeouts are handled here, across the whole request
+        self._llm = ChatOpenAI(
+            model=model, temperature=temperature, api_key=api_key, base_url=base_url,
+            max_retries=0, http_async_client=shared_http_client(),
+        )
+
+    # key identifies identical questions, e.g. AnswerCache.key(); defaults to the prompt
+    def stream(self, prompt, key=None):
+        return ClientStream(self, prompt, key)
+
+    def invoke(self, prompt, key=None):
+        return "".join(self.stream(prompt, key))
+
+    async def ainvoke(self, prompt, key=None):
+        return "".join([text async for text in self.astream(prompt, key)])
+
+    async def astream(self, prompt, key=None):
+        key = key or prompt
+        self.requests += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.ensure_future(self._fly(key, flight, prompt))
+        else:
+            self.coalesced += 1
+        flight.subscribers += 1
+        try:
+            sent = 0
+            while True:
+                if sent < len(flight.tokens):
+                    sent += 1
+                    yield flight.tokens[sent - 1]
+                elif flight.error is not None:
+                    raise flight.error
+                elif flight.done:
+                    return
+                else:
+                    await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if not flight.subscribers and not flight.task.done():
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    async def _fly(self, key, flight, prompt):
+        self.upstream_calls += 1
+        try:
+            async for text in self._upstream(prompt):
+                flight.publish(text)
+            flight.publish(done=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            flight.publish(error=e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    async def _upstream(self, prompt):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        chunks, first = await self._start(prompt, deadline)
+        try:
+            yield first
+            # A stalled stream is cut off by the pool's read timeout
+            async for chunk in chunks:
+                if loop.time() > deadline:
+                    raise asyncio.TimeoutError(f"Answer not finished within {self.deadline:.0f}s")
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            await chunks.aclose()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+        }
+
+    # Returns the open stream and its first non-empty token
+    async def _start(self, prompt, deadline):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - loop.time()
+            try:
+                return await asyncio.wait_for(self._hedged(prompt), min(self.first_token_timeout, remaining))
+            except Exception as e:
+                remaining = deadline - loop.time()
+                if attempt == self.max_retries or remaining <= 0 or not _retryable(e):
+                    self.failures += 1
+                    raise
+                delay = min(random.uniform(0, self.backoff * 2 ** attempt), remaining)
+                logger.warning("Ada request failed (%s); retrying in %.2fs", type(e).__name__, delay)
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def _hedged(self, prompt):
+        primary = asyncio.ensure_future(self._attempt(prompt))
+        if not self.hedge_after:
+            return await primary
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+            if done:
+                return primary.result()
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._attempt(prompt))
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if not winners:
+                    error = next(iter(done)).exception()
+                    continue
+                for loser in winners[1:]:
+                    await loser.result()[0].aclose()
+                if winners[0] is hedge:
+                    self.hedge_wins += 1
+                return winners[0].result()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _attempt(self, prompt):
+        chunks = self._llm.astream(prompt)
+        try:
+            async for chunk in chunks:
+                if chunk.content:
+                    return chunks, chunk.content
+        except BaseException:
+            await chunks.aclose()
+            raise
+        await chunks.aclose()
+        raise ValueError("The model returned an empty answer.")
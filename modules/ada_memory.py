@@ -0,0 +1,120 @@
+import functools
+import logging
+import os
+import re
+
+from modules.ada_chat import ADA_MODEL
+
+logger = logging.getLogger(__name__)
+
+# How much of a conversation Ada's prompt carries, overridable per deployment:
+# up to ADA_MEMORY_TURNS recent turns word for word, and a summary of the turns
+# before them, together within ADA_MEMORY_TOKENS tokens, of which the summary
+# may use ADA_SUMMARY_TOKENS
+ADA_MEMORY_TOKENS = int(os.environ.get("ADA_MEMORY_TOKENS", "1000"))
+ADA_MEMORY_TURNS = int(os.environ.get("ADA_MEMORY_TURNS", "3"))
+ADA_SUMMARY_TOKENS = int(os.environ.get("ADA_SUMMARY_TOKENS", "250"))
+# Past questions shown per page of the chat history
+ADA_HISTORY_PAGE_SIZE = int(os.environ.get("ADA_HISTORY_PAGE_SIZE", "5"))
+
+# Words of an answer kept in the summary
+SUMMARY_WORDS = 30
+
+
+# The model's tokenizer when tiktoken and its vocabulary are available,
+# otherwise None and token counts are estimated
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Not installed, or the vocabulary cannot be downloaded
+        logger.warning("Estimating token counts for Ada's memory: %s", e)
+        return None
+
+
+def count_tokens(text, model=ADA_MODEL):
+    encoding = _encoding(model)
+    if encoding is None:
+        # About four characters per token for English text
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def format_turn(turn):
+    return f"User: {turn['question']}\nAda: {turn['response']}"
+
+
+# A chat history entry's token count, counted once and kept on the entry
+def turn_tokens(turn):
+    if "tokens" not in turn:
+        turn["tokens"] = count_tokens(format_turn(turn))
+    return turn["tokens"]
+
+
+# One line per turn: the question and the start of Ada's answer
+def summarize_turn(turn):
+    answer = " ".join(re.sub(r"[*_#>`]", "", turn["response"]).split())
+    words = answer.split()
+    if len(words) > SUMMARY_WORDS:
+        answer = " ".join(words[:SUMMARY_WORDS]) + "..."
+    return f"- User asked: {turn['question']} Ada said: {answer}"
+
+
+# What Ada remembers of one session's conversation. Each rerun turns the chat
+# history into the conversation part of the prompt: the most recent turns as
+# they were, and a rolling summary of the older ones. A turn that no longer
+# fits is folded into the summary once, and the summary drops its oldest lines
+# to stay within its budget, so the prompt and the work per question stay the
+# same size however long the session runs.
+class ConversationMemory:
+    def __init__(
+        self, max_tokens=ADA_MEMORY_TOKENS, recent_turns=ADA_MEMORY_TURNS, summary_tokens=ADA_SUMMARY_TOKENS,
+    ):
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.folded = 0
+        self._summary = []
+        self._summary_used = 0
+
+    # The conversation so far, as text for the prompt, and its token count
+    def prompt_history(self, history):
+        if self.folded > len(history):
+            # The history was cleared
+            self.clear()
+        budget = self.max_tokens - min(self.summary_tokens, self.max_tokens)
+        start, used = len(history), 0
+        while start > self.folded and len(history) - start < self.recent_turns:
+            if used + turn_tokens(history[start - 1]) > budget:
+                break
+            start -= 1
+            used += turn_tokens(history[start])
+        while self.folded < start:
+            self._fold(history[self.folded])
+
+        parts = []
+        if self._summary:
+            parts.append("Earlier in the conversation:\n" + "\n".join(line for line, _ in self._summary))
+        parts.extend(format_turn(history[i]) for i in range(start, len(history)))
+        return "\n\n".join(parts), self._summary_used + used
+
+    def clear(self):
+        self.folded = 0
+        self._summary = []
+        self._summary_used = 0
+
+    def _fold(self, turn):
+        line = summarize_turn(turn)
+        tokens = count_tokens(line)
+        self._summary.append((line, tokens))
+        self._summary_used += tokens
+        while self._summary and self._summary_used > self.summary_tokens:
+            _, dropped = self._summary.pop(0)
+            self._summary_used -= dropped
+        self.folded += 1
@@ -0,0 +1,130 @@
+import streamlit as st
+
+from modules.ada_chat import LANGUAGES, AnswerStream, create_llm, format_latency, format_prompt
+from modules.ada_memory import ADA_HISTORY_PAGE_SIZE, ConversationMemory
+from modules.answer_cache import AnswerCache
+from modules.content_index import ContentIndex
+from modules.faq_matcher import FaqMatcher, format_answer
+
+# The client is shared by every session using the same key
+@st.cache_resource(show_spinner=False)
+def get_llm(api_key):
+    return create_llm(api_key)
+
+
+# Defined here rather than on each page, so both Ask Ada pages share one cache,
+# index and matcher per process
+@st.cache_resource(show_spinner=False)
+def get_answer_cache():
+    return AnswerCache()
+
+
+# Built from the app's PCOS content on first use, re-embedding only what changed
+@st.cache_resource(show_spinner=False)
+def get_content_index():
+    return ContentIndex.open()
+
+
+# Built once per process; matching a question takes well under a millisecond
+@st.cache_resource(show_spinner=False)
+def get_faq_matcher():
+    return FaqMatcher()
+
+
+# Answers one question on an Ask Ada page and adds it to the chat history. The
+# first English question of a conversation that the app's content already
+# answers gets that content. Other questions are answered from the answer cache
+# when it has the answer, otherwise streamed from the model with the best
+# matching passages of the content index and the conversation so far as
+# context. A new question cancels an answer that is still streaming.
+def answer_question(llm, cache, index, faq, question, language, fresh=False):
+    previous = st.session_state.pop("ada_stream", None)
+    if previous is not None and not previous.done:
+        previous.cancel()
+
+    if "ada_memory" not in st.session_state:
+        st.session_state.ada_memory = ConversationMemory()
+    history, history_tokens = st.session_state.ada_memory.prompt_history(st.session_state.chat_history)
+
+    # The curated content is written in English, and a follow-up question means
+    # something only together with the conversation before it
+    if not fresh and not history and LANGUAGES[language] == "English":
+        entry = faq.match(question)
+    else:
+        faq.skip()
+        entry = None
+    key = cache.key(question, LANGUAGES[language], content_version=index.version, history=history)
+    cached = cache.get(key, bypass=fresh) if entry is None else None
+    st.markdown(f"### Ada's Response ({language}):")
+    if entry is not None:
+        response_text = format_answer(entry)
+        st.markdown(response_text)
+        metrics = {"first_token_s": 0.0, "total_s": 0.0, "cached": False, "faq": True}
+        st.caption(
+            "Answered instantly from CycleCare AI's own guides. Tick \"Ask for a fresh answer\" to ask Ada instead."
+        )
+    elif cached is not None:
+        response_text = cached["answer"]
+        st.markdown(response_text)
+        metrics = {"first_token_s": 0.0, "total_s": 0.0, "cached": True, "faq": False}
+        st.caption(f"Answered instantly from earlier questions ({cached['seconds']:.1f}s faster)")
+    else:
+        # Sessions asking the same question at the same time share one model call
+        stream = st.session_state["ada_stream"] = AnswerStream(
+            llm(), format_prompt(question, LANGUAGES[language], index.context(question), history), key
+        )
+        response_text = st.write_stream(stream)
+        metrics = {**stream.metrics(), "cached": False, "faq": False}
+        st.caption(format_latency(metrics))
+        if not stream.cancelled:
+            cache.put(key, stream.text, stream.total_seconds, question, LANGUAGES[language])
+            faq.observe(stream.total_seconds)
+
+    st.session_state.chat_history.append({
+        "question": question,
+        "response": response_text,
+        "language": language,
+        "history_tokens": history_tokens,
+        **metrics,
+    })
+
+
+# The chat history a page at a time, newest page first, so a rerun renders the
+# same few entries however long the session has run
+def render_history(history, page_size=ADA_HISTORY_PAGE_SIZE):
+    if not history:
+        return
+    st.subheader("Past Conversations")
+    pages = -(-len(history) // page_size)
+    page = 1
+    if pages > 1:
+        page = st.number_input(
+            f"Page (1 is the most recent of {pages})", min_value=1, max_value=pages, value=1, key="ada_history_page"
+        )
+    end = len(history) - (page - 1) * page_size
+    for i in range(max(0, end - page_size), end):
+        chat = history[i]
+        st.markdown(f"**Q{i+1}:** {chat['question']}")
+        st.markdown(f"**Ada's Response ({chat['language']}):** {chat['response']}")
+        st.markdown("---")
+    memory = st.session_state.get("ada_memory")
+    if memory is not None and memory.folded:
+        st.caption("Ada remembers your most recent questions word for word and a short summary of the earlier ones.")
+
+
+def cache_caption(cache):
+    stats = cache.stats()
+    if stats["hits"] + stats["misses"]:
+        st.caption(
+            f"Answer cache: {stats['hit_rate']:.0%} of questions answered from earlier answers, "
+            f"{stats['seconds_saved']:.0f}s of waiting saved"
+        )
+
+
+def faq_caption(faq):
+    stats = faq.stats()
+    if stats["deflected"]:
+        st.caption(
+            f"Quick answers: {stats['deflection_rate']:.0%} of questions answered from CycleCare AI's guides, "
+            f"about {stats['seconds_saved']:.0f}s of waiting saved"
+        )
@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+
+from modules.ada_chat import ADA_MODEL, ADA_TEMPERATURE, TEMPLATE_VERSION
+from modules.result_store import connect
+
+# Answer caching for Ask Ada, overridable per deployment: ANSWER_CACHE=0 turns
+# it off, an empty ANSWER_CACHE_DB keeps answers in memory only
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE", "1") != "0"
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_DB = os.environ.get("ANSWER_CACHE_DB", "ada_answers.db")
+ANSWER_CACHE_TTL_HOURS = float(os.environ.get("ANSWER_CACHE_TTL_HOURS", "168"))
+ANSWER_CACHE_MAX_MB = float(os.environ.get("ANSWER_CACHE_MAX_MB", "64"))
+
+# Disk size is checked after this many writes rather than on every one
+EVICT_EVERY = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed_at);
+"""
+
+
+# Case, Unicode form, spacing and closing punctuation do not change the answer
+def normalize_question(question):
+    question = unicodedata.normalize("NFKC", question).casefold()
+    return " ".join(question.split()).rstrip("?!. ")
+
+
+# Ada's answers keyed on the normalized question and everything else that shapes
+# the answer: language, model, temperature, prompt template version, the
+# version of the content index the prompt's context comes from, and the earlier
+# conversation, so a follow-up is only reused after the same conversation.
+# Recent answers are kept in an in-memory LRU in front of a SQLite store shared
+# by all server processes. Entries expire after ttl_hours; the disk store drops
+# the least recently used answers once it grows past max_mb.
+class AnswerCache:
+    def __init__(
+        self, max_entries=ANSWER_CACHE_SIZE, path=ANSWER_CACHE_DB, ttl_hours=ANSWER_CACHE_TTL_HOURS,
+        max_mb=ANSWER_CACHE_MAX_MB, enabled=ANSWER_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.path = path or None
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.seconds_saved = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        if self.enabled and self.path:
+            with closing(connect(self.path)) as connection:
+                connection.executescript(SCHEMA)
+
+    @staticmethod
+    def key(
+        question, lang, model=ADA_MODEL, temperature=ADA_TEMPERATURE, template_version=TEMPLATE_VERSION,
+        content_version="", history="",
+    ):
+        fields = [
+            normalize_question(question), lang, model, float(temperature), template_version, content_version, history,
+        ]
+        return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+    # Returns {"answer", "seconds"} for a fresh cached answer, where seconds is how
+    # long it took to generate, or None. bypass=True counts the request but always
+    # misses, for users asking for a new answer.
+    def get(self, key, bypass=False):
+        if not self.enabled:
+            return None
+        if bypass:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return self._hit(entry)
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return self._hit(entry)
+
+    def put(self, key, answer, seconds, question="", lang=""):
+        if not self.enabled or not answer:
+            return
+        now = time.time()
+        entry = {"answer": answer, "seconds": float(seconds), "expires_at": now + self.ttl}
+        with self._lock:
+            self._remember(key, entry)
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+        if self.path:
+            with closing(connect(self.path)) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, question, lang, answer, float(seconds), now, now, len(answer.encode())),
+                )
+            if evict:
+                self.evict()
+
+    # Drops expired answers, then the least recently used until the store fits max_mb
+    def evict(self):
+        if not self.path:
+            return 0
+        with closing(connect(self.path)) as connection, connection:
+            removed = connection.execute("DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+            if total > self.max_bytes:
+                over = total - self.max_bytes
+                rows = connection.execute("SELECT key, size FROM answers ORDER BY accessed_at")
+                doomed = []
+                for key, size in rows:
+                    if over <= 0:
+                        break
+                    doomed.append((key,))
+                    over -= size
+                connection.executemany("DELETE FROM answers WHERE key = ?", doomed)
+                removed += len(doomed)
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with closing(connect(self.path)) as connection, connection:
+                connection.execute("DELETE FROM answers")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "seconds_saved": self.seconds_saved,
+                "entries": len(self._entries),
+            }
+
+    def _hit(self, entry):
+        self.hits += 1
+        self.seconds_saved += entry["seconds"]
+        return {"answer": entry["answer"], "seconds": entry["seconds"]}
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key, now):
+        if not self.path:
+            return None
+        try:
+            with closing(connect(self.path)) as connection, connection:
+                row = connection.execute(
+                    "SELECT answer, seconds, created_at FROM answers WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        answer, seconds, created_at = row
+        return {"answer": answer, "seconds": seconds, "expires_at": created_at + self.ttl}
+
+
+# Replays questions drawn from a skewed popularity distribution, the way a few
+# questions dominate real traffic, through the cache in front of the fake server
+def bench(path, requests=300, distinct=60, seed=0):
+    import numpy as np
+
+    from benchmarks.fake_openai_server import FakeOpenAIServer
+    from modules.ada_chat import create_llm, format_prompt
+
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, distinct + 1)
+    questions = rng.choice(distinct, size=requests, p=weights / weights.sum())
+    cache = AnswerCache(path=path)
+    latencies = []
+    with FakeOpenAIServer(ttft_ms=150, token_ms=2, tokens=40) as server:
+        llm = create_llm("sk-fake", base_url=server.url)
+        for i in questions:
+            question = f"What should I eat with PCOS, question {i}?"
+            start = time.perf_counter()
+            key = cache.key(question, "English")
+            cached = cache.get(key)
+            if cached is None:
+                answer = llm.invoke(format_prompt(question, "English"))
+                cache.put(key, answer, time.perf_counter() - start, question, "English")
+            latencies.append(time.perf_counter() - start)
+        upstream = server.stats()["requests"]
+    latencies = np.array(latencies) * 1000
+    return {
+        **cache.stats(),
+        "requests": requests,
+        "upstream_calls": upstream,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "mean_ms": float(latencies.mean()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and maintain the Ask Ada answer cache.")
+    parser.add_argument("--db", default=ANSWER_CACHE_DB, help=f"Cache database (default: {ANSWER_CACHE_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Count cached answers and their size")
+    commands.add_parser("evict", help="Drop expired answers and shrink the store to ANSWER_CACHE_MAX_MB")
+    commands.add_parser("clear", help="Drop every cached answer")
+    bench_parser = commands.add_parser("bench", help="Hit rate and latency on a scratch cache against the fake server")
+    bench_parser.add_argument("--requests", type=int, default=300)
+    bench_parser.add_argument("--distinct", type=int, default=60, help="Distinct questions asked")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        with tempfile.TemporaryDirectory() as scratch:
+            result = bench(os.path.join(scratch, "answers.db"), args.requests, args.distinct)
+        print(f"{result['requests']} questions, {result['upstream_calls']} upstream calls, "
+              f"hit rate {result['hit_rate']:.0%}, {result['seconds_saved']:.1f}s of generation saved")
+        print(f"Latency per question: p50 {result['p50_ms']:.2f} ms, mean {result['mean_ms']:.1f} ms")
+        return
+
+    cache = AnswerCache(path=args.db, enabled=True)
+    if args.command == "stats":
+        with closing(sqlite3.connect(args.db)) as connection:
+            count, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        print(f"{count:,} answers, {size / 1024 / 1024:.2f} MB")
+    elif args.command == "evict":
+        print(f"Removed {cache.evict():,} answers")
+    else:
+        cache.clear()
+        print("Cleared the answer cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from functools import lru_cache
+
+from modules.prediction_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Model files the app needs, with their versions, checksums and download locations
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts.json")
+
+# Local versioned store, optional mirror and offline switch, overridable per deployment
+ARTIFACT_STORE = os.environ.get("ARTIFACT_STORE") or os.path.join(os.path.expanduser("~"), ".cache", "circlecare", "artifacts")
+ARTIFACT_MIRROR = os.environ.get("ARTIFACT_MIRROR") or None
+ARTIFACT_OFFLINE = os.environ.get("ARTIFACT_OFFLINE") == "1"
+
+DOWNLOAD_ATTEMPTS = 3
+CHUNK_SIZE = 1 << 20
+
+
+class ArtifactError(Exception):
+    pass
+
+
+# Resolves model files from <store>/<name>/<version>/<file>, seeding the store from
+# a copy next to the app or downloading it (resumably) from the mirror or the
+# manifest URLs. Every file is checked against the manifest's SHA-256, and an
+# artifact without one is only downloaded with allow_unpinned, as `pin` does.
+class ArtifactStore:
+    def __init__(
+        self, manifest_path=MANIFEST_PATH, root=ARTIFACT_STORE, mirror=ARTIFACT_MIRROR, offline=ARTIFACT_OFFLINE,
+        allow_unpinned=False,
+    ):
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        self.manifest_path = manifest_path
+        self.root = root
+        self.mirror = mirror.rstrip("/") if mirror else None
+        self.offline = offline
+        self.allow_unpinned = allow_unpinned
+        self.timings = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        spec = self.spec(name)
+        return os.path.join(self.root, name, spec["version"], spec["file"])
+
+    def spec(self, name):
+        try:
+            return self.manifest[name]
+        except KeyError:
+            raise ArtifactError(f"Unknown artifact '{name}'.") from None
+
+    def digest(self, name):
+        self.resolve(name)
+        return self._digests[name]
+
+    def resolve(self, name):
+        with self._lock:
+            if name in self._digests:
+                return self.path(name)
+            start = time.perf_counter()
+            spec = self.spec(name)
+            target = self.path(name)
+            if os.path.exists(target):
+                source = "store"
+            elif os.path.exists(spec["file"]):
+                source = "local"
+                self._install(spec["file"], target, copy=True)
+            elif self.offline:
+                raise ArtifactError(f"Artifact '{name}' is not in the store at {target} and downloads are disabled.")
+            elif not spec.get("sha256") and not self.allow_unpinned:
+                raise ArtifactError(
+                    f"Artifact '{name}' has no pinned SHA-256, so a download could not be verified. "
+                    f"Run `python -m modules.artifacts pin {name}` where the published file is available."
+                )
+            else:
+                source = "download"
+                self._download(name, spec, target)
+            self._digests[name] = self._verify(name, spec, target)
+            self.timings[name] = {"source": source, "resolve_seconds": time.perf_counter() - start}
+            logger.info("Resolved artifact %s from %s in %.2fs", name, source, self.timings[name]["resolve_seconds"])
+            return target
+
+    def load(self, name, loader):
+        path = self.resolve(name)
+        start = time.perf_counter()
+        loaded = loader(path)
+        self.timings[name]["load_seconds"] = time.perf_counter() - start
+        logger.info("Loaded artifact %s in %.2fs", name, self.timings[name]["load_seconds"])
+        return loaded
+
+    # A sidecar file records the verified digest, so later starts only hash again
+    # when the file's size or modification time has changed
+    def _verify(self, name, spec, target):
+        stat = os.stat(target)
+        sidecar = f"{target}.sha256"
+        try:
+            with open(sidecar) as f:
+                recorded = json.load(f)
+            if recorded["size"] == stat.st_size and recorded["mtime_ns"] == stat.st_mtime_ns:
+                digest = recorded["sha256"]
+            else:
+                digest = None
+        except (OSError, ValueError, KeyError):
+            digest = None
+        if digest is None:
+            digest = file_sha256(target)
+
+        expected = spec.get("sha256")
+        if expected and digest != expected:
+            os.remove(target)
+            raise ArtifactError(f"Checksum mismatch for '{name}': expected {expected}, got {digest}. The file was removed.")
+        if not expected:
+            logger.warning("Artifact '%s' has no pinned SHA-256; run `python -m modules.artifacts pin %s`.", name, name)
+        with open(sidecar, "w") as f:
+            json.dump({"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+        return digest
+
+    def _install(self, source_path, target, copy=False):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if copy:
+            part = f"{target}.part"
+            shutil.copyfile(source_path, part)
+            source_path = part
+        os.replace(source_path, target)
+
+    def _download(self, name, spec, target):
+        urls = []
+        if self.mirror:
+            urls.append(f"{self.mirror}/{name}/{spec['version']}/{spec['file']}")
+        urls.extend(spec.get("urls", []))
+        if not urls:
+            raise ArtifactError(f"Artifact '{name}' is missing and has no download location.")
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        part = f"{target}.part"
+        errors = []
+        for url in urls:
+            try:
+                if "drive.google.com" in url:
+                    import gdown
+
+                    if not gdown.download(url, part, quiet=False):
+                        raise ArtifactError(f"gdown could not fetch {url}")
+                else:
+                    download_resumable(url, part)
+            except (OSError, ArtifactError) as e:
+                errors.append(f"{url}: {e}")
+                continue
+            self._install(part, target)
+            return
+        raise ArtifactError(f"Could not download '{name}':\n" + "\n".join(errors))
+
+
+# Appends to an existing .part file with an HTTP Range request, so an interrupted
+# download picks up where it stopped; servers without Range support restart it
+def download_resumable(url, part_path, attempts=DOWNLOAD_ATTEMPTS, timeout=60):
+    for attempt in range(1, attempts + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+                mode = "ab" if offset and response.status == 206 else "wb"
+                with open(part_path, mode) as f:
+                    start = f.tell()
+                    shutil.copyfileobj(response, f, CHUNK_SIZE)
+                    received = f.tell() - start
+                # A connection cut mid-body ends the read early without an error
+                length = response.headers.get("Content-Length")
+                if length is not None and received < int(length):
+                    raise http.client.IncompleteRead(b"", int(length) - received)
+            return
+        except urllib.error.HTTPError as e:
+            # 416 means the partial file already holds the whole artifact
+            if e.code == 416 and offset:
+                return
+            if attempt == attempts or e.code < 500:
+                raise
+        except (OSError, http.client.HTTPException) as e:
+            # IncompleteRead is an HTTPException, not an OSError
+            if attempt == attempts:
+                raise ArtifactError(f"Download interrupted: {e!r}") from e
+        time.sleep(2 ** (attempt - 1))
+
+
+@lru_cache(maxsize=None)
+def default_store():
+    return ArtifactStore()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local model artifact store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [
+        ("prefetch", "Download and verify artifacts, e.g. at container build time"),
+        ("pin", "Record the SHA-256 of artifacts in the store into the manifest"),
+    ]:
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("names", nargs="*", help="Artifacts to process (default: all)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Pinning is how an unpinned artifact gets its hash, so it may download one
+    store = ArtifactStore(allow_unpinned=True) if args.command == "pin" else default_store()
+    names = args.names or list(store.manifest)
+    for name in names:
+        path = store.resolve(name)
+        timing = store.timings[name]
+        print(f"{name}: {path} ({timing['source']}, {timing['resolve_seconds']:.2f}s) sha256={store.digest(name)}")
+        if args.command == "pin":
+            store.manifest[name]["sha256"] = store.digest(name)
+    if args.command == "pin":
+        with open(store.manifest_path, "w") as f:
+            json.dump(store.manifest, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import zipfile
+
+import numpy as np
+
+from modules.imaging import classify, load_imaging_model, predict_images, preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def peak_memory_mb():
+    # VmHWM starts fresh in every process, unlike ru_maxrss which survives fork + exec on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def list_images(path):
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        names = sorted(n for n in archive.namelist() if n.lower().endswith(IMAGE_EXTENSIONS))
+        return names, lambda name: io.BytesIO(archive.read(name))
+    names = []
+    for root, _, files in os.walk(path):
+        names.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(names), None
+
+
+# Scores a few images one at a time, the way the app does, and compares with the batched scores
+def check_parity(model, names, opener, batched_scores):
+    diffs = []
+    for name in names:
+        array = preprocess_image(opener(name) if opener else name)
+        single = float(model.predict(np.expand_dims(array, axis=0), verbose=0)[0][0])
+        diffs.append(abs(single - batched_scores[name]))
+    return max(diffs) if diffs else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a folder or ZIP of ultrasound images in batches.")
+    parser.add_argument("input", help="Folder or ZIP archive of jpg/jpeg/png images")
+    parser.add_argument("--output", default="imaging_results.csv", help="CSV file to write results to")
+    parser.add_argument("--model", default=None, help="Path to the Keras model (default: artifact store)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Scores at or above this are Noninfected")
+    parser.add_argument("--batch-size", type=int, default=64, help="Images per model call")
+    parser.add_argument("--workers", type=int, default=None, help="Decode threads (defaults to the CPU count)")
+    parser.add_argument("--prefetch", type=int, default=2, help="Decoded batches queued ahead of the model")
+    parser.add_argument("--check-parity", type=int, default=0, metavar="N",
+                        help="Re-score the first N images one by one and report the largest difference")
+    args = parser.parse_args(argv)
+
+    names, opener = list_images(args.input)
+    if not names:
+        parser.error(f"No images found in '{args.input}'.")
+    model = load_imaging_model(args.model)
+
+    scores = {}
+    failed = 0
+    start = time.perf_counter()
+    with open(args.output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Image", "Score", "Confidence", "Result", "Error"])
+        results = predict_images(model, names, args.batch_size, args.workers, args.prefetch, opener)
+        for name, score, error in results:
+            if error is not None:
+                failed += 1
+                writer.writerow([name, "", "", "", error])
+                continue
+            scores[name] = score
+            writer.writerow([name, f"{score:.6f}", round(score * 100, 1), classify(score, args.threshold), ""])
+    elapsed = time.perf_counter() - start
+
+    peak = peak_memory_mb()
+    print(f"Classified {len(scores):,} images ({failed} failed) in {elapsed:.1f}s "
+          f"({len(scores) / elapsed:,.1f} images/sec) -> {args.output}")
+    print(f"Peak memory: {peak:,.0f} MB" if peak is not None else "Peak memory: not available on this platform")
+
+    if args.check_parity:
+        sample = [name for name in names if name in scores][:args.check_parity]
+        print(f"Largest single vs. batched score difference over {len(sample)} images: "
+              f"{check_parity(model, sample, opener, scores):.3g}")
+
+
+if __name__ == "__main__":
+    main()
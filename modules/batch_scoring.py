@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from modules.clinical import CLINICAL_FEATURES, load_clinical_model, predict_likelihood
+
+
+def is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+# Read the roster lazily so only one chunk is ever held in memory
+def iter_chunks(path, chunk_size, columns):
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+
+
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.wrote_header = False
+
+    def write(self, frame):
+        if is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a" if self.wrote_header else "w", header=not self.wrote_header, index=False)
+            self.wrote_header = True
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(model, input_path, output_path, chunk_size=50000, keep_columns=(), threshold=50.0, progress_every=10):
+    columns = list(keep_columns) + [c for c in CLINICAL_FEATURES if c not in keep_columns]
+    writer = ChunkWriter(output_path)
+    total_rows = 0
+    start = time.perf_counter()
+    try:
+        for i, chunk in enumerate(iter_chunks(input_path, chunk_size, columns), start=1):
+            likelihood = predict_likelihood(model, chunk)
+            result = chunk[list(keep_columns)].copy()
+            result["PCOSLikelihood"] = likelihood.round(2)
+            result["Diagnosis"] = "PCOS Unlikely"
+            result.loc[likelihood > threshold, "Diagnosis"] = "PCOS Likely"
+            writer.write(result)
+
+            total_rows += len(chunk)
+            if progress_every and i % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{total_rows:,} rows scored ({total_rows / elapsed:,.0f} rows/sec)", file=sys.stderr)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return total_rows, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a patient roster with the clinical PCOS pipeline.")
+    parser.add_argument("input", help="CSV or Parquet file with the clinical feature columns")
+    parser.add_argument("output", help="CSV or Parquet file to write likelihoods to")
+    parser.add_argument("--model", default=None, help="Path to the fitted pipeline (default: artifact store)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows scored per vectorized call")
+    parser.add_argument("--keep", nargs="*", default=[], help="Input columns copied to the output, e.g. a patient ID")
+    parser.add_argument("--jobs", type=int, default=None, help="Cores used by the random forest (-1 for all)")
+    args = parser.parse_args(argv)
+
+    model = load_clinical_model(args.model)
+    if model is None:
+        parser.error(f"Clinical diagnosis model file '{args.model}' not found.")
+    if args.jobs is not None:
+        model.named_steps["classifier"].n_jobs = args.jobs
+
+    rows, elapsed = score_file(model, args.input, args.output, chunk_size=args.chunk_size, keep_columns=args.keep)
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"Scored {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
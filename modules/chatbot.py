@@ -1,12 +1,9 @@
 import streamlit as st
-from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import HumanMessage
 
-# Set page configuration as the very first Streamlit command
-st.set_page_config(
-    page_title="CycleCare AI - Comprehensive PCOS Management",
-    layout="wide",
+from modules.ada_chat import LANGUAGES
+from modules.ada_ui import (
+    answer_question, cache_caption, faq_caption, get_answer_cache, get_content_index, get_faq_matcher, get_llm,
+    render_history,
 )
 
 # Create two tabs: one for API Key input and one for Chat with Ada
@@ -28,32 +25,7 @@ if "api_key" not in st.session_state:
     st.stop()
 
 # Retrieve the API key from session state
-api_key = st.session_state["OPENAI_API_KEY"]
-
-# Initialize the language model using the API key provided by the user
-llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0.7, openai_api_key=api_key)
-
-# Define the prompt template for the Chat with Ada functionality
-prompt_template = ChatPromptTemplate.from_template(
-    """
-    You are Ada, a helpful health and lifestyle coach specializing in nutrition, exercise, and stress management for PCOS.
-    Use the context below to answer user queries. If the context is insufficient, provide general advice.
-    Please answer in {lang}.
-
-    Context:
-    {context}
-
-    Question: {input}
-    """
-)
-
-# Define language options for translation
-language_options = {
-    "English": "English",
-    "Yoruba": "Yoruba",
-    "Igbo": "Igbo",
-    "Hausa": "Hausa"
-}
+api_key = st.session_state["api_key"]
 
 # ---- Tab 2: Chat with Ada ----
 with tabs[1]:
@@ -88,37 +60,26 @@ with tabs[1]:
         st.session_state.chat_history = []
     
     st.subheader("Choose Your Language")
-    selected_language = st.selectbox("Choose a language:", list(language_options.keys()))
+    selected_language = st.selectbox("Choose a language:", list(LANGUAGES))
     
     # Input for user queries
     user_input = st.text_input("💡 Curious about PCOS? Ask Ada!")
     
+    fresh = st.checkbox("Ask for a fresh answer", help="Generate a new answer instead of reusing an earlier one")
+
     if st.button("Submit", key="chat_submit"):
         if user_input.strip():
-            context = "PCOS-specific health advice, including nutrition, exercise, and stress management."
-            formatted_prompt = prompt_template.format(
-                context=context,
-                input=user_input,
-                lang=language_options[selected_language]
-            )
             try:
-                with st.spinner("Ada is thinking..."):
-                    response_text = llm.predict(formatted_prompt)
-                st.session_state.chat_history.append({
-                    "question": user_input,
-                    "response": response_text,
-                    "language": selected_language
-                })
-                st.markdown(f"### Ada's Response ({selected_language}):\n\n{response_text}")
+                answer_question(
+                    lambda: get_llm(api_key), get_answer_cache(), get_content_index(), get_faq_matcher(),
+                    user_input, selected_language, fresh,
+                )
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
         else:
             st.warning("Please enter a question to receive advice.")
     
     # Display past responses
-    if st.session_state.chat_history:
-        st.subheader("Past Conversations")
-        for i, chat in enumerate(st.session_state.chat_history):
-            st.markdown(f"**Q{i+1}:** {chat['question']}")
-            st.markdown(f"**Ada's Response ({chat['language']}):** {chat['response']}")
-            st.markdown("---")
+    render_history(st.session_state.chat_history)
+    cache_caption(get_answer_cache())
+    faq_caption(get_faq_matcher())
@@ -0,0 +1,222 @@
+import argparse
+import heapq
+import os
+import time
+
+import numpy as np
+
+from modules.imaging import IMAGE_SIZE, classify, normalize
+
+# Frames scored per second of clip and frames per model call, overridable per deployment
+CINE_SAMPLE_FPS = float(os.environ.get("CINE_SAMPLE_FPS", "10"))
+CINE_BATCH_SIZE = int(os.environ.get("CINE_BATCH_SIZE", "16"))
+
+CINE_EXTENSIONS = ["mp4", "avi", "mov", "mkv"]
+
+# Resolution of the score histogram kept for applying any threshold after the scan
+HISTOGRAM_BINS = 1000
+
+
+# Study-level summary of per-frame sigmoid outputs. Only running statistics, a
+# score histogram and the few lowest-scoring frames are kept, so memory does not
+# grow with clip length and the Confidence Threshold can change without rescanning.
+class CineStudy:
+    def __init__(self, fps, keep=5):
+        self.fps = fps
+        self.keep = keep
+        self.frames_total = 0
+        self.frames_scored = 0
+        self.score_sum = 0.0
+        self.min_score = 1.0
+        self.max_score = 0.0
+        self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        self.seconds = 0.0
+        self._lowest = []
+
+    def update(self, frame_indices, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        self.frames_scored += len(scores)
+        self.score_sum += float(scores.sum())
+        self.min_score = min(self.min_score, float(scores.min()))
+        self.max_score = max(self.max_score, float(scores.max()))
+        bins = np.minimum((scores * HISTOGRAM_BINS).astype(np.int64), HISTOGRAM_BINS - 1)
+        self.histogram += np.bincount(bins, minlength=HISTOGRAM_BINS)
+        for index, score in zip(frame_indices, scores):
+            # Max-heap on -score keeps the lowest scores, i.e. the frames that look most infected
+            entry = (-float(score), index)
+            if len(self._lowest) < self.keep:
+                heapq.heappush(self._lowest, entry)
+            elif entry > self._lowest[0]:
+                heapq.heapreplace(self._lowest, entry)
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.frames_scored if self.frames_scored else 0.0
+
+    def result(self, threshold):
+        return classify(self.mean_score, threshold)
+
+    # Share of scored frames that alone would be classified as Infected
+    def infected_fraction(self, threshold):
+        if not self.frames_scored:
+            return 0.0
+        return float(self.histogram[:int(threshold * HISTOGRAM_BINS)].sum()) / self.frames_scored
+
+    def suspicious_frames(self):
+        return [
+            {"frame": index, "time_s": index / self.fps if self.fps else None, "score": -negative}
+            for negative, index in sorted(self._lowest, reverse=True)
+        ]
+
+    @property
+    def clip_seconds(self):
+        return self.frames_total / self.fps if self.fps else 0.0
+
+    # Frames run through the model per second of processing; frames skipped by
+    # the stride are not counted, realtime_factor covers keeping up with playback
+    @property
+    def scored_frames_per_sec(self):
+        return self.frames_scored / self.seconds if self.seconds else 0.0
+
+    @property
+    def realtime_factor(self):
+        return self.clip_seconds / self.seconds if self.seconds else 0.0
+
+
+# Frame stride that keeps scoring at or ahead of playback. It starts at the stride
+# for sample_fps, doubles whenever a batch took longer than the stretch of clip it
+# covers, and halves back towards the base stride once there is headroom again.
+class AdaptiveStride:
+    def __init__(self, native_fps, sample_fps=CINE_SAMPLE_FPS, adaptive=True, max_stride=64):
+        self.native_fps = native_fps
+        self.base = max(1, round(native_fps / sample_fps)) if sample_fps else 1
+        self.stride = self.base
+        self.adaptive = adaptive
+        self.max_stride = max(max_stride, self.base)
+
+    def update(self, frames_covered, seconds):
+        if not self.adaptive or not self.native_fps:
+            return
+        budget = frames_covered / self.native_fps
+        if seconds > budget:
+            self.stride = min(self.stride * 2, self.max_stride)
+        elif seconds < budget / 2 and self.stride > self.base:
+            self.stride = max(self.stride // 2, self.base)
+
+
+# Streams a cine loop through the CNN. Frames between samples are only grabbed,
+# never converted; sampled frames are resized straight into a fixed uint8 batch
+# buffer, so memory is the same for a 2-second loop and a 10-minute recording.
+def classify_cine(model, source, sample_fps=CINE_SAMPLE_FPS, batch_size=CINE_BATCH_SIZE, adaptive=True, on_progress=None):
+    import cv2
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError("Could not open the video; supported formats are " + ", ".join(CINE_EXTENSIONS) + ".")
+    native_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    stride = AdaptiveStride(native_fps, sample_fps, adaptive)
+    study = CineStudy(native_fps)
+
+    pixels = np.empty((batch_size, *IMAGE_SIZE, 3), dtype=np.uint8)
+    inputs = np.empty((batch_size, *IMAGE_SIZE, 3), dtype=np.float32)
+    indices = []
+    start = batch_start = time.perf_counter()
+    batch_first_frame = 0
+    index = -1
+    next_frame = 0
+
+    def score_batch():
+        nonlocal batch_start, batch_first_frame
+        count = len(indices)
+        normalize(pixels[:count], out=inputs[:count])
+        scores = model.predict(inputs[:count], batch_size=count, verbose=0)[:, 0]
+        study.update(indices, scores)
+        now = time.perf_counter()
+        stride.update(index + 1 - batch_first_frame, now - batch_start)
+        batch_start, batch_first_frame = now, index + 1
+        indices.clear()
+        if on_progress is not None and frame_count:
+            on_progress(min(1.0, (index + 1) / frame_count))
+
+    try:
+        while capture.grab():
+            index += 1
+            if index < next_frame:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            small = cv2.resize(frame, IMAGE_SIZE, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=pixels[len(indices)])
+            indices.append(index)
+            next_frame = index + stride.stride
+            if len(indices) == batch_size:
+                score_batch()
+        if indices:
+            score_batch()
+    finally:
+        capture.release()
+
+    study.frames_total = index + 1
+    study.seconds = time.perf_counter() - start
+    if not study.frames_scored:
+        raise ValueError("The video contains no readable frames.")
+    return study
+
+
+def make_clip(path, seconds=10, fps=30, size=(640, 480), seed=0):
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    base = cv2.resize(rng.integers(0, 255, (24, 32), dtype=np.uint8), size, interpolation=cv2.INTER_CUBIC)
+    try:
+        for i in range(int(seconds * fps)):
+            frame = np.clip(base.astype(np.int16) + rng.integers(-12, 12, base.shape) + i % 40, 0, 255).astype(np.uint8)
+            writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    finally:
+        writer.release()
+
+
+def print_study(study, threshold):
+    print(f"Result: {study.result(threshold)} (mean confidence {study.mean_score * 100:.1f}%, "
+          f"{study.infected_fraction(threshold):.0%} of frames Infected)")
+    print(f"{study.frames_scored:,} of {study.frames_total:,} frames scored in {study.seconds:.2f}s: "
+          f"{study.scored_frames_per_sec:,.0f} frames/sec scored, {study.realtime_factor:.1f}x real time")
+    for frame in study.suspicious_frames():
+        print(f"  frame {frame['frame']:>6} at {frame['time_s']:7.2f}s  score {frame['score']:.3f}")
+
+
+def main(argv=None):
+    from modules.imaging import load_imaging_model
+
+    parser = argparse.ArgumentParser(description="Classify an ultrasound cine loop frame by frame.")
+    parser.add_argument("video", nargs="?", help="Video file; omit with --synthetic")
+    parser.add_argument("--synthetic", type=float, metavar="SECONDS", help="Score a generated 30 fps clip of this length")
+    parser.add_argument("--sample-fps", type=float, default=CINE_SAMPLE_FPS, help="Frames scored per second of clip (0: every frame)")
+    parser.add_argument("--batch-size", type=int, default=CINE_BATCH_SIZE)
+    parser.add_argument("--fixed-stride", action="store_true", help="Do not skip more frames when scoring falls behind")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--model", default=None, help="Keras model file (default: from the artifact store)")
+    args = parser.parse_args(argv)
+    if not args.video and not args.synthetic:
+        parser.error("a video file or --synthetic is required")
+
+    model = load_imaging_model(args.model)
+    video = args.video
+    if video is None:
+        import tempfile
+
+        video = tempfile.mkstemp(suffix=".mp4")[1]
+        make_clip(video, args.synthetic)
+    try:
+        study = classify_cine(model, video, args.sample_fps, args.batch_size, adaptive=not args.fixed_stride)
+    finally:
+        if args.video is None:
+            os.remove(video)
+    print_study(study, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
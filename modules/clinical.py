@@ -0,0 +1,39 @@
+import os
+
+from modules.artifacts import default_store
+
+# Path of the fitted sklearn pipeline used for clinical diagnosis
+CLINICAL_MODEL_PATH = "pcos_diagnosis_pipeline.pkl"
+
+# Columns the pipeline is scored on, in the order the clinical form collects them
+CLINICAL_FEATURES = [
+    "Age",
+    "BMI",
+    "FastingGlucose",
+    "FastingInsulin",
+    "LH_FSH_Ratio",
+    "AMH",
+    "DHEAS",
+    "Prolactin",
+    "TSH",
+    "FreeTestosterone",
+    "BloodSugar",
+    "Score",
+]
+
+
+# Without a path the pipeline comes from the checksum-verified artifact store
+def load_clinical_model(path=None):
+    import joblib
+
+    if path is None:
+        return default_store().load("clinical", joblib.load)
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def predict_likelihood(model, frame):
+    # PCOS likelihood in percent for every row of the frame
+    features = frame[CLINICAL_FEATURES].astype("float64")
+    return model.predict_proba(features)[:, 1] * 100
@@ -0,0 +1,203 @@
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from modules.clinical import CLINICAL_FEATURES, load_clinical_model
+
+COMPILED_MODEL_PATH = "pcos_diagnosis_compiled.npz"
+
+
+# One patient's clinical features, in CLINICAL_FEATURES order
+class ClinicalRecord(NamedTuple):
+    Age: float
+    BMI: float
+    FastingGlucose: float
+    FastingInsulin: float
+    LH_FSH_Ratio: float
+    AMH: float
+    DHEAS: float
+    Prolactin: float
+    TSH: float
+    FreeTestosterone: float
+    BloodSugar: float
+    Score: float
+
+    @classmethod
+    def from_form(cls, values):
+        # Blank form fields become NaN and are imputed like in the pipeline
+        return cls(*(np.nan if values[feature] is None else float(values[feature]) for feature in CLINICAL_FEATURES))
+
+
+# The fitted imputer, scaler and random forest flattened into NumPy arrays.
+# All trees share one node table; leaves point back at themselves so every
+# row can walk max_depth steps without checking for leaves.
+class CompiledClinicalModel:
+    def __init__(self, fill, mean, scale, feature, threshold, children, leaf_proba, roots, max_depth):
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        preprocessor = pipeline.named_steps["preprocessor"]
+        forest = pipeline.named_steps["classifier"]
+        _, numeric, columns = preprocessor.transformers_[0]
+        imputer = numeric.named_steps["imputer"]
+        scaler = numeric.named_steps["scaler"]
+
+        # Reorder the preprocessing parameters to CLINICAL_FEATURES order
+        order = [list(columns).index(feature) for feature in CLINICAL_FEATURES]
+        fill = imputer.statistics_[order]
+        mean = scaler.mean_[order] if scaler.mean_ is not None else np.zeros(len(order))
+        scale = scaler.scale_[order] if scaler.scale_ is not None else np.ones(len(order))
+        # The forest sees features in the transformer's column order
+        forest_to_record = np.array([CLINICAL_FEATURES.index(column) for column in columns])
+
+        features, thresholds, children, leaf_probas, roots = [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            feature = np.where(is_leaf, 0, forest_to_record[np.maximum(tree.feature, 0)])
+            left = np.where(is_leaf, nodes, tree.children_left) + offset
+            right = np.where(is_leaf, nodes, tree.children_right) + offset
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            children.append(np.stack([left, right], axis=1))
+            leaf_probas.append(value / normalizer)
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            fill=fill,
+            mean=mean,
+            scale=scale,
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children).astype(np.intp),
+            leaf_proba=np.concatenate(leaf_probas),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+        )
+
+    @classmethod
+    def load(cls, path=COMPILED_MODEL_PATH):
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def save(self, path=COMPILED_MODEL_PATH):
+        np.savez(
+            path, fill=self.fill, mean=self.mean, scale=self.scale, feature=self.feature, threshold=self.threshold,
+            children=self.children, leaf_proba=self.leaf_proba, roots=self.roots, max_depth=self.max_depth,
+        )
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        missing = np.isnan(X)
+        if missing.any():
+            X[missing] = np.broadcast_to(self.fill, X.shape)[missing]
+        X -= self.mean
+        X /= self.scale
+        # Trees compare float32 features against float64 thresholds, as sklearn does
+        return X.astype(np.float32)
+
+    def predict_proba(self, X):
+        if hasattr(X, "columns"):
+            X = X[CLINICAL_FEATURES].to_numpy(dtype=np.float64)
+        X = self.transform(X)
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = X[rows, self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[nodes, go_right.view(np.int8)]
+        # Accumulate tree by tree like RandomForestClassifier so results match bit for bit
+        proba = np.cumsum(self.leaf_proba[nodes], axis=1)[:, -1]
+        return proba / len(self.roots)
+
+    def predict_one(self, record):
+        x = self.transform(record)[0]
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = self.children[nodes, (x[self.feature[nodes]] > self.threshold[nodes]).view(np.int8)]
+        proba = np.cumsum(self.leaf_proba[nodes], axis=0)[-1]
+        return proba / len(self.roots)
+
+
+# Random patients spread around the training distribution, with some missing values
+def sample_patients(compiled, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = compiled.mean + rng.normal(0.0, 1.5, size=(rows, len(CLINICAL_FEATURES))) * compiled.scale
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return X
+
+
+def validate(pipeline, compiled, rows=100000, seed=0):
+    import pandas as pd
+
+    X = sample_patients(compiled, rows, seed)
+    expected = pipeline.predict_proba(pd.DataFrame(X, columns=CLINICAL_FEATURES))
+    actual = compiled.predict_proba(X)
+    return {
+        "rows": rows,
+        "exact_matches": int(np.sum(np.all(expected == actual, axis=1))),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))),
+    }
+
+
+def time_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the clinical pipeline to NumPy arrays and validate it.")
+    parser.add_argument("--model", default=None, help="Path to the fitted pipeline (default: artifact store)")
+    parser.add_argument("--output", default=COMPILED_MODEL_PATH, help="Where to write the compiled arrays")
+    parser.add_argument("--rows", type=int, default=100000, help="Random patients used for validation")
+    parser.add_argument("--batch-size", type=int, default=64, help="Rows in the timed small-batch call")
+    parser.add_argument("--tolerance", type=float, default=1e-12, help="Largest accepted probability difference")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    pipeline = load_clinical_model(args.model)
+    if pipeline is None:
+        parser.error(f"Clinical diagnosis model file '{args.model}' not found.")
+    compiled = CompiledClinicalModel.from_pipeline(pipeline)
+
+    report = validate(pipeline, compiled, rows=args.rows)
+    print(f"Validated {report['rows']:,} rows: {report['exact_matches']:,} bit-for-bit matches, "
+          f"max |diff| = {report['max_abs_diff']:.3g}")
+    if report["max_abs_diff"] > args.tolerance:
+        raise SystemExit("Compiled model disagrees with predict_proba; not writing it.")
+    compiled.save(args.output)
+    print(f"Wrote {args.output}")
+
+    record = ClinicalRecord(*sample_patients(compiled, 1, seed=1)[0])
+    frame = pd.DataFrame([record._asdict()])
+    batch = pd.DataFrame(sample_patients(compiled, args.batch_size, seed=2), columns=CLINICAL_FEATURES)
+    print(f"1 row: predict_proba {time_call(lambda: pipeline.predict_proba(frame), 200) * 1e6:,.0f} us, "
+          f"compiled {time_call(lambda: compiled.predict_one(record), 2000) * 1e6:,.0f} us")
+    print(f"{args.batch_size} rows: predict_proba {time_call(lambda: pipeline.predict_proba(batch), 5) * 1e3:,.1f} ms, "
+          f"compiled {time_call(lambda: compiled.predict_proba(batch), 5) * 1e3:,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import textwrap
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from modules.ada_chat import DEFAULT_CONTEXT
+from modules.pcos_content import documents
+
+# Where the index of the app's PCOS content is kept, overridable per deployment.
+# An empty ADA_INDEX_DIR keeps the index in memory only.
+ADA_INDEX_DIR = os.environ.get("ADA_INDEX_DIR", "ada_index")
+ADA_CONTEXT_CHUNKS = int(os.environ.get("ADA_CONTEXT_CHUNKS", "3"))
+ADA_MIN_SIMILARITY = float(os.environ.get("ADA_MIN_SIMILARITY", "0.08"))
+
+# Chunks are groups of whole list items of up to this many words
+CHUNK_WORDS = 80
+
+# Width of the hashed embedding. Bump EMBEDDING_VERSION whenever embed() changes,
+# so stored vectors are recomputed instead of reused.
+DIM = 4096
+EMBEDDING_VERSION = 1
+
+# "pcos" is in nearly every chunk and every question, so it tells them apart no
+# better than "the" does
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been being but by can could do does doing for from
+has have how i if in into is it its may me more most my no not of on or our should so some such
+than that the their them then there these they this to up us was we were what when where which
+while who why will with would you your pcos
+""".split())
+
+VECTORS_FILE = "vectors.npy"
+MANIFEST_FILE = "chunks.json"
+
+
+def tokenize(text):
+    words = []
+    # Link targets are not content
+    text = re.sub(r"https?://\S+", " ", text)
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        # Light plural folding, so "eggs" matches "egg" and "remedies" matches "remedy"
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+# Signed feature hashing of words and word pairs, weighted 1 + log(count) and
+# scaled to unit length, so a dot product is the cosine similarity. There is no
+# model to load and no corpus-wide statistic, so a chunk's vector depends on
+# that chunk alone and unchanged chunks keep their vectors across rebuilds.
+def embed(text):
+    words = tokenize(text)
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    vector = np.zeros(DIM, dtype=np.float32)
+    for feature, count in features.items():
+        h = zlib.crc32(feature.encode())
+        vector[h % DIM] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# Splits one piece of content into chunks of whole top-level list items, with
+# their nested items, of up to max_words. A heading starts a new chunk and is
+# kept as part of that chunk's title.
+def chunk_document(section, title, markdown, max_words=CHUNK_WORDS):
+    chunks = []
+    heading, items = None, []
+
+    def flush():
+        if items:
+            text = "\n".join(items)
+            chunk_title = f"{title} - {heading}" if heading and heading != title else title
+            chunks.append({
+                "section": section,
+                "title": chunk_title,
+                "text": text,
+                "hash": hashlib.sha256(f"{section}\0{chunk_title}\0{text}".encode()).hexdigest(),
+            })
+            items.clear()
+
+    for line in textwrap.dedent(markdown).strip().splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("#"):
+            flush()
+            heading = stripped.lstrip("#").strip()
+            continue
+        stripped = stripped.replace("**", "")
+        nested = line.startswith((" ", "\t")) and stripped.startswith("- ")
+        if items and not nested and len(" ".join(items + [stripped]).split()) > max_words:
+            flush()
+        items.append(f"  {stripped}" if nested else stripped)
+    flush()
+    return chunks
+
+
+def chunk_documents(docs):
+    return [chunk for doc in docs for chunk in chunk_document(*doc)]
+
+
+# Top-k cosine search over the chunks of the app's curated PCOS content, used to
+# pick the context Ada's prompt is built from. The vectors are a float32 matrix
+# memory-mapped from directory/vectors.npy, one row per chunk in chunks.json.
+# version identifies the indexed content, so answers cached for other content
+# are not reused.
+class ContentIndex:
+    def __init__(self, chunks, vectors, version):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.version = version
+
+    # Loads the index in directory, first re-embedding only the chunks that are
+    # new or changed since it was last built
+    @classmethod
+    def open(cls, directory=ADA_INDEX_DIR, docs=None):
+        index, _ = build(directory, docs)
+        return index
+
+    def __len__(self):
+        return len(self.chunks)
+
+    # The k chunks most similar to the query as (score, chunk), best first,
+    # leaving out chunks scoring under min_similarity
+    def search(self, query, k=ADA_CONTEXT_CHUNKS, min_similarity=ADA_MIN_SIMILARITY):
+        if not self.chunks or k <= 0:
+            return []
+        scores = self.vectors @ embed(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top if scores[i] >= min_similarity]
+
+    # Prompt context for a question: the best matching chunks, or the general
+    # description when nothing in the app's content matches
+    def context(self, query, k=ADA_CONTEXT_CHUNKS, min_similarity=ADA_MIN_SIMILARITY):
+        hits = self.search(query, k, min_similarity)
+        if not hits:
+            return DEFAULT_CONTEXT
+        return "\n\n".join(f"{chunk['title']} ({chunk['section']}):\n{chunk['text']}" for _, chunk in hits)
+
+
+# A title names what its chunk is about, so its words count twice
+def _embedding_text(chunk):
+    return f"{chunk['section']}\n{chunk['title']}\n{chunk['title']}\n{chunk['text']}"
+
+
+def _version(chunks):
+    digest = hashlib.sha256(f"{EMBEDDING_VERSION}:{DIM}".encode())
+    for chunk in chunks:
+        digest.update(chunk["hash"].encode())
+    return digest.hexdigest()[:16]
+
+
+def _load(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+    except (OSError, ValueError):
+        return None, None
+    if (manifest.get("embedding_version"), manifest.get("dim")) != (EMBEDDING_VERSION, DIM):
+        return None, None
+    if vectors.shape != (len(manifest["chunks"]), DIM):
+        return None, None
+    return manifest, vectors
+
+
+def _write_atomic(path, write):
+    # Write then rename so other server processes never read a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# Brings the index in directory up to date with docs (default: the app's
+# content) and returns it with {"chunks", "reused", "embedded"}. Vectors of
+# chunks whose text is unchanged are copied from the previous build.
+def build(directory=ADA_INDEX_DIR, docs=None):
+    chunks = chunk_documents(documents() if docs is None else docs)
+    version = _version(chunks)
+    manifest, previous = _load(directory) if directory else (None, None)
+    if manifest is not None and manifest["version"] == version:
+        return ContentIndex(manifest["chunks"], previous, version), {
+            "chunks": len(chunks), "reused": len(chunks), "embedded": 0,
+        }
+
+    rows = {chunk["hash"]: i for i, chunk in enumerate(manifest["chunks"])} if manifest else {}
+    vectors = np.zeros((len(chunks), DIM), dtype=np.float32)
+    reused = 0
+    for i, chunk in enumerate(chunks):
+        row = rows.get(chunk["hash"])
+        if row is not None:
+            vectors[i] = previous[row]
+            reused += 1
+        else:
+            vectors[i] = embed(_embedding_text(chunk))
+    stats = {"chunks": len(chunks), "reused": reused, "embedded": len(chunks) - reused}
+    if not directory:
+        return ContentIndex(chunks, vectors, version), stats
+
+    os.makedirs(directory, exist_ok=True)
+    del previous
+    _write_atomic(os.path.join(directory, VECTORS_FILE), lambda f: np.save(f, vectors))
+    manifest = {"version": version, "embedding_version": EMBEDDING_VERSION, "dim": DIM, "chunks": chunks}
+    _write_atomic(os.path.join(directory, MANIFEST_FILE), lambda f: f.write(json.dumps(manifest).encode()))
+    return ContentIndex(chunks, np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r"), version), stats
+
+
+SAMPLE_QUESTIONS = [
+    "What Nigerian foods are good for PCOS?",
+    "Which herbs help with insulin resistance?",
+    "What blood tests diagnose PCOS?",
+    "How much exercise should I do each week?",
+    "Can I talk to a doctor through the app?",
+    "Where can I find a support group in Nigeria?",
+    "What snacks can I eat between meals?",
+    "Is there an app for meditation and stress?",
+]
+
+
+# Build times, search latency and prompt size on a scratch index directory
+def bench(directory, searches=2000):
+    docs = documents()
+    start = time.perf_counter()
+    _, cold = build(directory, docs)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    # One edited piece of content, as when a page is updated
+    section, title, text = docs[-1]
+    start = time.perf_counter()
+    _, incremental = build(directory, docs[:-1] + [(section, title, text + "\n- Updated.")])
+    incremental_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index = ContentIndex.open(directory, docs[:-1] + [(section, title, text + "\n- Updated.")])
+    open_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for i in range(searches):
+        start = time.perf_counter()
+        index.search(SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)])
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    context_words = np.mean([len(index.context(q).split()) for q in SAMPLE_QUESTIONS])
+    return {
+        "chunks": len(index),
+        "cold_ms": cold_ms,
+        "cold": cold,
+        "incremental_ms": incremental_ms,
+        "incremental": incremental,
+        "open_ms": open_ms,
+        "search_p50_ms": float(np.percentile(latencies, 50)),
+        "search_p99_ms": float(np.percentile(latencies, 99)),
+        "context_words": float(context_words),
+        "content_words": sum(len(chunk["text"].split()) for chunk in index.chunks),
+        "examples": [(q, [hit["title"] for _, hit in index.search(q)]) for q in SAMPLE_QUESTIONS],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the index of PCOS content Ada answers from.")
+    parser.add_argument("--dir", default=ADA_INDEX_DIR, help=f"Index directory (default: {ADA_INDEX_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="Build the index, re-embedding only new or changed chunks")
+    search_parser = commands.add_parser("search", help="Show the chunks a question would get as context")
+    search_parser.add_argument("question")
+    search_parser.add_argument("-k", type=int, default=ADA_CONTEXT_CHUNKS)
+    commands.add_parser("bench", help="Build times, search latency and prompt size on a scratch index")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        scratch = tempfile.mkdtemp()
+        try:
+            result = bench(scratch)
+        finally:
+            shutil.rmtree(scratch)
+        print(f"{result['chunks']} chunks: cold build {result['cold_ms']:.1f} ms, "
+              f"rebuild after one edit {result['incremental_ms']:.1f} ms "
+              f"({result['incremental']['embedded']} re-embedded, {result['incremental']['reused']} reused), "
+              f"open {result['open_ms']:.1f} ms")
+        print(f"Search: p50 {result['search_p50_ms']:.3f} ms, p99 {result['search_p99_ms']:.3f} ms")
+        print(f"Context: {result['context_words']:.0f} words per question, "
+              f"out of {result['content_words']} words of content")
+        for question, titles in result["examples"]:
+            print(f"  {question} -> {'; '.join(titles) or 'general advice'}")
+        return
+
+    if args.command == "build":
+        _, stats = build(args.dir)
+        print(f"{stats['chunks']} chunks: {stats['embedded']} embedded, {stats['reused']} reused")
+        return
+
+    index = ContentIndex.open(args.dir)
+    for score, chunk in index.search(args.question, args.k):
+        print(f"{score:.3f}  {chunk['title']} ({chunk['section']})")
+        print(textwrap.indent(chunk["text"], "    "))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import math
+import os
+import textwrap
+import threading
+import time
+from collections import Counter, defaultdict
+
+from modules.content_index import tokenize
+from modules.pcos_content import documents
+
+# Answering common questions straight from the app's content, overridable per
+# deployment: ADA_FAQ=0 sends every question to the model
+ADA_FAQ_ENABLED = os.environ.get("ADA_FAQ", "1") != "0"
+# A match is confident when the best entry scores at least ADA_FAQ_MIN_SCORE and
+# contains every word of the question. A question with a word the entry lacks,
+# such as a medicine the content never mentions, is asking something else.
+ADA_FAQ_MIN_SCORE = float(os.environ.get("ADA_FAQ_MIN_SCORE", "4.0"))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Words that make a question read naturally but say nothing about what is asked
+QUESTION_WORDS = frozenset({"good", "best", "use", "used", "tell", "know"})
+
+
+def question_terms(question):
+    return set(tokenize(question)) - QUESTION_WORDS
+
+
+# BM25 over the app's curated PCOS content, one entry per FAQ answer, list or
+# resource, for answering questions the content already answers without calling
+# the model. Every posting's term weight is computed when the index is built,
+# so matching a question only sums the weights of its words' postings.
+class FaqMatcher:
+    def __init__(self, docs=None, min_score=ADA_FAQ_MIN_SCORE, enabled=ADA_FAQ_ENABLED):
+        self.min_score = min_score
+        self.enabled = enabled
+        self.entries = []
+        self.postings = defaultdict(list)
+        self.idf = {}
+        self.lookups = 0
+        self.deflected = 0
+        self.model_answers = 0
+        self.model_seconds = 0.0
+        self._lock = threading.Lock()
+
+        terms = []
+        for section, title, markdown in documents() if docs is None else docs:
+            self.entries.append({"section": section, "title": title, "text": textwrap.dedent(markdown).strip()})
+            # A title names what its entry is about, so its words count twice
+            terms.append(Counter(tokenize(title) * 2 + tokenize(markdown)))
+        n = len(terms)
+        average_length = sum(sum(tf.values()) for tf in terms) / n if n else 0.0
+        df = Counter(term for tf in terms for term in tf)
+        self.idf = {term: math.log(1 + (n - count + 0.5) / (count + 0.5)) for term, count in df.items()}
+        for doc, tf in enumerate(terms):
+            norm = K1 * (1 - B + B * sum(tf.values()) / average_length)
+            for term, count in tf.items():
+                self.postings[term].append((doc, self.idf[term] * count * (K1 + 1) / (count + norm)))
+        self._terms = [set(tf) for tf in terms]
+
+    def __len__(self):
+        return len(self.entries)
+
+    # BM25 score of every entry sharing a word with the question, by entry index
+    def scores(self, words):
+        scores = defaultdict(float)
+        for term in words:
+            for doc, weight in self.postings.get(term, ()):
+                scores[doc] += weight
+        return scores
+
+    # Entries sharing a word with the question, best first, as (score, entry index)
+    def rank(self, question):
+        return sorted(((score, doc) for doc, score in self.scores(question_terms(question)).items()), reverse=True)
+
+    # The entry answering the question as {"section", "title", "text", "score"},
+    # or None when no entry is a confident match
+    def match(self, question):
+        if not self.enabled:
+            return None
+        words = question_terms(question)
+        entry = None
+        # A word in no entry at all rules out every entry before any scoring
+        if words and all(word in self.idf for word in words):
+            doc, score = max(self.scores(words).items(), key=lambda item: item[1])
+            if score >= self.min_score and words <= self._terms[doc]:
+                entry = {**self.entries[doc], "score": score}
+        with self._lock:
+            self.lookups += 1
+            self.deflected += entry is not None
+        return entry
+
+    # Counts a question sent to the model without matching, such as a follow-up,
+    # so the deflection rate is over every question asked
+    def skip(self):
+        with self._lock:
+            self.lookups += 1
+
+    # Records how long a model answer took, to estimate the time matched answers save
+    def observe(self, seconds):
+        with self._lock:
+            self.model_answers += 1
+            self.model_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            mean_model_seconds = self.model_seconds / self.model_answers if self.model_answers else 0.0
+            return {
+                "lookups": self.lookups,
+                "deflected": self.deflected,
+                "deflection_rate": self.deflected / self.lookups if self.lookups else 0.0,
+                "mean_model_seconds": mean_model_seconds,
+                "seconds_saved": self.deflected * mean_model_seconds,
+            }
+
+
+def format_answer(entry):
+    return f"**{entry['title']}**\n\n{entry['text']}\n\n_From CycleCare AI's {entry['section']} guide._"
+
+
+# Questions as users ask them, weighted by how often they come up, with the
+# entry that answers each or None for questions only the model can answer
+TRAFFIC = [
+    ("What are healthy snacks for PCOS?", 12, "Healthy Snacks"),
+    ("Can I consult a healthcare professional through CycleCare AI?", 10,
+     "Can I consult with healthcare professionals through CycleCare AI?"),
+    ("What herbal remedies help PCOS?", 9, "Herbal and Natural Remedies"),
+    ("What blood tests are used for PCOS?", 8, "Blood Tests"),
+    ("Does CycleCare AI include mental health support?", 7, "Does CycleCare AI include mental health support?"),
+    ("local pcos support groups in nigeria", 6, "Local PCOS Support Groups"),
+    ("Is CycleCare only for women with PCOS?", 5, "Is CycleCare AI only for women with PCOS?"),
+    ("What is Flo Period Tracker?", 4, "Flo Period Tracker"),
+    ("What is an ultrasound for PCOS?", 3, "Ultrasound"),
+    ("PCOS statistics", 2, "PCOS Statistics"),
+    ("Can I get pregnant with PCOS?", 12, None),
+    ("What should I eat for breakfast?", 9, None),
+    ("Is metformin safe during pregnancy?", 7, None),
+    ("Why is my hair falling out?", 6, None),
+    ("What causes PCOS?", 6, None),
+    ("Can PCOS be cured?", 5, None),
+    ("Is inositol good for PCOS?", 4, None),
+    ("Does spearmint tea lower testosterone?", 3, None),
+    ("My period is late, am I pregnant?", 3, None),
+]
+
+
+# Replays TRAFFIC through the matcher in front of the fake OpenAI server,
+# answering misses from the model, and checks each match against its label
+def bench(requests=200, seed=0):
+    import numpy as np
+
+    from benchmarks.fake_openai_server import FakeOpenAIServer
+    from modules.ada_chat import create_llm, format_prompt
+
+    rng = np.random.default_rng(seed)
+    weights = np.array([weight for _, weight, _ in TRAFFIC], dtype=float)
+    picks = rng.choice(len(TRAFFIC), size=requests, p=weights / weights.sum())
+
+    start = time.perf_counter()
+    matcher = FaqMatcher(enabled=True)
+    build_ms = (time.perf_counter() - start) * 1000
+    match_latencies, answer_latencies, wrong = [], [], 0
+    with FakeOpenAIServer(ttft_ms=300, token_ms=2, tokens=40) as server:
+        llm = create_llm("sk-fake", base_url=server.url)
+        for i in picks:
+            question, _, expected = TRAFFIC[i]
+            start = time.perf_counter()
+            entry = matcher.match(question)
+            match_latencies.append(time.perf_counter() - start)
+            if entry is None:
+                llm.invoke(format_prompt(question, "English"))
+                matcher.observe(time.perf_counter() - start)
+            wrong += (entry and entry["title"]) != expected
+            answer_latencies.append(time.perf_counter() - start)
+        upstream = server.stats()["requests"]
+    match_latencies = np.array(match_latencies) * 1000
+    answer_latencies = np.array(answer_latencies) * 1000
+    return {
+        **matcher.stats(),
+        "entries": len(matcher),
+        "build_ms": build_ms,
+        "requests": requests,
+        "upstream_calls": upstream,
+        "wrong": int(wrong),
+        "match_p50_ms": float(np.percentile(match_latencies, 50)),
+        "match_p99_ms": float(np.percentile(match_latencies, 99)),
+        "answer_mean_ms": float(answer_latencies.mean()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer Ada questions from the app's own PCOS content.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    match_parser = commands.add_parser("match", help="Show how the content ranks for a question")
+    match_parser.add_argument("question")
+    bench_parser = commands.add_parser("bench", help="Deflection and latency for a mix of questions")
+    bench_parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        result = bench(args.requests)
+        print(f"{result['entries']} entries indexed in {result['build_ms']:.1f} ms; "
+              f"match p50 {result['match_p50_ms']:.3f} ms, p99 {result['match_p99_ms']:.3f} ms")
+        print(f"{result['requests']} questions: {result['deflection_rate']:.0%} answered from the content, "
+              f"{result['upstream_calls']} model calls, {result['wrong']} answered differently than labelled")
+        print(f"{result['seconds_saved']:.1f}s of waiting saved "
+              f"({result['mean_model_seconds'] * 1000:.0f} ms per model answer), "
+              f"mean answer time {result['answer_mean_ms']:.0f} ms")
+        return
+
+    matcher = FaqMatcher(enabled=True)
+    entry = matcher.match(args.question)
+    for score, doc in matcher.rank(args.question)[:5]:
+        print(f"{score:6.2f}  {matcher.entries[doc]['title']} ({matcher.entries[doc]['section']})")
+    print(f"Answered from: {entry['title']} (score {entry['score']:.2f})" if entry else "Sent to the model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import collections
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from modules.artifacts import default_store
+from modules.prediction_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Trained ultrasound CNN; resolved through the artifact store unless a path is given
+IMAGING_MODEL_PATH = "Pcos_Scan_model.h5"
+
+# Optional converted model for CPU-only nodes, selected with IMAGING_RUNTIME=tflite
+TFLITE_MODEL_PATH = "Pcos_Scan_model.tflite"
+IMAGING_RUNTIME = os.environ.get("IMAGING_RUNTIME", "keras")
+
+IMAGE_SIZE = (256, 256)
+
+# TensorFlow inference settings, overridable per deployment: op thread pool sizes
+# (0 keeps TensorFlow's default of one thread per core), a warm-up predict at load
+# time, and the largest batch served by a direct model call instead of Model.predict
+INTRA_OP_THREADS = int(os.environ.get("IMAGING_INTRA_OP_THREADS", "0"))
+INTER_OP_THREADS = int(os.environ.get("IMAGING_INTER_OP_THREADS", "0"))
+WARMUP = os.environ.get("IMAGING_WARMUP", "1") == "1"
+DIRECT_CALL_MAX_BATCH = int(os.environ.get("IMAGING_DIRECT_CALL_MAX_BATCH", "32"))
+
+
+def padded_batch_size(count):
+    return 1 << max(count - 1, 0).bit_length()
+
+
+# Runs a converted (optionally quantized) model with the same predict() call as
+# Keras. Resizing an interpreter that has already allocated its tensors crashes
+# TFLite's XNNPACK delegate, so each batch size gets its own interpreter, sized
+# once. Batches are zero-padded to the next power of two to bound how many
+# interpreters are kept.
+class TFLiteModel:
+    def __init__(self, model_path=TFLITE_MODEL_PATH, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._interpreter_class = Interpreter
+        self.interpreters = {}
+        self.input, self.output = self._interpreter(1)[1:]
+        # An interpreter keeps state between set_tensor and get_tensor
+        self._lock = threading.Lock()
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        count = len(batch)
+        size = padded_batch_size(count)
+        if size != count:
+            batch = np.concatenate([batch, np.zeros((size - count, *batch.shape[1:]), dtype=np.float32)])
+        with self._lock:
+            interpreter, input_details, output_details = self._interpreter(size)
+            interpreter.set_tensor(input_details["index"], self._quantize(batch, input_details))
+            interpreter.invoke()
+            output = interpreter.get_tensor(output_details["index"])
+        return self._dequantize(output, output_details)[:count]
+
+    # The interpreter for one batch size and its input and output details
+    def _interpreter(self, size):
+        if size not in self.interpreters:
+            interpreter = self._interpreter_class(model_path=self.model_path, num_threads=self.num_threads)
+            input_details = interpreter.get_input_details()[0]
+            if input_details["shape"][0] != size:
+                interpreter.resize_tensor_input(input_details["index"], [size, *input_details["shape"][1:]])
+            interpreter.allocate_tensors()
+            self.interpreters[size] = (
+                interpreter, interpreter.get_input_details()[0], interpreter.get_output_details()[0],
+            )
+        return self.interpreters[size]
+
+    @staticmethod
+    def _quantize(values, details):
+        if details["dtype"] == np.float32:
+            return values
+        scale, zero_point = details["quantization"]
+        info = np.iinfo(details["dtype"])
+        return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(details["dtype"])
+
+    @staticmethod
+    def _dequantize(values, details):
+        if details["dtype"] == np.float32:
+            return values
+        scale, zero_point = details["quantization"]
+        return (values.astype(np.float32) - zero_point) * scale
+
+
+# Thread pools can only be sized before TensorFlow runs its first op
+def configure_tensorflow(intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS):
+    import tensorflow as tf
+
+    threading_config = tf.config.threading
+    for threads, get, set_ in (
+        (intra_op_threads, threading_config.get_intra_op_parallelism_threads, threading_config.set_intra_op_parallelism_threads),
+        (inter_op_threads, threading_config.get_inter_op_parallelism_threads, threading_config.set_inter_op_parallelism_threads),
+    ):
+        if threads and get() != threads:
+            try:
+                set_(threads)
+            except RuntimeError:
+                logger.warning("TensorFlow is already initialized; keeping its %s.", set_.__name__[4:].replace("_", " "))
+
+
+# Keras model whose small batches skip Model.predict, which builds a data pipeline
+# and runs callbacks on every call. They go through one tf.function traced for
+# any batch size instead; larger batches still use Model.predict, which splits
+# them into batch_size chunks.
+class KerasModel:
+    def __init__(self, model, direct_call_max_batch=DIRECT_CALL_MAX_BATCH):
+        import tensorflow as tf
+
+        self.model = model
+        self.direct_call_max_batch = direct_call_max_batch
+        self._call = tf.function(
+            lambda images: model(images, training=False),
+            input_signature=[tf.TensorSpec((None, *model.input_shape[1:]), tf.float32)],
+        )
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        if len(batch) <= self.direct_call_max_batch:
+            return self._call(batch).numpy()
+        return self.model.predict(batch, batch_size=batch_size, verbose=verbose)
+
+
+# Runs dummy batches through the model so tracing and allocator growth happen at
+# load time instead of on the first patient's image
+def warm_up(model, batch_sizes=(1,)):
+    for batch_size in batch_sizes:
+        model.predict(np.zeros((batch_size, *IMAGE_SIZE, 3), dtype=np.float32), batch_size=batch_size, verbose=0)
+
+
+def load_keras_model(model_path=None):
+    from tensorflow.keras.models import load_model
+
+    if model_path is None:
+        return default_store().load("imaging", load_model)
+    return load_model(model_path)
+
+
+# Falls back to the Keras model when the converted artifact has not been built
+def load_imaging_model(
+    model_path=None, runtime=IMAGING_RUNTIME, tflite_path=TFLITE_MODEL_PATH, warmup=WARMUP,
+    intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS,
+):
+    if runtime == "tflite":
+        if os.path.exists(tflite_path):
+            model = TFLiteModel(tflite_path, num_threads=intra_op_threads or None)
+            if warmup:
+                warm_up(model)
+            return model
+        logger.warning("TFLite model '%s' not found, falling back to the Keras model.", tflite_path)
+    configure_tensorflow(intra_op_threads, inter_op_threads)
+    model = KerasModel(load_keras_model(model_path))
+    if warmup:
+        warm_up(model)
+    return model
+
+
+# Identifies the weights behind a loaded model, for keying cached predictions;
+# worker pools report the version their workers loaded
+def model_version(model):
+    if getattr(model, "version", None):
+        return model.version
+    if isinstance(model, TFLiteModel):
+        return file_sha256(model.model_path)
+    return default_store().digest("imaging")
+
+
+# Let the JPEG decoder scale large uploads down by up to 8x while decoding,
+# instead of decoding every pixel and throwing most of them away in resize()
+DRAFT_DECODE = os.environ.get("IMAGING_DRAFT_DECODE", "1") == "1"
+
+
+# Contiguous (256, 256, 3) uint8 pixels, ready to be normalized in place or in a batch
+def decode_image(source, draft=DRAFT_DECODE):
+    with Image.open(source) as img:
+        if draft and img.format == "JPEG":
+            img.draft("RGB", IMAGE_SIZE)
+        img = img.convert("RGB").resize(IMAGE_SIZE)
+    return np.asarray(img, dtype=np.uint8)
+
+
+# Same values as img_to_array(pixels) / 255.0, computed in float32 straight from
+# uint8 and optionally written into a preallocated batch slot
+def normalize(pixels, out=None):
+    return np.divide(pixels, np.float32(255.0), out=out, dtype=np.float32)
+
+
+def preprocess_image(source, draft=DRAFT_DECODE):
+    return normalize(decode_image(source, draft))
+
+
+def classify(score, threshold):
+    return "Noninfected" if score >= threshold else "Infected"
+
+
+def _decode(source, opener):
+    try:
+        return decode_image(opener(source) if opener else source), None
+    except Exception as e:
+        return None, str(e)
+
+
+# Decodes images on a thread pool and hands over ready batches through a bounded
+# queue, so the model works on one batch while the next ones are being decoded.
+# At most (prefetch + 1) batches of uint8 pixels are decoded ahead, whatever the
+# number of images. An error raised while iterating `sources` is re-raised to
+# the consumer after the batches decoded before it.
+def iter_preprocessed_batches(sources, batch_size=32, workers=None, prefetch=2, opener=None):
+    workers = workers or os.cpu_count() or 1
+    ready = queue.Queue(maxsize=prefetch)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        pending = collections.deque()
+        batch = []
+        end = done
+
+        def collect():
+            source, future = pending.popleft()
+            batch.append((source, *future.result()))
+            if len(batch) < batch_size:
+                return True
+            full = list(batch)
+            batch.clear()
+            return put(full)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                try:
+                    for source in sources:
+                        pending.append((source, pool.submit(_decode, source, opener)))
+                        if len(pending) >= batch_size * (prefetch + 1) and not collect():
+                            return
+                except BaseException as e:
+                    # Images already submitted are still handed over before the error
+                    end = e
+                while pending:
+                    if not collect():
+                        return
+                if batch:
+                    put(list(batch))
+        except BaseException as e:
+            end = e
+        finally:
+            put(end)
+
+    producer = threading.Thread(target=produce, name="image-decoder", daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = ready.get()
+            if batch is done:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+    finally:
+        stop.set()
+
+
+# Yields (source, sigmoid score, error) per image, in input order
+def predict_images(model, sources, batch_size=32, workers=None, prefetch=2, opener=None):
+    for batch in iter_preprocessed_batches(sources, batch_size, workers, prefetch, opener):
+        pixels = [array for _, array, error in batch if error is None]
+        scores = iter(())
+        if pixels:
+            inputs = np.empty((len(pixels), *IMAGE_SIZE, 3), dtype=np.float32)
+            for i, array in enumerate(pixels):
+                normalize(array, out=inputs[i])
+            scores = iter(model.predict(inputs, batch_size=len(inputs), verbose=0)[:, 0])
+        for source, array, error in batch:
+            yield source, (float(next(scores)) if error is None else None), error
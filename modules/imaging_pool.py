@@ -0,0 +1,234 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from modules.imaging import IMAGE_SIZE, IMAGING_RUNTIME, TFLITE_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+# Inference processes serving imaging predictions (0 runs the model in the app's
+# own process) and the most images one request hands to a worker at a time
+IMAGING_WORKERS = int(os.environ.get("IMAGING_WORKERS", "0"))
+WORKER_BATCH_CAPACITY = int(os.environ.get("IMAGING_WORKER_BATCH_CAPACITY", "32"))
+WORKER_START_TIMEOUT = 300
+
+IMAGE_SHAPE = (*IMAGE_SIZE, 3)
+
+
+# Runs in each inference process: loads the model once, then scores batches
+# that the dispatcher writes into this worker's shared input buffer. Only the
+# batch size goes through the pipe, and only the scores come back.
+def _worker_main(conn, buffer_name, capacity, options):
+    from modules.imaging import load_imaging_model, model_version
+
+    try:
+        buffer = shared_memory.SharedMemory(name=buffer_name)
+        inputs = np.ndarray((capacity, *IMAGE_SHAPE), dtype=np.float32, buffer=buffer.buf)
+        model = load_imaging_model(**options)
+        conn.send(("ready", model_version(model)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    try:
+        while True:
+            try:
+                count = conn.recv()
+            except EOFError:
+                return
+            if count is None:
+                return
+            try:
+                scores = model.predict(inputs[:count], batch_size=count, verbose=0)[:, 0]
+                conn.send(("ok", np.asarray(scores, dtype=np.float32)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        del inputs
+        buffer.close()
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+# One inference process and the shared buffer it reads its inputs from. The
+# buffer belongs to the pool and outlives the process, so a replacement
+# process attaches to the same buffer.
+class _Worker:
+    def __init__(self, index, context, capacity, options):
+        self.index = index
+        self.context = context
+        self.capacity = capacity
+        self.options = options
+        self.buffer = shared_memory.SharedMemory(create=True, size=capacity * int(np.prod(IMAGE_SHAPE)) * 4)
+        self.inputs = np.ndarray((capacity, *IMAGE_SHAPE), dtype=np.float32, buffer=self.buffer.buf)
+        self.requests = 0
+        self.process = None
+        self.conn = None
+        # Set when the process has died and has not been successfully restarted
+        self.failed = False
+
+    def start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_conn, self.buffer.name, self.capacity, self.options),
+            name=f"imaging-worker-{self.index}", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def wait_ready(self, timeout=WORKER_START_TIMEOUT):
+        if not self.conn.poll(timeout):
+            raise WorkerCrashed(f"Imaging worker {self.index} did not start within {timeout}s.")
+        try:
+            status, value = self.conn.recv()
+        except EOFError:
+            raise WorkerCrashed(f"Imaging worker {self.index} exited while loading the model.") from None
+        if status != "ready":
+            raise RuntimeError(f"Imaging worker {self.index} could not load the model: {value}")
+        return value
+
+    def predict(self, batch):
+        self.inputs[:len(batch)] = batch
+        try:
+            self.conn.send(len(batch))
+            status, value = self.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+            self.failed = True
+            raise WorkerCrashed(f"Imaging worker {self.index} exited (exit code {self.process.exitcode}).") from None
+        if status != "ok":
+            raise RuntimeError(value)
+        self.requests += 1
+        return value
+
+    def stop(self, timeout=5):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+    def release(self):
+        del self.inputs
+        self.buffer.close()
+        self.buffer.unlink()
+
+
+# Spreads imaging predictions over worker processes that each hold their own
+# copy of the model, with the same predict() call as a loaded model. A request
+# takes whichever worker is idle first and batches larger than a worker's
+# buffer are split across workers. A worker that crashes is replaced and its
+# request retried once on the replacement. A worker that cannot be replaced
+# is set aside as failed, and the next request that finds no idle worker
+# tries the restart again.
+class ImagingPool:
+    def __init__(
+        self, workers=None, capacity=WORKER_BATCH_CAPACITY,
+        runtime=IMAGING_RUNTIME, tflite_path=TFLITE_MODEL_PATH, model_path=None, intra_op_threads=None,
+    ):
+        workers = workers or IMAGING_WORKERS or os.cpu_count() or 1
+        # Spawned rather than forked: TensorFlow is not fork-safe
+        context = multiprocessing.get_context("spawn")
+        threads = intra_op_threads or max(1, (os.cpu_count() or 1) // workers)
+        options = {
+            "model_path": model_path, "runtime": runtime, "tflite_path": tflite_path,
+            "intra_op_threads": threads, "inter_op_threads": 1,
+        }
+        self.capacity = capacity
+        self.restarts = 0
+        self._workers = [_Worker(i, context, capacity, options) for i in range(workers)]
+        self._idle = deque()
+        self._failed = deque()
+        self._available = threading.Condition()
+        self._lock = threading.Lock()
+        try:
+            for worker in self._workers:
+                worker.start()
+            versions = {worker.wait_ready() for worker in self._workers}
+        except BaseException:
+            self.close()
+            raise
+        self.version = versions.pop()
+        self._idle.extend(self._workers)
+        # The app keeps its pool for the life of the server; stop workers and free buffers on exit
+        atexit.register(self.close)
+
+    @property
+    def workers(self):
+        return len(self._workers)
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        chunks = [batch[i:i + self.capacity] for i in range(0, len(batch), self.capacity)]
+        if not chunks:
+            return np.empty((0, 1), dtype=np.float32)
+        if len(chunks) == 1:
+            return self._predict_chunk(chunks[0])[:, np.newaxis]
+        with ThreadPoolExecutor(max_workers=min(len(chunks), len(self._workers))) as executor:
+            return np.concatenate(list(executor.map(self._predict_chunk, chunks)))[:, np.newaxis]
+
+    def _predict_chunk(self, chunk):
+        worker = self._checkout()
+        try:
+            if worker.failed or not worker.process.is_alive():
+                self._restart(worker)
+            try:
+                return worker.predict(chunk)
+            except WorkerCrashed:
+                logger.warning("Imaging worker %d crashed; starting a replacement.", worker.index)
+                self._restart(worker)
+                return worker.predict(chunk)
+        finally:
+            self._checkin(worker)
+
+    # An idle worker, oldest first, or a failed one to restart when none is idle
+    def _checkout(self):
+        with self._available:
+            self._available.wait_for(lambda: self._idle or self._failed)
+            return self._idle.popleft() if self._idle else self._failed.popleft()
+
+    def _checkin(self, worker):
+        with self._available:
+            (self._failed if worker.failed else self._idle).append(worker)
+            self._available.notify()
+
+    def _restart(self, worker):
+        worker.failed = True
+        worker.stop()
+        worker.start()
+        worker.wait_ready()
+        worker.failed = False
+        with self._lock:
+            self.restarts += 1
+
+    def stats(self):
+        return {
+            "workers": len(self._workers),
+            "alive": sum(worker.process is not None and worker.process.is_alive() for worker in self._workers),
+            "requests": [worker.requests for worker in self._workers],
+            "restarts": self.restarts,
+            "failed": sum(worker.failed for worker in self._workers),
+        }
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        for worker in self._workers:
+            worker.release()
+        self._workers = []
@@ -0,0 +1,137 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+from modules.clinical import CLINICAL_FEATURES
+
+# Knobs for coalescing concurrent predictions, overridable per deployment
+MAX_BATCH_SIZE = int(os.environ.get("CLINICAL_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.environ.get("CLINICAL_MAX_WAIT_MS", "5"))
+
+_STOP = object()
+
+
+# Queues single-row requests from many script threads and scores them together
+# in one call, so per-call sklearn/pandas overhead is paid once per batch. Once
+# the batcher is closed, or its thread has died, submit() raises and no request
+# is left waiting.
+class MicroBatcher:
+    def __init__(self, predict_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        # Why submit() is refused: the batcher was closed or its thread stopped
+        self._closed = None
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        with self._submit_lock:
+            if self._closed is not None:
+                raise RuntimeError(self._closed)
+            self._queue.put((item, future))
+        return future
+
+    def predict(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def close(self):
+        with self._submit_lock:
+            if self._closed is None:
+                self._closed = "The batcher is closed."
+                self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        mean_batch = self.requests / self.batches if self.batches else 0.0
+        return {"requests": self.requests, "batches": self.batches, "mean_batch_size": mean_batch}
+
+    def _run(self):
+        batch = []
+        try:
+            self._loop(batch)
+        except BaseException as e:
+            with self._submit_lock:
+                self._closed = f"The batcher stopped: {e!r}"
+            raise
+        finally:
+            # Fails whatever the thread was scoring or had not picked up yet
+            with self._submit_lock:
+                error = self._closed
+                while True:
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if entry is not _STOP:
+                        batch.append(entry)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(error))
+
+    def _loop(self, batch):
+        while True:
+            batch.clear()
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch.append(first)
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = self.predict_batch(items)
+        except Exception as e:
+            # Score rows one by one so a single bad request only fails its own caller
+            if len(batch) > 1:
+                for entry in batch:
+                    self._process([entry])
+            else:
+                batch[0][1].set_exception(e)
+            return
+        if len(results) != len(batch):
+            error = RuntimeError(f"The model returned {len(results)} results for a batch of {len(batch)}.")
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        self.requests += len(batch)
+        self.batches += 1
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+def clinical_batch_predictor(model):
+    # Maps a list of clinical form dicts to PCOS likelihoods in percent
+    def predict_batch(rows):
+        frame = pd.DataFrame(rows, columns=CLINICAL_FEATURES)
+        return (model.predict_proba(frame)[:, 1] * 100).tolist()
+
+    return predict_batch
+
+
+def start_clinical_service(model, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    return MicroBatcher(clinical_batch_predictor(model), max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
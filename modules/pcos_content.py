@@ -0,0 +1,310 @@
+# Curated PCOS content shown on the Lifestyle and Community pages. It is also
+# the knowledge base Ada's answers are grounded in: documents() lists every piece
+# for modules.content_index to chunk and index.
+
+# PCOS-related resources
+PCOS_STATISTICS = """
+- PCOS affects 5-10% of women of reproductive age worldwide.
+- It is one of the leading causes of infertility in women.
+- Up to 70% of women with PCOS may have undiagnosed symptoms.
+- Women with PCOS are at a higher risk of developing type 2 diabetes, high blood pressure, and heart disease.
+"""
+
+LIFESTYLE_TIPS = """
+- Include whole grains, lean proteins, and healthy fats.
+- Engage in regular physical activity.
+- Practice mindfulness and relaxation to manage stress.
+"""
+
+NIGERIAN_FOODS = """
+- Grilled fish, boiled eggs, lean chicken, beans, and snails.
+- Brown rice, unripe plantain, sweet potatoes, and yam in moderation.
+- Ugu, bitter leaf, okra, spinach, and garden egg.
+- Avocados, groundnuts, coconut oil, and palm kernel oil.
+- Watermelon, apples, and oranges.
+"""
+
+FOREIGN_FOODS = """
+- Grilled salmon, tofu, and boiled eggs.
+- Quinoa, whole-grain pasta, and oats.
+- Broccoli, kale, and asparagus.
+- Almonds, walnuts, and olive oil.
+- Blueberries, kiwi, and avocados.
+"""
+
+HEALTHY_SNACKS = """
+- Nuts and seeds (almonds, walnuts, sunflower seeds)
+- Greek yogurt with fresh fruit
+- Sliced vegetables with hummus
+- Fresh fruit (berries, apples, oranges)
+- Dark chocolate (in moderation)
+"""
+
+LOCAL_FOOD_RECOMMENDATIONS = """
+- **Proteins**:
+    - Grilled fish
+    - Boiled eggs
+    - Lean chicken
+    - Beans
+    - Snails
+
+- **Carbohydrates**:
+    - Brown rice
+    - Unripe plantain
+    - Sweet potatoes
+    - Yam (in moderation)
+
+- **Vegetables**:
+    - Ugu (pumpkin leaves)
+    - Bitter leaf
+    - Okra
+    - Spinach
+    - Garden egg
+
+- **Healthy Fats**:
+    - Avocados
+    - Groundnuts (peanuts)
+    - Coconut oil
+    - Palm kernel oil
+
+- **Fruits**:
+    - Watermelon
+    - Apples
+    - Oranges
+"""
+
+INTERNATIONAL_FOOD_RECOMMENDATIONS = """
+- **Proteins**:
+    - Grilled salmon
+    - Tofu
+    - Boiled eggs
+
+- **Carbohydrates**:
+    - Quinoa
+    - Whole-grain pasta
+    - Oats
+
+- **Vegetables**:
+    - Broccoli
+    - Kale
+    - Asparagus
+
+- **Healthy Fats**:
+    - Almonds
+    - Walnuts
+    - Olive oil
+
+- **Fruits**:
+    - Blueberries
+    - Kiwi
+    - Avocados
+"""
+
+GENERAL_LIFESTYLE_TIPS = """
+- **Diet and Nutrition**:
+    - Focus on a balanced diet that includes:
+        - Whole grains: Brown rice, quinoa, whole oats, and whole-grain bread.
+        - Lean proteins: Chicken, fish, tofu, and legumes.
+        - Healthy fats: Avocados, nuts, seeds, and olive oil.
+    - Avoid processed foods, sugary drinks, and excessive carbohydrates.
+    - Consider a low glycemic index (GI) diet to help manage insulin levels.
+
+- **Exercise and Physical Activity**:
+    - Aim for at least 30 minutes of moderate exercise most days of the week.
+    - Include a mix of cardio exercises (like walking, swimming, or cycling) and strength training.
+    - Yoga and Pilates can also help improve flexibility, reduce stress, and support hormone balance.
+
+- **Stress Management**:
+    - Practice mindfulness and relaxation techniques such as meditation, deep breathing exercises, or progressive muscle relaxation.
+    - Engage in activities that you enjoy and that help you relax, such as reading, gardening, or listening to music.
+    - Ensure you get adequate sleep, aiming for 7-9 hours per night.
+
+- **Regular Health Check-ups**:
+    - Schedule regular visits with your healthcare provider to monitor your condition.
+    - Keep track of your symptoms, menstrual cycles, and any changes in your health.
+"""
+
+HERBAL_REMEDIES = """
+### Herbal and Natural Remedies for PCOS
+
+Managing PCOS often includes exploring various herbal and natural remedies. These remedies can help alleviate symptoms and improve overall health.
+
+#### In Nigeria
+- **Bitter Leaf (Vernonia amygdalina)**: Known for its anti-inflammatory and antioxidant properties, bitter leaf can help reduce PCOS symptoms.
+- **Scent Leaf (Ocimum gratissimum)**: This herb is used in traditional Nigerian medicine to support reproductive health and balance hormones.
+- **Moringa (Moringa oleifera)**: Rich in vitamins and minerals, moringa can help balance hormones, reduce inflammation, and improve overall health.
+- **Turmeric (Curcuma longa)**: Turmeric's anti-inflammatory properties can help manage PCOS symptoms and improve insulin resistance.
+
+ #### Internationally
+- **Spearmint Tea**: Drinking spearmint tea regularly can help reduce androgen levels, which may improve symptoms like hirsutism.
+- **Cinnamon (Cinnamomum verum)**: Cinnamon can help regulate menstrual cycles and improve insulin sensitivity in women with PCOS.
+- **Ashwagandha (Withania somnifera)**: Known as an adaptogen, ashwagandha can help manage stress, which is crucial for balancing hormones.
+- **Saw Palmetto (Serenoa repens)**: This herb can help reduce androgen levels and improve symptoms like acne and hair loss.
+
+#### Lifestyle Tips
+- **Maintain a Healthy Diet**: Focus on whole foods, including plenty of fruits, vegetables, lean proteins, and whole grains.
+- **Regular Exercise**: Engage in regular physical activity to help manage weight, improve insulin sensitivity, and reduce stress.
+- **Stress Management**: Practice mindfulness, yoga, or meditation to manage stress levels, which can have a positive impact on PCOS symptoms.
+
+            Consult with a healthcare professional before starting any herbal or natural remedies to ensure they are safe and appropriate for you.
+"""
+
+# Testing Information expanders, as (title, markdown)
+TESTING_INFO = [
+    ("1. Blood Tests", """
+    - **Hormone Levels**: Tests to measure levels of androgens (male hormones) like testosterone, luteinizing hormone (LH), follicle-stimulating hormone (FSH), and estradiol.
+    - **Glucose Tolerance Test**: Measures how your body processes glucose to check for insulin resistance or diabetes.
+    - **Lipid Profile**: Measures cholesterol and triglyceride levels to assess heart disease risk.
+    - **Thyroid Function Tests**: Checks for thyroid disorders, which can cause symptoms similar to PCOS.
+    """),
+    ("2. Ultrasound", """
+    - **Transvaginal Ultrasound**: Uses sound waves to create images of your ovaries and the thickness of the lining of your uterus.
+    """),
+    ("3. Physical Examination", """
+    - **Pelvic Exam**: A healthcare provider may perform a pelvic exam to check for any abnormalities in the reproductive organs.
+    """),
+    ("4. Other Tests", """
+    - **Endometrial Biopsy**: In some cases, a biopsy of the endometrial lining may be recommended to rule out endometrial cancer.
+    - **Sleep Study**: If symptoms of sleep apnea are present, a sleep study may be recommended.
+    """),
+]
+
+# Mental Health Resources expanders, as (title, markdown)
+MENTAL_HEALTH_RESOURCES = [
+    ("1. Mindfulness and Meditation", """
+    - **Headspace**: Offers guided meditations and mindfulness exercises to help reduce stress and improve mental clarity. [Visit Headspace](https://www.headspace.com/)
+    - **Calm**: Provides meditation sessions, sleep stories, and relaxation techniques. [Visit Calm](https://www.calm.com/)
+    """),
+    ("2. Therapy and Counseling", """
+    - **BetterHelp**: Connects you with licensed therapists for online counseling sessions. [Visit BetterHelp](https://www.betterhelp.com/)
+    - **Talkspace**: Offers online therapy with licensed therapists through text, audio, and video messages. [Visit Talkspace](https://www.talkspace.com/)
+    """),
+    ("3. Support Groups", """
+    Joining a support group can provide a sense of community and help you connect with others who understand what you're going through.
+
+    - **PCOS Challenge**: Offers support groups, workshops, and educational resources for women with PCOS. [Visit PCOS Challenge](https://www.pcoschallenge.org/)
+    - **SoulCysters**: An online forum where women with PCOS can share their experiences and support each other. [Visit SoulCysters](http://www.soulcysters.net/)
+    """),
+    ("4. Lifestyle and Self-Care", """
+    - **Exercise Regularly**: Physical activity can help reduce stress and improve mood. Aim for at least 30 minutes of moderate exercise most days of the week.
+    - **Healthy Diet**: Eating a balanced diet with plenty of fruits, vegetables, lean proteins, and whole grains can support overall health and well-being.
+    - **Sleep Well**: Aim for 7-9 hours of sleep each night to help your body recover and manage stress better.
+    """),
+    ("5. Educational Resources", """
+    - **PCOS Awareness Association**: Provides information on PCOS and mental health, along with resources to help manage symptoms. [Visit PCOS Awareness Association](https://www.pcosaa.org/)
+    """),
+]
+
+# Frequently asked questions, as (question, answer)
+FAQS = [
+    ("How does CycleCare AI support PCOS management?", """
+    CycleCare AI offers a holistic approach by providing tools such as symptom trackers, 
+    personalized meal plans, tailored fitness programs, stress management techniques, 
+    and access to telemedicine services. Additionally, the supportive community fosters 
+    24/7 motivation and shared experiences.
+    """),
+    ("Can I consult with healthcare professionals through CycleCare AI?", """
+    Yes! CycleCare AI integrates telemedicine services, enabling users to consult with 
+    certified healthcare professionals, including gynecologists, endocrinologists, 
+    nutritionists, and fitness coaches. Personalized wellness plans are crafted to suit 
+    your individual needs.
+    """),
+    ("Is CycleCare AI only for women with PCOS?", """
+    No, while CycleCare AI is designed for individuals managing PCOS, the platform is 
+    beneficial for anyone seeking to improve their hormonal health, nutrition, fitness, 
+    and overall well-being through expert advice and community support.
+    """),
+    ("What kind of community support does CycleCare AI provide?", """
+    CycleCare AI connects users with an engaging community where women share experiences, 
+    offer peer support, and access educational resources. The community forums and support 
+    groups provide a safe space for motivation, encouragement, and learning.
+    """),
+    ("Does CycleCare AI include mental health support?", """
+    Yes, CycleCare AI recognizes the importance of mental health in managing PCOS and 
+    overall wellness. We provide access to mental health professionals who specialize in 
+    hormonal health, stress management, and emotional well-being.
+    """),
+]
+
+# Community & support groups
+SUPPORT_GROUPS = """
+### Local PCOS Support Groups You Can Join in Nigeria
+
+- **Cysters Advocate**: [Join WhatsApp Group](https://chat.whatsapp.com/F9mezTC19kFFajwjGneSGb)  
+- **That.PCOS.Chick**: [Follow on Instagram](https://www.instagram.com/that.pcos.chick?igsh=MXNqdWQ5cW9ybXI2cQ==)  
+- **PCOS Conquerors**: [Follow on Instagram](https://www.instagram.com/pcosconquerors?igsh=cnphY3l0eWdicDBp)  
+- **The Fit Priest** (aka Selema ‘That’ PCOS Babe): [Follow on Instagram](https://www.instagram.com/thefitpriest?igsh=bHY0YjFodGd5dXoz) 
+- **PCOS Awareness Association**: [Visit Official Website](https://www.pcosaa.org/)
+"""
+
+# Tracking Tools Section Content
+TRACKING_TOOLS = [
+    {
+        "name": "Flo Period Tracker",
+        "description": "Tracks menstrual cycles, ovulation, and symptoms. Offers personalized insights.",
+        "link": "https://flo.health/",
+    },
+    {
+        "name": "MyFitnessPal",
+        "description": "Tracks daily food intake and fitness activities to support healthy habits.",
+        "link": "https://www.myfitnesspal.com/",
+    },
+    {
+        "name": "Clue",
+        "description": "Tracks menstrual cycles and symptoms, offering predictions about ovulation and periods.",
+        "link": "https://helloclue.com/",
+    },
+    {
+        "name": "Fitbit",
+        "description": "Monitors physical activity, sleep, and stress, encouraging regular exercise.",
+        "link": "https://www.fitbit.com/",
+    },
+    {
+        "name": "Headspace",
+        "description": "Provides guided meditations and stress-relief techniques to enhance mental health.",
+        "link": "https://www.headspace.com/",
+    },
+    {
+        "name": "Cara Care",
+        "description": "Tracks food, symptoms, and digestion to support dietary adjustments.",
+        "link": "https://cara.care/",
+    },
+    {
+        "name": "Kindara",
+        "description": "Tracks fertility and basal body temperature to provide insights into hormonal health.",
+        "link": "https://www.kindara.com/",
+    },
+    {
+        "name": "PCOS Tracker App",
+        "description": "Tracks PCOS-specific symptoms, medication, and lifestyle habits.",
+        "link": "https://pcostrackerapp.com/",
+    },
+    {
+        "name": "Period Diary",
+        "description": "Tracks cycles, moods, and symptoms with visual trend reports.",
+        "link": "https://www.perioddiary.com/",
+    },
+    {
+        "name": "Happify",
+        "description": "Focuses on emotional health and well-being through interactive activities.",
+        "link": "https://www.happify.com/",
+    },
+]
+
+
+# Every piece of content as (section, title, markdown). The food lists are the
+# compact versions of the Food Recommendations expanders.
+def documents():
+    return [
+        ("About PCOS", "PCOS Statistics", PCOS_STATISTICS),
+        ("Food Recommendations", "Local (Nigerian) Foods", NIGERIAN_FOODS),
+        ("Food Recommendations", "International Foods", FOREIGN_FOODS),
+        ("Food Recommendations", "Healthy Snacks", HEALTHY_SNACKS),
+        ("Lifestyle Tips", "General Lifestyle Tips", GENERAL_LIFESTYLE_TIPS),
+        ("Herbal and Natural Remedies", "Herbal and Natural Remedies", HERBAL_REMEDIES),
+        *[("Testing Information", title.split(". ", 1)[-1], text) for title, text in TESTING_INFO],
+        *[("Mental Health Resources", title.split(". ", 1)[-1], text) for title, text in MENTAL_HEALTH_RESOURCES],
+        *[("FAQs", question, answer) for question, answer in FAQS],
+        ("Community & Support", "Local PCOS Support Groups", SUPPORT_GROUPS),
+        *[("Tracking Tools", tool["name"], f"{tool['description']} {tool['link']}") for tool in TRACKING_TOOLS],
+    ]
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# In-memory entry count and optional on-disk location, overridable per deployment
+CACHE_SIZE = int(os.environ.get("IMAGING_CACHE_SIZE", "1024"))
+CACHE_DIR = os.environ.get("IMAGING_CACHE_DIR") or None
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Raw sigmoid outputs keyed on a hash of the uploaded bytes and the model version,
+# so reruns and threshold changes never repeat decode or inference
+class PredictionCache:
+    def __init__(self, max_entries=CACHE_SIZE, disk_dir=CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(data, model_version):
+        digest = hashlib.sha256(model_version.encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        score = self._read_disk(key)
+        with self._lock:
+            if score is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, score)
+        return score
+
+    def put(self, key, score):
+        score = float(score)
+        with self._lock:
+            self._remember(key, score)
+        self._write_disk(key, score)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _remember(self, key, score):
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key)) as f:
+                return float(json.load(f)["score"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, score):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"score": score}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from modules.batch_imaging import list_images, peak_memory_mb
+from modules.imaging import TFLITE_MODEL_PATH, load_imaging_model, load_keras_model, preprocess_image
+
+
+def load_images(path, limit=None):
+    names, opener = list_images(path)
+    loaded = {}
+    for name in names:
+        try:
+            loaded[name] = preprocess_image(opener(name) if opener else name)
+        except OSError:
+            continue
+        if limit and len(loaded) == limit:
+            break
+    return loaded
+
+
+def representative_images(calibration_dir, limit):
+    for image in load_images(calibration_dir, limit).values():
+        yield [np.expand_dims(image, axis=0)]
+
+
+def convert(model_path, output_path, mode, calibration_dir=None, calibration_size=200):
+    import tensorflow as tf
+
+    model = load_keras_model(model_path)
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        model.export(saved_model_dir)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if mode == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        elif mode == "int8":
+            # Activation ranges come from real ultrasound images; inputs and outputs stay float32
+            converter.representative_dataset = lambda: representative_images(calibration_dir, calibration_size)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        tflite_model = converter.convert()
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+    return len(tflite_model)
+
+
+# Runs in a fresh process per runtime so peak RSS is not shared between models
+def measure(runtime, validation_dir, tflite_path, batch_size, single_runs):
+    start = time.perf_counter()
+    model = load_imaging_model(runtime=runtime, tflite_path=tflite_path)
+    load_seconds = time.perf_counter() - start
+
+    loaded = load_images(validation_dir)
+    names = list(loaded)
+    images = np.stack(list(loaded.values()))
+
+    model.predict(images[:1], batch_size=1, verbose=0)
+    single = []
+    for image in images[:single_runs]:
+        start = time.perf_counter()
+        model.predict(image[np.newaxis], batch_size=1, verbose=0)
+        single.append(time.perf_counter() - start)
+
+    scores = []
+    start = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        batch = images[i:i + batch_size]
+        scores.extend(float(s) for s in model.predict(batch, batch_size=len(batch), verbose=0)[:, 0])
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "runtime": runtime,
+        "load_seconds": load_seconds,
+        "single_ms_p50": float(np.percentile(single, 50) * 1000),
+        "single_ms_p99": float(np.percentile(single, 99) * 1000),
+        "batch_images_per_sec": len(images) / batch_seconds,
+        "peak_rss_mb": peak_memory_mb(),
+        "scores": dict(zip(names, scores)),
+    }
+
+
+def run_measure(runtime, args):
+    command = [
+        sys.executable, "-m", "modules.quantize_imaging", "measure", args.validation_dir,
+        "--runtime", runtime, "--tflite", args.tflite, "--batch-size", str(args.batch_size),
+        "--single-runs", str(args.single_runs),
+    ]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(args):
+    if not os.path.exists(args.tflite):
+        raise SystemExit(f"TFLite model '{args.tflite}' not found; run the convert command first.")
+    reference = run_measure("keras", args)
+    converted = run_measure("tflite", args)
+
+    names = list(reference["scores"])
+    keras_scores = np.array([reference["scores"][name] for name in names])
+    tflite_scores = np.array([converted["scores"][name] for name in names])
+    agreement = {
+        "images": len(names),
+        "same_class": float(np.mean((keras_scores >= args.threshold) == (tflite_scores >= args.threshold))),
+        "mean_abs_diff": float(np.mean(np.abs(keras_scores - tflite_scores))),
+        "max_abs_diff": float(np.max(np.abs(keras_scores - tflite_scores))),
+    }
+
+    print(f"{'runtime':<10}{'load s':>9}{'p50 ms':>9}{'p99 ms':>9}{'img/s':>9}{'RSS MB':>9}")
+    for result in (reference, converted):
+        print(f"{result['runtime']:<10}{result['load_seconds']:>9.2f}{result['single_ms_p50']:>9.2f}"
+              f"{result['single_ms_p99']:>9.2f}{result['batch_images_per_sec']:>9.1f}{result['peak_rss_mb'] or 0:>9.0f}")
+    print(f"Agreement on {agreement['images']} images: {agreement['same_class']:.2%} same class at "
+          f"threshold {args.threshold}, mean |diff| {agreement['mean_abs_diff']:.4f}, max |diff| {agreement['max_abs_diff']:.4f}")
+
+    if args.report:
+        report = {"keras": reference, "tflite": converted, "agreement": agreement}
+        for result in (reference, converted):
+            del result["scores"]
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the ultrasound CNN to TFLite and compare it with Keras.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="Write a quantized TFLite model")
+    convert_parser.add_argument("--model", default=None, help="Path to the Keras model (default: artifact store)")
+    convert_parser.add_argument("--output", default=TFLITE_MODEL_PATH, help="Where to write the TFLite model")
+    convert_parser.add_argument("--mode", choices=["dynamic", "float16", "int8"], default="dynamic")
+    convert_parser.add_argument("--calibration-dir", help="Folder or ZIP of images used to calibrate int8 ranges")
+    convert_parser.add_argument("--calibration-size", type=int, default=200, help="Images used for calibration")
+
+    for name in ("compare", "measure"):
+        sub = commands.add_parser(name, help="Compare latency, RSS and agreement" if name == "compare" else argparse.SUPPRESS)
+        sub.add_argument("validation_dir", help="Folder or ZIP of validation images")
+        sub.add_argument("--tflite", default=TFLITE_MODEL_PATH, help="Path to the TFLite model")
+        sub.add_argument("--batch-size", type=int, default=32)
+        sub.add_argument("--single-runs", type=int, default=50, help="Images timed one at a time")
+        if name == "compare":
+            sub.add_argument("--threshold", type=float, default=0.5)
+            sub.add_argument("--report", help="Also write the comparison as JSON")
+        else:
+            sub.add_argument("--runtime", choices=["keras", "tflite"], required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        if args.mode == "int8" and not args.calibration_dir:
+            parser.error("--calibration-dir is required for int8 quantization.")
+        size = convert(args.model, args.output, args.mode, args.calibration_dir, args.calibration_size)
+        print(f"Wrote {args.output} ({size / 1024 ** 2:.1f} MB, {args.mode})")
+    elif args.command == "compare":
+        compare(args)
+    else:
+        print(json.dumps(measure(args.runtime, args.validation_dir, args.tflite, args.batch_size, args.single_runs)))
+
+
+if __name__ == "__main__":
+    main()
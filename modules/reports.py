@@ -0,0 +1,272 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from fpdf import FPDF
+from PIL import Image
+
+from modules.clinical import CLINICAL_FEATURES
+
+# Worker processes rendering reports, overridable per deployment
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cycleec.png")
+
+TITLES = {"clinical": "PCOS Clinical Assessment Report", "imaging": "PCOS Ultrasound Imaging Report"}
+
+DISCLAIMER = (
+    "This report is for informational purposes only and is not a substitute for professional medical advice. "
+    "Please consult a healthcare provider for a definitive diagnosis."
+)
+
+
+# fpdf 1.7's core fonts only cover latin-1
+def _text(value):
+    return str(value).replace("–", "-").replace("—", "-").encode("latin-1", "replace").decode("latin-1")
+
+
+class _ReportPDF(FPDF):
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Helvetica", "I", 8)
+        self.set_text_color(120, 120, 120)
+        self.cell(0, 10, f"CycleCare AI - page {self.page_no()}", 0, 0, "C")
+
+
+# Everything a report needs that does not depend on the result: the logo is
+# flattened (fpdf 1.7 cannot embed PNG alpha), downscaled and parsed once, and
+# handed to every document instead of being decoded again for each one
+class ReportTemplate:
+    def __init__(self, logo_path=LOGO_PATH):
+        self.logo_name = None
+        self.logo_info = None
+        self._scratch = tempfile.TemporaryDirectory()
+        if logo_path and os.path.exists(logo_path):
+            with Image.open(logo_path) as image:
+                image = image.convert("RGBA")
+                image.thumbnail((300, 300))
+                flattened = Image.new("RGB", image.size, "white")
+                flattened.paste(image, mask=image.getchannel("A"))
+            self.logo_name = os.path.join(self._scratch.name, "logo.jpg")
+            flattened.save(self.logo_name, quality=90)
+            pdf = self.document()
+            pdf.add_page()
+            pdf.image(self.logo_name, 10, 8, 20)
+            self.logo_info = pdf.images[self.logo_name]
+
+    def document(self):
+        pdf = _ReportPDF(format="A4")
+        pdf.set_auto_page_break(True, 20)
+        if self.logo_info is not None:
+            pdf.images[self.logo_name] = dict(self.logo_info)
+        return pdf
+
+    # Renders one result, shaped like a row of modules.result_store, and returns
+    # the PDF document with its page count
+    def render(self, result):
+        details = result.get("details") or {}
+        if isinstance(details, str):
+            details = json.loads(details)
+        created_at = result.get("created_at") or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        pdf = self.document()
+        pdf.add_page()
+        if self.logo_name:
+            pdf.image(self.logo_name, 10, 8, 20)
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.set_text_color(98, 0, 234)
+        pdf.cell(0, 20, _text(TITLES.get(result["kind"], "PCOS Report")), 0, 1, "C")
+        pdf.set_text_color(0, 0, 0)
+        pdf.ln(4)
+
+        pdf.set_font("Helvetica", "", 11)
+        rows = [
+            ("Patient", result.get("patient") or "Patient"),
+            ("Date", created_at[:19].replace("T", " ") + " UTC"),
+            ("Result", result["outcome"]),
+        ]
+        if result.get("score") is not None:
+            if result["kind"] == "clinical":
+                rows.append(("PCOS Likelihood", f"{result['score']:.2f}%"))
+            else:
+                rows.append(("Prediction Confidence", f"{result['score'] * 100:.1f}%"))
+        if result["kind"] == "imaging":
+            rows += [("Image", details.get("image", "")), ("Confidence Threshold", details.get("threshold", ""))]
+        for label, value in rows:
+            pdf.set_font("Helvetica", "B", 11)
+            pdf.cell(55, 8, _text(label), 0, 0)
+            pdf.set_font("Helvetica", "", 11)
+            pdf.cell(0, 8, _text(value), 0, 1)
+
+        if result["kind"] == "clinical" and details.get("inputs"):
+            pdf.ln(4)
+            pdf.set_font("Helvetica", "B", 12)
+            pdf.cell(0, 8, "Measurements", 0, 1)
+            pdf.set_font("Helvetica", "", 10)
+            inputs = details["inputs"]
+            for feature in CLINICAL_FEATURES:
+                value = inputs.get(feature)
+                pdf.cell(55, 6, _text(feature), "B", 0)
+                pdf.cell(40, 6, _text("" if value is None else f"{value:g}"), "B", 1, "R")
+        if details.get("insights"):
+            pdf.ln(4)
+            pdf.set_font("Helvetica", "B", 12)
+            pdf.cell(0, 8, "Clinical Insights", 0, 1)
+            pdf.set_font("Helvetica", "", 10)
+            for insight in details["insights"]:
+                pdf.multi_cell(0, 6, _text(f"- {insight}"))
+        if details.get("notes"):
+            pdf.ln(4)
+            pdf.set_font("Helvetica", "B", 12)
+            pdf.cell(0, 8, "Additional Notes", 0, 1)
+            pdf.set_font("Helvetica", "", 10)
+            pdf.multi_cell(0, 6, _text(details["notes"]))
+
+        pdf.ln(6)
+        pdf.set_font("Helvetica", "I", 9)
+        pdf.set_text_color(90, 90, 90)
+        if result.get("model_version"):
+            pdf.cell(0, 6, _text(f"Model version: {result['model_version'][:16]}"), 0, 1)
+        pdf.multi_cell(0, 5, DISCLAIMER)
+        return pdf, pdf.page_no()
+
+
+def pdf_bytes(pdf):
+    # fpdf 1.7 returns the document as a latin-1 str, fpdf2 as a bytearray
+    data = pdf.output(dest="S")
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+
+_template = None
+
+
+def _init_worker(logo_path):
+    global _template
+    _template = ReportTemplate(logo_path)
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        _template = ReportTemplate()
+    return _template
+
+
+def render_report(result):
+    pdf, _ = _get_template().render(result)
+    return pdf_bytes(pdf)
+
+
+def report_file_name(result):
+    patient = re.sub(r"[^A-Za-z0-9_-]+", "_", result.get("patient") or "Patient").strip("_") or "Patient"
+    prefix = f"{result['id']}_" if result.get("id") is not None else ""
+    return f"{prefix}{patient}_{result['kind']}_report.pdf"
+
+
+# Bulk rendering writes the file in the worker so only its page count travels back
+def write_report(result, output_dir):
+    pdf, pages = _get_template().render(result)
+    pdf.output(os.path.join(output_dir, report_file_name(result)), "F")
+    return pages
+
+
+# Process pool that renders reports off the script thread. Workers are spawned,
+# not forked, so they never inherit the server's threads or loaded models, and
+# each prepares its ReportTemplate once in the initializer.
+class ReportQueue:
+    def __init__(self, workers=REPORT_WORKERS, logo_path=LOGO_PATH):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(logo_path,),
+        )
+
+    # Returns a Future that resolves to the PDF bytes
+    def submit(self, result):
+        return self._executor.submit(render_report, result)
+
+    def write_all(self, results, output_dir, chunksize=16):
+        return self._executor.map(write_report, results, [output_dir] * len(results), chunksize=chunksize)
+
+    def close(self):
+        self._executor.shutdown()
+
+
+# Renders every result given into output_dir across all workers and returns
+# (reports, pages, seconds)
+def render_bulk(results, output_dir, workers=REPORT_WORKERS, chunksize=16):
+    os.makedirs(output_dir, exist_ok=True)
+    results = list(results)
+    reports = ReportQueue(workers)
+    try:
+        start = time.perf_counter()
+        pages = sum(reports.write_all(results, output_dir, chunksize=chunksize))
+        seconds = time.perf_counter() - start
+    finally:
+        reports.close()
+    return len(results), pages, seconds
+
+
+def sample_results(count):
+    results = []
+    for i in range(count):
+        if i % 2:
+            results.append({
+                "id": i, "kind": "imaging", "patient": f"Patient {i}", "outcome": "Infected", "score": 0.82,
+                "details": {"image": f"scan{i:05d}.jpg", "threshold": 0.5, "insights": [
+                    "Increased ovarian size (>10 cm³).", "Presence of 12+ follicles (2-9 mm) arranged peripherally.",
+                ]},
+            })
+        else:
+            results.append({
+                "id": i, "kind": "clinical", "patient": f"Patient {i}", "outcome": "PCOS Likely", "score": 72.5,
+                "details": {"inputs": dict(zip(CLINICAL_FEATURES, [28, 27.4, 95, 14, 2.1, 5.2, 250, 18, 2.2, 3.1, 110, 6])), "notes": ""},
+            })
+    return results
+
+
+def main(argv=None):
+    from modules.result_store import RESULT_DB, ResultStore
+
+    parser = argparse.ArgumentParser(description="Render PDF reports of saved diagnostic results.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk_parser = commands.add_parser("bulk", help="Render every result saved on one day")
+    bulk_parser.add_argument("--date", default=date.today().isoformat(), help="Day to render (UTC), e.g. 2026-10-17")
+    bulk_parser.add_argument("--db", default=RESULT_DB, help=f"Result database (default: {RESULT_DB})")
+    bulk_parser.add_argument("--output-dir", default="reports")
+    bulk_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    bench_parser = commands.add_parser("bench", help="Pages/sec on synthetic results at several worker counts")
+    bench_parser.add_argument("--reports", type=int, default=2000)
+    bench_parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    if args.command == "bulk":
+        day = date.fromisoformat(args.date)
+        store = ResultStore(args.db)
+        try:
+            results = store.iter_range(day.isoformat(), (day + timedelta(days=1)).isoformat())
+            reports, pages, seconds = render_bulk(results, args.output_dir, args.workers)
+        finally:
+            store.close()
+        rate = pages / seconds if seconds else 0.0
+        print(f"Rendered {reports:,} reports ({pages:,} pages) into {args.output_dir} in {seconds:.1f}s ({rate:,.0f} pages/sec)")
+    else:
+        results = sample_results(args.reports)
+        print(f"{'workers':>8}{'reports':>10}{'pages/sec':>12}")
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as output_dir:
+                reports, pages, seconds = render_bulk(results, output_dir, workers)
+            print(f"{workers:>8}{reports:>10}{pages / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import closing
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Database file and write batching, overridable per deployment
+RESULT_DB = os.environ.get("RESULT_DB", "pcos_results.db")
+FLUSH_MAX_ROWS = int(os.environ.get("RESULT_FLUSH_MAX_ROWS", "1000"))
+FLUSH_INTERVAL_MS = float(os.environ.get("RESULT_FLUSH_INTERVAL_MS", "50"))
+
+COLUMNS = ["id", "created_at", "kind", "patient", "outcome", "score", "model_version", "details"]
+
+# created_at is a UTC ISO-8601 string, so it sorts and compares as a date;
+# details holds the inputs and insights of the result as JSON
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    patient TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    score REAL,
+    model_version TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS results_patient_created ON results (patient, created_at);
+CREATE INDEX IF NOT EXISTS results_created ON results (created_at);
+"""
+
+INSERT = "INSERT INTO results (created_at, kind, patient, outcome, score, model_version, details) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+_STOP = object()
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    # WAL lets readers run while the writer commits; NORMAL only syncs at checkpoints
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+# Clinical and imaging outcomes of every session in one SQLite database. save()
+# only queues the row: a background thread writes everything queued within
+# flush_interval_ms in one transaction, so the script thread never waits on disk
+class ResultStore:
+    def __init__(self, path=RESULT_DB, flush_max_rows=FLUSH_MAX_ROWS, flush_interval_ms=FLUSH_INTERVAL_MS):
+        self.path = path
+        self.flush_max_rows = flush_max_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.rows_written = 0
+        self.commits = 0
+        with closing(connect(path)) as connection:
+            connection.executescript(SCHEMA)
+        self._queue = queue.Queue()
+        # Set when the writer cannot open the database; every queued and later
+        # save fails with it instead of waiting forever
+        self._failed = None
+        # Set by close(); later saves raise instead of queueing to a stopped writer
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    # Returns a Future that resolves to the row id once the row is committed. A
+    # failed write is logged even if nobody waits on the Future. Raises
+    # RuntimeError once the store is closed.
+    def save(self, kind, patient, outcome, score=None, model_version=None, details=None, created_at=None):
+        row = (
+            created_at or utc_now(), kind, patient, outcome,
+            None if score is None else float(score), model_version,
+            None if details is None else json.dumps(details),
+        )
+        future = self._submit(row)
+        future.add_done_callback(_log_failure)
+        return future
+
+    # Blocks until everything saved so far is committed
+    def flush(self, timeout=None):
+        self._submit(None).result(timeout)
+
+    def close(self):
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "rows_written": self.rows_written, "commits": self.commits}
+
+    def by_patient(self, patient, limit=100):
+        return self._query(
+            "SELECT * FROM results WHERE patient = ? ORDER BY created_at DESC LIMIT ?", (patient, limit)
+        )
+
+    # Streams results with start <= created_at < end in created_at order; dates may
+    # be ISO-8601 dates or timestamps. Rows are fetched chunk by chunk from a
+    # single read transaction, so memory stays bounded for any range.
+    def iter_range(self, start=None, end=None, kind=None, limit=None, chunk_size=5000):
+        clauses, params = [], []
+        for clause, value in (("created_at >= ?", start), ("created_at < ?", end), ("kind = ?", kind)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = "SELECT * FROM results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            cursor = connection.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(zip(COLUMNS, row))
+
+    def export_csv(self, file, start=None, end=None, kind=None):
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        count = 0
+        for row in self.iter_range(start, end, kind=kind):
+            writer.writerow(row)
+            count += 1
+        return count
+
+    def _submit(self, row):
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("The result store is closed.")
+            if self._failed is not None:
+                future.set_exception(self._failed)
+            else:
+                self._queue.put((row, future))
+        return future
+
+    def _query(self, sql, params):
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            return [dict(zip(COLUMNS, row)) for row in connection.execute(sql, params)]
+
+    def _run(self):
+        try:
+            connection = connect(self.path)
+        except Exception as e:
+            with self._submit_lock:
+                self._failed = e
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                if entry is not _STOP:
+                    entry[1].set_exception(e)
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                stopping = False
+                while len(batch) < self.flush_max_rows:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if entry is _STOP:
+                        stopping = True
+                        break
+                    batch.append(entry)
+                self._write(connection, batch)
+                if stopping:
+                    return
+        finally:
+            connection.close()
+
+    def _write(self, connection, batch):
+        rows = [(row, future) for row, future in batch if row is not None]
+        try:
+            with connection:
+                ids = [connection.execute(INSERT, row).lastrowid for row, _ in rows]
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.rows_written += len(rows)
+        self.commits += 1
+        for (_, future), row_id in zip(rows, ids):
+            future.set_result(row_id)
+        for row, future in batch:
+            if row is None:
+                future.set_result(None)
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Could not save a result: %s", error, exc_info=error)
+
+
+# Saves count synthetic results as fast as they can be queued and reports the
+# write throughput of the batching writer next to one commit per insert
+def bench(path, count=20000, direct_count=2000):
+    store = ResultStore(path)
+    start = time.perf_counter()
+    enqueue_seconds = []
+    for i in range(count):
+        queued = time.perf_counter()
+        store.save("clinical", f"patient-{i % 500}", "PCOS Unlikely", score=12.5, details={"Age": 30})
+        enqueue_seconds.append(time.perf_counter() - queued)
+    store.flush()
+    batched_seconds = time.perf_counter() - start
+    commits = store.commits
+    store.close()
+
+    with closing(connect(path)) as connection:
+        start = time.perf_counter()
+        for i in range(direct_count):
+            with connection:
+                connection.execute(INSERT, (utc_now(), "clinical", f"patient-{i % 500}", "PCOS Unlikely", 12.5, None, "{}"))
+        direct_seconds = time.perf_counter() - start
+
+    enqueue_seconds.sort()
+    return {
+        "rows": count,
+        "commits": commits,
+        "batched_inserts_per_sec": count / batched_seconds,
+        "direct_inserts_per_sec": direct_count / direct_seconds,
+        "save_p99_us": enqueue_seconds[int(0.99 * (len(enqueue_seconds) - 1))] * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and export saved diagnostic results.")
+    parser.add_argument("--db", default=RESULT_DB, help=f"Result database (default: {RESULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    patient_parser = commands.add_parser("patient", help="List the latest results of one patient")
+    patient_parser.add_argument("name")
+    patient_parser.add_argument("--limit", type=int, default=20)
+
+    export_parser = commands.add_parser("export", help="Stream results in a date range to CSV")
+    export_parser.add_argument("--since", help="First date included, e.g. 2026-01-01")
+    export_parser.add_argument("--until", help="First date excluded")
+    export_parser.add_argument("--kind", choices=["clinical", "imaging"])
+    export_parser.add_argument("--output", help="CSV file (default: stdout)")
+
+    bench_parser = commands.add_parser("bench", help="Measure insert throughput on a scratch database")
+    bench_parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        with tempfile.TemporaryDirectory() as scratch:
+            result = bench(os.path.join(scratch, "results.db"), args.rows)
+        print(f"Batched writer: {result['batched_inserts_per_sec']:,.0f} inserts/sec "
+              f"({result['rows']:,} rows in {result['commits']} commits), save() p99 {result['save_p99_us']:.0f}µs")
+        print(f"One commit per insert: {result['direct_inserts_per_sec']:,.0f} inserts/sec")
+        return
+
+    store = ResultStore(args.db)
+    try:
+        if args.command == "patient":
+            for row in store.by_patient(args.name, args.limit):
+                score = "" if row["score"] is None else f"{row['score']:.1f}"
+                print(f"{row['created_at']}  {row['kind']:<9}{row['outcome']:<16}{score}")
+        elif args.output:
+            with open(args.output, "w", newline="") as f:
+                count = store.export_csv(f, args.since, args.until, args.kind)
+            print(f"Exported {count:,} results to {args.output}")
+        else:
+            store.export_csv(sys.stdout, args.since, args.until, args.kind)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import itertools
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.batch_scoring import ChunkWriter, iter_chunks
+
+RISK_LEVELS = ["Low Risk", "Moderate Risk", "High Risk"]
+RISK_COLORS = ["#4CAF50", "#FF9800", "#F44336"]
+
+# Quiz questions counted towards each Rotterdam criterion, as (start, stop) column
+# ranges of the answer matrix; the remaining questions are informational
+CRITERIA = {
+    "OvulatoryDysfunction": (0, 3),
+    "Hyperandrogenism": (3, 6),
+    "PolycysticOvaries": (6, 8),
+}
+CRITERIA_COLUMNS = 8
+
+# Column names of the 11 quiz answers in screening exports
+ANSWER_COLUMNS = [f"Q{i}" for i in range(1, 12)]
+# Answer text accepted in screening exports, compared case-insensitively
+ANSWER_VALUES = {"yes": 1, "no": 0, "1": 1, "0": 0}
+
+
+# Symptom Tracker scoring against the Rotterdam criteria: answers are 0/1 for the
+# quiz questions, grouped as ovulatory dysfunction (0-2), hyperandrogenism (3-5)
+# and polycystic ovaries (6-7); the remaining questions are informational
+def calculate_risk(answers):
+    criteria_met = sum(answers[:3]) >= 1, sum(answers[3:6]) >= 1, sum(answers[6:8]) >= 1
+    criteria_count = sum(criteria_met)
+
+    if criteria_count == 0:
+        return "Low Risk", "#4CAF50"
+    elif criteria_count == 1:
+        return "Moderate Risk", "#FF9800"
+    else:
+        return "High Risk", "#F44336"
+
+
+# Vectorized calculate_risk for an (N x 11) answer matrix. Returns the risk level
+# of every row as an index into RISK_LEVELS and an (N x 3) array of criterion flags
+def score_answers(answers):
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != len(ANSWER_COLUMNS):
+        raise ValueError(f"Expected an (N x {len(ANSWER_COLUMNS)}) answer matrix, got shape {answers.shape}.")
+    flags = np.empty((len(answers), len(CRITERIA)), dtype=bool)
+    scored = answers[:, :CRITERIA_COLUMNS]
+    if scored.dtype == bool or (np.issubdtype(scored.dtype, np.integer) and (scored.size == 0 or scored.min() >= 0)):
+        # For non-negative answers "sum >= 1" means "any answer is non-zero": the
+        # eight scored answers become one byte each of a uint64 per row, and each
+        # criterion is a single mask test
+        packed = (scored != 0).view(np.uint64)[:, 0] if len(scored) else np.zeros(0, dtype=np.uint64)
+        for i, (start, stop) in enumerate(CRITERIA.values()):
+            mask = np.uint64(sum(0xFF << (8 * byte) for byte in range(start, stop)))
+            np.not_equal(packed & mask, 0, out=flags[:, i])
+    else:
+        for i, (start, stop) in enumerate(CRITERIA.values()):
+            np.greater_equal(answers[:, start:stop].sum(axis=1), 1, out=flags[:, i])
+    counts = np.zeros(len(answers), dtype=np.int8)
+    for i in range(len(CRITERIA)):
+        counts += flags[:, i]
+    levels = np.minimum(counts, len(RISK_LEVELS) - 1)
+    return levels, flags
+
+
+def risk_labels(levels):
+    return np.asarray(RISK_LEVELS, dtype=object)[levels]
+
+
+# Answers exported as "Yes"/"No" text are mapped to 1/0; unanswered questions count
+# as "No", the quiz's default. Any other text raises ValueError rather than being
+# scored as "No".
+def answer_matrix(frame, columns=ANSWER_COLUMNS):
+    values = np.empty((len(frame), len(columns)), dtype=np.int8)
+    for i, column in enumerate(columns):
+        series = frame[column]
+        if not pd.api.types.is_numeric_dtype(series):
+            text = series.astype(str).str.strip().str.lower()
+            answered = series.notna() & (text != "")
+            series = text.map(ANSWER_VALUES).where(answered)
+            unknown = answered & series.isna()
+            if unknown.any():
+                raise ValueError(
+                    f"Unrecognised answer {frame[column][unknown].iloc[0]!r} in column {column!r}; "
+                    f"expected one of {', '.join(ANSWER_VALUES)}."
+                )
+        values[:, i] = series.fillna(0).to_numpy()
+    return values
+
+
+# Running counts per risk level and per criterion across scored chunks
+class RiskSummary:
+    def __init__(self):
+        self.respondents = 0
+        self.level_counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        self.criterion_counts = np.zeros(len(CRITERIA), dtype=np.int64)
+
+    def update(self, levels, flags):
+        self.respondents += len(levels)
+        self.level_counts += np.bincount(levels, minlength=len(RISK_LEVELS))
+        self.criterion_counts += flags.sum(axis=0)
+
+    def as_dict(self):
+        share = (lambda n: n / self.respondents) if self.respondents else (lambda n: 0.0)
+        return {
+            "respondents": self.respondents,
+            "risk_levels": {level: {"count": int(n), "share": share(n)} for level, n in zip(RISK_LEVELS, self.level_counts)},
+            "criteria": {name: {"count": int(n), "share": share(n)} for name, n in zip(CRITERIA, self.criterion_counts)},
+        }
+
+
+def score_file(input_path, output_path=None, chunk_size=500000, keep_columns=(), columns=ANSWER_COLUMNS, progress_every=10):
+    summary = RiskSummary()
+    writer = ChunkWriter(output_path) if output_path else None
+    read_columns = list(keep_columns) + [c for c in columns if c not in keep_columns]
+    start = time.perf_counter()
+    try:
+        for i, chunk in enumerate(iter_chunks(input_path, chunk_size, read_columns), start=1):
+            levels, flags = score_answers(answer_matrix(chunk, columns))
+            summary.update(levels, flags)
+            if writer is not None:
+                result = chunk[list(keep_columns)].copy()
+                result["RiskLevel"] = risk_labels(levels)
+                for name, flag in zip(CRITERIA, flags.T):
+                    result[name] = flag
+                writer.write(result)
+
+            if progress_every and i % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{summary.respondents:,} respondents scored ({summary.respondents / elapsed:,.0f} rows/sec)", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+    return summary, time.perf_counter() - start
+
+
+# Checks score_answers against calculate_risk on every possible 0/1 answer list
+# and on a large random sample, and times both
+def verify(rows=1000000, seed=0):
+    exhaustive = np.array(list(itertools.product((0, 1), repeat=len(ANSWER_COLUMNS))), dtype=np.int8)
+    expected = [calculate_risk(list(answers))[0] for answers in exhaustive]
+    levels, _ = score_answers(exhaustive)
+    exhaustive_mismatches = int(np.sum(risk_labels(levels) != np.array(expected, dtype=object)))
+
+    sample = np.random.default_rng(seed).integers(0, 2, size=(rows, len(ANSWER_COLUMNS)), dtype=np.int8)
+    start = time.perf_counter()
+    levels, _ = score_answers(sample)
+    vectorized_seconds = time.perf_counter() - start
+    lists = sample.tolist()
+    start = time.perf_counter()
+    expected = [calculate_risk(answers)[0] for answers in lists]
+    loop_seconds = time.perf_counter() - start
+    sample_mismatches = int(np.sum(risk_labels(levels) != np.array(expected, dtype=object)))
+
+    return {
+        "exhaustive_inputs": len(exhaustive),
+        "exhaustive_mismatches": exhaustive_mismatches,
+        "sample_rows": rows,
+        "sample_mismatches": sample_mismatches,
+        "vectorized_rows_per_sec": rows / vectorized_seconds,
+        "loop_rows_per_sec": rows / loop_seconds,
+    }
+
+
+def print_summary(summary):
+    stats = summary.as_dict()
+    print(f"{stats['respondents']:,} respondents")
+    for group in ("risk_levels", "criteria"):
+        for name, entry in stats[group].items():
+            print(f"  {name:<22}{entry['count']:>14,}{entry['share']:>9.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score Rotterdam self-assessment answers for a screening campaign.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = commands.add_parser("score", help="Score a CSV or Parquet file of quiz answers")
+    score_parser.add_argument("input", help=f"File with the answer columns {ANSWER_COLUMNS[0]}..{ANSWER_COLUMNS[-1]} (0/1 or Yes/No)")
+    score_parser.add_argument("--output", help="CSV or Parquet file for per-respondent risk levels and criterion flags")
+    score_parser.add_argument("--chunk-size", type=int, default=500000, help="Rows scored per vectorized call")
+    score_parser.add_argument("--keep", nargs="*", default=[], help="Input columns copied to the output, e.g. a respondent ID")
+
+    verify_parser = commands.add_parser("verify", help="Check the vectorized scorer against calculate_risk")
+    verify_parser.add_argument("--rows", type=int, default=1000000, help="Random answer lists compared after the exhaustive check")
+    args = parser.parse_args(argv)
+
+    if args.command == "score":
+        summary, elapsed = score_file(args.input, args.output, chunk_size=args.chunk_size, keep_columns=args.keep)
+        rate = summary.respondents / elapsed if elapsed else 0.0
+        print(f"Scored {summary.respondents:,} respondents in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+        print_summary(summary)
+    else:
+        result = verify(args.rows)
+        print(f"Exhaustive: {result['exhaustive_mismatches']} mismatches over {result['exhaustive_inputs']:,} answer lists")
+        print(f"Random: {result['sample_mismatches']} mismatches over {result['sample_rows']:,} rows")
+        print(f"Vectorized {result['vectorized_rows_per_sec']:,.0f} rows/sec, calculate_risk loop {result['loop_rows_per_sec']:,.0f} rows/sec")
+        if result["exhaustive_mismatches"] or result["sample_mismatches"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from modules.clinical import CLINICAL_FEATURES
+
+# Ranges offered for each feature in the what-if sweep
+SWEEP_RANGES = {
+    "Age": (10.0, 90.0),
+    "BMI": (15.0, 50.0),
+    "FastingGlucose": (60.0, 200.0),
+    "FastingInsulin": (2.0, 60.0),
+    "LH_FSH_Ratio": (0.2, 5.0),
+    "AMH": (0.1, 15.0),
+    "DHEAS": (50.0, 600.0),
+    "Prolactin": (2.0, 60.0),
+    "TSH": (0.1, 10.0),
+    "FreeTestosterone": (0.1, 10.0),
+    "BloodSugar": (60.0, 300.0),
+    "Score": (1.0, 10.0),
+}
+
+
+def sweep_values(feature, points):
+    low, high = SWEEP_RANGES[feature]
+    return np.linspace(low, high, points)
+
+
+# Copies of the patient with one or two features replaced by every grid point
+def sweep_frame(patient, x_feature, x_values, y_feature=None, y_values=None):
+    if y_feature is None:
+        frame = pd.DataFrame({feature: np.repeat(patient[feature], len(x_values)) for feature in CLINICAL_FEATURES})
+        frame[x_feature] = x_values
+        return frame
+    xx, yy = np.meshgrid(x_values, y_values)
+    frame = pd.DataFrame({feature: np.repeat(patient[feature], xx.size) for feature in CLINICAL_FEATURES})
+    frame[x_feature] = xx.ravel()
+    frame[y_feature] = yy.ravel()
+    return frame
+
+
+# Likelihood in percent over the whole grid from a single predict_proba call;
+# shape (len(x_values),) for one feature, (len(y_values), len(x_values)) for two
+def evaluate_sweep(model, patient, x_feature, x_values, y_feature=None, y_values=None):
+    frame = sweep_frame(patient, x_feature, x_values, y_feature, y_values)
+    likelihood = model.predict_proba(frame.astype("float64"))[:, 1] * 100
+    if y_feature is None:
+        return likelihood
+    return likelihood.reshape(len(y_values), len(x_values))
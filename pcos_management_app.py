@@ -0,0 +1,23 @@
+import streamlit as st
+
+# Every page is a script that only runs, and only imports its dependencies, when
+# it is opened; models and clients are kept in st.cache_resource for the process.
+# This is the only script that calls st.set_page_config.
+DIAGNOSIS_PAGE = st.Page("Diagnosis.py", title="PCOS Self-Assessment & Diagnosis", icon="🌸", default=True)
+PAGES = [
+    DIAGNOSIS_PAGE,
+    st.Page("modules/ada.py", title="Ask Ada - PCOS Companion", icon="💬"),
+    st.Page("modules/chatbot.py", title="Chat with Ada (your API key)", icon="🔑"),
+    st.Page("modules/lifestyle.py", title="Lifestyle & Food Recommendations", icon="🥗"),
+    st.Page("modules/Telemedicine.py", title="Telemedicine", icon="🩺"),
+    st.Page("modules/community.py", title="Community & Support", icon="🤝"),
+]
+
+page = st.navigation(PAGES)
+# The diagnosis tools read best in a narrow column; the other pages use the full width
+st.set_page_config(
+    page_title=f"CycleCare AI - {page.title}",
+    page_icon=page.icon,
+    layout="centered" if page is DIAGNOSIS_PAGE else "wide",
+)
+page.run()
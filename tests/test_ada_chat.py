@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from modules.ada_chat import AnswerStream, create_llm, format_prompt
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeOpenAIServer(ttft_ms=100, token_ms=10, tokens=40) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def llm(server):
+    return create_llm("sk-fake", base_url=server.url)
+
+
+def test_streams_the_whole_answer(server, llm):
+    prompt = format_prompt("How much exercise helps PCOS?", "English")
+    stream = AnswerStream(llm, prompt)
+    parts = list(stream)
+    assert len(parts) > 1
+    assert "".join(parts) == stream.text == server.answer(prompt)
+    assert 0 < stream.first_token_seconds < stream.total_seconds
+    assert stream.done and not stream.cancelled
+
+
+def test_cancel_stops_reading_mid_answer(server, llm):
+    prompt = format_prompt("Which foods help with insulin resistance?", "English")
+    stream = AnswerStream(llm, prompt)
+    parts = []
+    for text in stream:
+        parts.append(text)
+        if len(parts) == 3:
+            stream.cancel()
+    assert len(parts) == 3
+    assert stream.cancelled and stream.done
+    assert stream.text == "".join(parts)
+    assert server.answer(prompt).startswith(stream.text) and stream.text != server.answer(prompt)
+    # The upstream request is dropped too
+    deadline = time.monotonic() + 5
+    while llm.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert llm.stats()["in_flight"] == 0
+
+
+def test_abandoned_stream_counts_as_cancelled(llm):
+    stream = AnswerStream(llm, format_prompt("Can PCOS be cured?", "English"))
+    iterator = iter(stream)
+    next(iterator)
+    iterator.close()
+    assert stream.cancelled and stream.done
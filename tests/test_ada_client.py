@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from modules.ada_chat import create_llm, format_prompt
+
+SESSIONS = 20
+
+
+@pytest.fixture
+def server():
+    # A slow first token keeps the answer in flight while every session joins
+    with FakeOpenAIServer(ttft_ms=300, token_ms=5, tokens=30) as server:
+        yield server
+
+
+def test_identical_questions_share_one_upstream_call(server):
+    client = create_llm("sk-fake", base_url=server.url)
+    prompt = format_prompt("What should I eat with PCOS?", "English")
+    streams = [client.stream(prompt, key="same question") for _ in range(SESSIONS)]
+    answers = [None] * SESSIONS
+
+    def read(index):
+        answers[index] = "".join(streams[index])
+
+    # The first session leaves after a few tokens; the others must still get all of it
+    first = []
+    for text in streams[0]:
+        first.append(text)
+        if len(first) == 3:
+            streams[0].close()
+            break
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(1, SESSIONS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    expected = server.answer(prompt)
+    assert server.stats()["requests"] == 1
+    assert client.stats()["coalesced"] == SESSIONS - 1
+    assert answers[1:] == [expected] * (SESSIONS - 1)
+    assert expected.startswith("".join(first))
+    assert client.stats()["in_flight"] == 0
+
+
+def test_different_questions_are_not_coalesced(server):
+    client = create_llm("sk-fake", base_url=server.url)
+    prompts = [format_prompt(f"Question {i} about PCOS", "English") for i in range(3)]
+    streams = [client.stream(prompt) for prompt in prompts]
+    assert ["".join(stream) for stream in streams] == [server.answer(prompt) for prompt in prompts]
+    assert server.stats()["requests"] == 3
+    assert client.stats()["coalesced"] == 0
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import modules.artifacts as artifacts
+from modules.artifacts import ArtifactError, ArtifactStore, download_resumable
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+CUT_AT = 1024 * 1024
+
+
+# Serves PAYLOAD with Range support, and sends only the first CUT_AT bytes of
+# the first response before closing the connection
+class RangeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+        body = PAYLOAD[start:]
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if len(self.server.requests) == 1:
+            self.wfile.write(body[:CUT_AT])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(artifacts.time, "sleep", lambda seconds: None)
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/model.bin"
+
+
+def make_store(tmp_path, server, sha256, **kwargs):
+    manifest = tmp_path / "artifacts.json"
+    # A file name no copy next to the app has, so resolve() has to download
+    spec = {"file": "test-artifact-download.bin", "version": "1", "sha256": sha256, "urls": [url(server)]}
+    manifest.write_text(json.dumps({"model": spec}))
+    return ArtifactStore(str(manifest), root=str(tmp_path / "store"), mirror=None, offline=False, **kwargs)
+
+
+def test_interrupted_download_resumes(tmp_path, server):
+    part = tmp_path / "model.bin.part"
+    download_resumable(url(server), str(part))
+
+    assert server.requests == [None, f"bytes={CUT_AT}-"]
+    assert hashlib.sha256(part.read_bytes()).hexdigest() == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def test_resolve_verifies_resumed_download(tmp_path, server):
+    store = make_store(tmp_path, server, hashlib.sha256(PAYLOAD).hexdigest())
+    path = store.resolve("model")
+
+    assert len(server.requests) == 2
+    assert store.digest("model") == hashlib.sha256(PAYLOAD).hexdigest()
+    assert store.timings["model"]["source"] == "download"
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_checksum_mismatch_removes_file(tmp_path, server):
+    store = make_store(tmp_path, server, "0" * 64)
+    target = store.path("model")
+
+    with pytest.raises(ArtifactError, match="Checksum mismatch"):
+        store.resolve("model")
+    assert not os.path.exists(target)
+
+
+def test_unpinned_artifact_is_not_downloaded(tmp_path, server):
+    store = make_store(tmp_path, server, None)
+
+    with pytest.raises(ArtifactError, match="no pinned SHA-256"):
+        store.resolve("model")
+    assert server.requests == []
+
+    pinning = make_store(tmp_path, server, None, allow_unpinned=True)
+    pinning.resolve("model")
+    assert pinning.digest("model") == hashlib.sha256(PAYLOAD).hexdigest()
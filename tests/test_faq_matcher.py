@@ -0,0 +1,33 @@
+import pytest
+
+from modules.faq_matcher import TRAFFIC, FaqMatcher
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return FaqMatcher(enabled=True)
+
+
+@pytest.mark.parametrize("question, title", [(q, t) for q, _, t in TRAFFIC])
+def test_labelled_questions(matcher, question, title):
+    entry = matcher.match(question)
+    assert (entry and entry["title"]) == title
+
+
+@pytest.mark.parametrize("question", [
+    # Each names something the matching entry never mentions
+    "Are herbal remedies safe with metformin?",
+    "Which healthy snacks are safe in pregnancy?",
+    "Do blood tests show thyroid cancer?",
+])
+def test_unmatched_word_goes_to_the_model(matcher, question):
+    assert matcher.match(question) is None
+
+
+def test_stats_count_deflections():
+    matcher = FaqMatcher(enabled=True)
+    matcher.match("What are healthy snacks for PCOS?")
+    matcher.match("Can PCOS be cured?")
+    matcher.observe(2.0)
+    stats = matcher.stats()
+    assert (stats["lookups"], stats["deflected"], stats["seconds_saved"]) == (2, 1, 2.0)
@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from modules.imaging import IMAGE_SIZE, TFLiteModel, iter_preprocessed_batches
+
+
+def png_bytes(value):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (value, value, value)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_batches_keep_input_order():
+    sources = [png_bytes(value) for value in range(5)]
+    batches = list(iter_preprocessed_batches(sources, batch_size=2, workers=2, opener=io.BytesIO))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    images = [image for batch in batches for image in batch]
+    assert [source for source, _, _ in images] == sources
+    for value, (_, pixels, error) in enumerate(images):
+        assert error is None
+        assert pixels.shape == (*IMAGE_SIZE, 3)
+        assert np.all(pixels == value)
+
+
+def test_undecodable_image_is_reported_per_image():
+    batches = list(iter_preprocessed_batches([png_bytes(1), b"not an image"], batch_size=4, opener=io.BytesIO))
+
+    (_, pixels, error), (_, broken, broken_error) = batches[0]
+    assert error is None and pixels is not None
+    assert broken is None and broken_error
+
+
+def test_error_while_listing_sources_reaches_consumer():
+    def sources():
+        for value in range(3):
+            yield png_bytes(value)
+        raise OSError("upload directory went away")
+
+    batches = iter_preprocessed_batches(sources(), batch_size=2, workers=2, opener=io.BytesIO)
+    # The images listed before the error are still delivered
+    assert [len(next(batches)), len(next(batches))] == [2, 1]
+    with pytest.raises(OSError, match="upload directory went away"):
+        next(batches)
+
+
+def test_tflite_predict_at_several_batch_sizes(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    keras_model = tf.keras.Sequential([
+        tf.keras.Input((*IMAGE_SIZE, 3)),
+        tf.keras.layers.Conv2D(4, 3, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    path = tmp_path / "model.tflite"
+    path.write_bytes(tf.lite.TFLiteConverter.from_keras_model(keras_model).convert())
+    images = np.random.default_rng(0).random((5, *IMAGE_SIZE, 3), dtype=np.float32)
+    expected = keras_model.predict(images, verbose=0)
+
+    model = TFLiteModel(str(path))
+    for count in (1, 4, 5, 1):
+        scores = model.predict(images[:count])
+        assert scores.shape == (count, 1)
+        np.testing.assert_allclose(scores, expected[:count], atol=1e-4)
+    # One interpreter per padded batch size, none of them resized after allocation
+    assert sorted(model.interpreters) == [1, 4, 8]
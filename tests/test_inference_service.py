@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from modules.inference_service import MicroBatcher
+
+
+class Fatal(BaseException):
+    pass
+
+
+def test_concurrent_requests_share_batches():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_batch_size=8, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(i) for i in range(20)]
+        assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(20)]
+    finally:
+        batcher.close()
+    assert batcher.stats()["requests"] == 20
+    assert batcher.stats()["batches"] < 20
+
+
+def test_bad_row_only_fails_its_own_request():
+    def predict_batch(items):
+        if "bad" in items:
+            raise ValueError("bad row")
+        return items
+
+    batcher = MicroBatcher(predict_batch, max_wait_ms=50)
+    try:
+        good, bad = batcher.submit("good"), batcher.submit("bad")
+        assert good.result(timeout=5) == "good"
+        with pytest.raises(ValueError, match="bad row"):
+            bad.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(lambda items: items)
+    assert batcher.predict(1, timeout=5) == 1
+    batcher.close()
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(2)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_worker_fails_outstanding_requests():
+    scoring, release = threading.Event(), threading.Event()
+
+    def predict_batch(items):
+        scoring.set()
+        release.wait(5)
+        raise Fatal()
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=1)
+    in_flight = batcher.submit(1)
+    assert scoring.wait(5)
+    queued = [batcher.submit(i) for i in range(2, 5)]
+    release.set()
+
+    for future in [in_flight, *queued]:
+        with pytest.raises(RuntimeError, match="stopped"):
+            future.result(timeout=5)
+    with pytest.raises(RuntimeError, match="stopped"):
+        batcher.submit(5)
+    batcher.close()
+
+
+def test_short_model_output_fails_the_batch():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=3, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(i) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="results for a batch of"):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
@@ -0,0 +1,72 @@
+import logging
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+import modules.result_store as result_store
+from modules.result_store import ResultStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "results.db")
+
+
+def test_save_commits_and_returns_row_id(db_path):
+    store = ResultStore(db_path)
+    try:
+        row_id = store.save("clinical", "patient", "PCOS Unlikely", score=12.5).result(timeout=5)
+    finally:
+        store.close()
+    assert store.by_patient("patient")[0]["id"] == row_id
+
+
+def test_failed_write_is_logged(db_path, caplog):
+    store = ResultStore(db_path)
+    with closing(sqlite3.connect(db_path)) as connection:
+        connection.execute("DROP TABLE results")
+    try:
+        with caplog.at_level(logging.ERROR, logger="modules.result_store"):
+            future = store.save("clinical", "patient", "PCOS Unlikely")
+            with pytest.raises(sqlite3.OperationalError):
+                future.result(timeout=5)
+    finally:
+        store.close()
+    assert "Could not save a result" in caplog.text
+
+
+def test_writer_that_cannot_connect_fails_every_save(db_path, monkeypatch):
+    real_connect = result_store.connect
+    calls = []
+
+    # The store's own schema setup connects first, then the writer thread
+    def connect(path):
+        calls.append(path)
+        if len(calls) > 1:
+            raise sqlite3.OperationalError("unable to open database file")
+        return real_connect(path)
+
+    monkeypatch.setattr(result_store, "connect", connect)
+    store = ResultStore(db_path)
+    queued = store.save("clinical", "patient", "PCOS Unlikely")
+    store._thread.join(timeout=5)
+    later = store.save("imaging", "patient", "PCOS Detected")
+    for future in (queued, later):
+        with pytest.raises(sqlite3.OperationalError):
+            future.result(timeout=5)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush(timeout=5)
+    store.close()
+
+
+def test_save_after_close_raises(db_path):
+    store = ResultStore(db_path)
+    store.save("clinical", "patient", "PCOS Unlikely").result(timeout=5)
+    store.close()
+    store.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        store.save("clinical", "patient", "PCOS Likely")
+    with pytest.raises(RuntimeError, match="closed"):
+        store.flush()
+    assert len(store.by_patient("patient")) == 1
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.risk_scoring import ANSWER_COLUMNS, answer_matrix, calculate_risk, risk_labels, score_answers
+
+
+def scalar_levels(answers):
+    return [calculate_risk(row)[0] for row in answers.tolist()]
+
+
+def assert_matches_scalar(answers):
+    levels, flags = score_answers(answers)
+    assert risk_labels(levels).tolist() == scalar_levels(answers)
+    assert flags.shape == (len(answers), 3)
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int64, bool])
+def test_every_answer_combination(dtype):
+    answers = np.array(list(itertools.product((0, 1), repeat=len(ANSWER_COLUMNS))), dtype=dtype)
+    assert len(answers) == 2 ** 11
+    assert_matches_scalar(answers)
+
+
+def test_random_sample():
+    answers = np.random.default_rng(0).integers(0, 2, size=(100000, len(ANSWER_COLUMNS)), dtype=np.int8)
+    assert_matches_scalar(answers)
+
+
+@pytest.mark.parametrize("answers", [
+    # Values outside 0/1 take the summing path, where a -1 can cancel a 1
+    np.array([[1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0], [2, 0, 0, -3, 5, 0, 0, 0, 1, 1, 1]], dtype=np.int64),
+    np.array([[0.5, 0.5, 0, 0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 1.0, 0, 0, 0, 0.2, 0, 0, 0]]),
+    # Only the informational questions answered
+    np.array([[0] * 8 + [1] * 3], dtype=np.int8),
+    np.ones((1, len(ANSWER_COLUMNS)), dtype=np.int8),
+    np.zeros((0, len(ANSWER_COLUMNS)), dtype=np.int8),
+])
+def test_edge_rows(answers):
+    assert_matches_scalar(answers)
+
+
+def test_answer_matrix_maps_text():
+    frame = pd.DataFrame({column: ["Yes", " no ", None, "1"] for column in ANSWER_COLUMNS})
+    frame["Q2"] = ["YES", "", "0", np.nan]
+    values = answer_matrix(frame)
+    assert values[:, 0].tolist() == [1, 0, 0, 1]
+    assert values[:, 1].tolist() == [1, 0, 0, 0]
+
+
+def test_answer_matrix_rejects_unknown_text():
+    frame = pd.DataFrame({column: ["Yes", "No"] for column in ANSWER_COLUMNS})
+    frame["Q4"] = ["Yes", "Sometimes"]
+    with pytest.raises(ValueError, match="'Sometimes' in column 'Q4'"):
+        answer_matrix(frame)